@@ -0,0 +1,40 @@
+import hashlib
+import secrets
+
+import db
+
+TOKEN_BYTES = 32
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def create_token(user_id, name=None, path=None):
+    """Issue a new API token for user_id; returns (token id, token)
+
+    The token itself is only returned here, never stored.
+    """
+    token = secrets.token_urlsafe(TOKEN_BYTES)
+    cursor = db.execute('INSERT INTO api_tokens (token_hash, user_id, name) VALUES (?, ?, ?)',
+                        (hash_token(token), user_id, name), path=path)
+    return cursor.lastrowid, token
+
+
+def authenticate(token, path=None):
+    """Return the user id owning token, or None"""
+    if not token:
+        return None
+    row = db.query_one('SELECT user_id FROM api_tokens WHERE token_hash = ?', (hash_token(token),), path=path)
+    return row[0] if row else None
+
+
+def list_tokens(user_id, path=None):
+    return db.query_all('SELECT id, name, created_at FROM api_tokens WHERE user_id = ? ORDER BY id',
+                        (user_id,), path=path)
+
+
+def revoke_token(user_id, token_id, path=None):
+    """Delete one of the user's tokens; returns whether it existed"""
+    cursor = db.execute('DELETE FROM api_tokens WHERE id = ? AND user_id = ?', (token_id, user_id), path=path)
+    return cursor.rowcount > 0
@@ -0,0 +1,93 @@
+"""Server-side cost of a match: HTML /submit vs JSON /api/v1/match.
+
+Sends the same synthetic resume/job pairs through the Flask test client three
+ways. The first is POST /submit with a session cookie, which renders
+result.html with both documents highlighted. The second is POST
+/api/v1/match with a bearer token. The third adds "highlight": true. Each
+request uses a fresh resume text, so the embedding cache never answers. The
+app runs as in bench_pipeline.py, so NLTK data must be installed.
+--synthetic swaps the model for the CPU-spinning stand-in.
+
+Usage: python benchmarks/bench_api.py [--requests 100] [--resume-chars 8000] [--synthetic]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import corpus
+import harness
+from bench_pipeline import configure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--resume-chars', type=int, default=8000)
+    parser.add_argument('--job-chars', type=int, default=3000)
+    parser.add_argument('--output', help='also write the results as JSON')
+    parser.add_argument('--synthetic', action='store_true', help='use a CPU-spinning fake model')
+    args = parser.parse_args()
+
+    resumes, jobs = corpus.generate(20, 20, args.resume_chars, args.job_chars)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        configure(tmpdir)
+        os.chdir(ROOT)
+        import resume_matcher as rm
+        import db
+
+        if args.synthetic:
+            from bench_embedding_server import SyntheticModel
+            rm.model_loader._model = SyntheticModel(5, 2)
+        client = rm.app.test_client()
+        client.post('/register', data={'username': 'benchclient', 'email': 'bench@example.com',
+                                       'password': 'benchmark1'})
+        client.post('/login', data={'username': 'benchclient', 'password': 'benchmark1'})
+        token = client.post('/api/v1/tokens', json={'name': 'bench'}).get_json()['token']
+        api = rm.app.test_client()  # no session cookie
+        headers = {'Authorization': f'Bearer {token}'}
+
+        def pair(i):
+            return f'{resumes[i % len(resumes)]}\nRef {i}', jobs[i % len(jobs)]
+
+        def html(i):
+            resume, job = pair(i)
+            return client.post('/submit', data={'resume_text': resume, 'job_desc': job})
+
+        def json_api(i, highlight=False):
+            resume, job = pair(i)
+            return api.post('/api/v1/match', headers=headers,
+                            json={'resume_text': resume, 'job_desc': job, 'highlight': highlight})
+
+        cases = [('submit (html)', html), ('api/v1/match', json_api),
+                 ('api/v1/match highlight', lambda i: json_api(i, highlight=True))]
+        results = {}
+        sizes = {}
+        offset = 0
+        for name, send in [('warmup', html)] + cases:
+            seconds = []
+            for i in range(args.requests):
+                response, elapsed = harness.timed(send, offset + i)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{name} returned {response.status_code}")
+                seconds.append(elapsed)
+            offset += args.requests
+            if name != 'warmup':
+                results[name] = harness.summarize(seconds)
+                sizes[name] = len(response.get_data())
+        rm.notification_worker.stop(timeout=5)
+        db.close_connections()
+
+    harness.print_table('per request', results)
+    print()
+    for name, size in sizes.items():
+        print(f"{name:<24} {size / 1024:>8.1f} KB response")
+    if args.output:
+        harness.write_results(args.output, args, requests=results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark scoring one resume against many job descriptions.
+
+Compares the per-posting path used by /submit (two encodes and one
+pytorch_cos_sim per job) with one batched encode plus a single matrix product.
+
+Usage: python benchmarks/bench_batch_score.py [--jobs 200] [--batch-size 64]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sentence_transformers import SentenceTransformer, util
+from similarity import cosine_scores
+
+
+def build_jobs(count, seed=0):
+    """Generate distinct job descriptions by shuffling lines of test_jobs.txt"""
+    with open(os.path.join(ROOT, 'test_jobs.txt'), 'r') as f:
+        lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        sample = rng.sample(lines, min(len(lines), 8))
+        jobs.append(f"Posting {i}\n" + '\n'.join(sample))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, 'test_resume.txt'), 'r') as f:
+        resume_text = f.read()
+    jobs = build_jobs(args.jobs)
+    model = SentenceTransformer('all-MiniLM-L6-v2')
+    model.encode(['warm up'])
+
+    start = time.perf_counter()
+    looped = []
+    for job_desc in jobs:
+        resume_embedding = model.encode(resume_text, convert_to_tensor=True)
+        job_embedding = model.encode(job_desc, convert_to_tensor=True)
+        looped.append(util.pytorch_cos_sim(resume_embedding, job_embedding).item())
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    embeddings = model.encode([resume_text] + jobs, batch_size=args.batch_size,
+                              convert_to_numpy=True, show_progress_bar=False)
+    batched = cosine_scores(embeddings[0], embeddings[1:])
+    batch_time = time.perf_counter() - start
+
+    max_diff = max(abs(a - b) for a, b in zip(looped, batched))
+    print(f"Jobs: {len(jobs)}, batch size: {args.batch_size}")
+    print(f"Looped:  {loop_time:8.3f}s  {len(jobs) / loop_time:8.1f} jobs/sec")
+    print(f"Batched: {batch_time:8.3f}s  {len(jobs) / batch_time:8.1f} jobs/sec")
+    print(f"Speedup: {loop_time / batch_time:8.2f}x (max score difference {max_diff:.2e})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Query timings for /submissions and /dashboard before and after migrations.
+
+Builds a submissions table with the original (index-free) schema, times the
+per-user queries the routes run, then applies db.migrate() and times them
+again.
+
+Usage: python benchmarks/bench_db_indexes.py [--rows 1000000] [--users 1000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import db
+
+QUERIES = {
+    'submissions': '''
+        SELECT id, resume_text, job_desc, score, matching_keywords
+        FROM submissions WHERE user_id = ? ORDER BY id DESC
+    ''',
+    'dashboard': '''
+        SELECT score, matching_keywords, created_at
+        FROM submissions WHERE user_id = ? ORDER BY created_at DESC
+    ''',
+}
+
+
+def populate(path, rows, users, seed=0):
+    rng = random.Random(seed)
+    conn = db.connect(path)
+    db._create_base_schema(conn.cursor())
+    keywords = ['python', 'flask', 'sql', 'aws', 'react', 'docker', 'git', 'linux']
+
+    def generate():
+        for i in range(rows):
+            day = 1 + i * 365 // rows
+            yield (rng.randrange(1, users + 1), f'resume {i}', f'job {i}', rng.random() * 100,
+                   ','.join(rng.sample(keywords, 3)), f'2025-{1 + (day - 1) // 31 % 12:02d}-{1 + (day - 1) % 28:02d} 12:00:00')
+
+    conn.executemany('''
+        INSERT INTO submissions (user_id, resume_text, job_desc, score, matching_keywords, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', generate())
+    conn.commit()
+    conn.close()
+
+
+def time_queries(path, users, repeats):
+    conn = db.connect(path)
+    rng = random.Random(1)
+    timings = {}
+    for name, sql in QUERIES.items():
+        start = time.perf_counter()
+        for _ in range(repeats):
+            conn.execute(sql, (rng.randrange(1, users + 1),)).fetchall()
+        timings[name] = (time.perf_counter() - start) / repeats * 1000
+    conn.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'bench.db')
+        start = time.perf_counter()
+        populate(path, args.rows, args.users)
+        print(f"Populated {args.rows} submissions for {args.users} users in {time.perf_counter() - start:.1f}s")
+
+        before = time_queries(path, args.users, args.repeats)
+        start = time.perf_counter()
+        version = db.migrate(path)
+        print(f"Migrated to schema version {version} in {time.perf_counter() - start:.1f}s")
+        after = time_queries(path, args.users, args.repeats)
+
+    print(f"{'query':<12} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name in QUERIES:
+        print(f"{name:<12} {before[name]:>10.2f} {after[name]:>10.2f} {before[name] / after[name]:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Load test for embedding_server.py: throughput vs latency per batching setting.
+
+Starts the server in a child process, then drives it from N client threads
+in a closed loop. Each request encodes two texts, like /submit's resume and
+job description. Every max-delay setting is measured at every concurrency
+level, plus an unbatched baseline (max batch size 2). The table shows
+requests/s, latency percentiles and the mean batch the model actually saw.
+
+--synthetic replaces the model with a CPU spin of a fixed cost per call
+plus a cost per text. Use it to study the batching policy where
+sentence-transformers isn't installed.
+
+Usage: python benchmarks/bench_embedding_server.py [--clients 1,4,16]
+           [--delays-ms 0,2,5,10] [--duration 3] [--synthetic]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import string
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+import embedding_server
+
+
+class SyntheticModel:
+    """Burns CPU like a transformer: a fixed cost per call plus a cost per text"""
+
+    def __init__(self, call_ms, text_ms, dim=384):
+        self.call_ms = call_ms
+        self.text_ms = text_ms
+        self.dim = dim
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        end = time.perf_counter() + (self.call_ms + self.text_ms * len(texts)) / 1000
+        while time.perf_counter() < end:
+            pass
+        return np.ones((len(texts), self.dim), dtype=np.float32)
+
+
+def serve(socket_path, max_batch_size, max_delay, synthetic, ready):
+    if synthetic:
+        model = SyntheticModel(*synthetic)
+    else:
+        import model_loader
+        model = model_loader.load_model()
+    server = embedding_server.EmbeddingServer(model, socket_path, max_batch_size=max_batch_size,
+                                              max_delay=max_delay)
+    ready.set()
+    server.serve_forever()
+
+
+def random_text(rng, words):
+    return ' '.join(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+                    for _ in range(words))
+
+
+def drive(socket_path, clients, duration):
+    latencies = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = embedding_server.EmbeddingClient(socket_path)
+        texts = [random_text(rng, 200) for _ in range(8)]
+        local = []
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            client.encode(rng.sample(texts, 2))
+            local.append(time.perf_counter() - start)
+        client.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    latencies.sort()
+    return {
+        'rps': len(latencies) / duration,
+        'p50': latencies[len(latencies) // 2] * 1000,
+        'p95': latencies[int(len(latencies) * 0.95)] * 1000,
+        'p99': latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', default='1,4,16', help='comma-separated concurrency levels')
+    parser.add_argument('--delays-ms', default='0,2,5,10', help='comma-separated max delays')
+    parser.add_argument('--max-batch-size', type=int, default=embedding_server.MAX_BATCH_SIZE)
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds per measurement')
+    parser.add_argument('--synthetic', action='store_true', help='use a CPU-spinning fake model')
+    parser.add_argument('--call-ms', type=float, default=8.0, help='synthetic cost per encode call')
+    parser.add_argument('--text-ms', type=float, default=1.0, help='synthetic cost per text')
+    args = parser.parse_args()
+
+    synthetic = (args.call_ms, args.text_ms) if args.synthetic else None
+    settings = [('unbatched', 2, 0.0)] + [
+        (f'delay {d}ms', args.max_batch_size, float(d) / 1000) for d in args.delays_ms.split(',')
+    ]
+    context = multiprocessing.get_context('fork')
+
+    print(f"{'setting':<12} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'batch':>6}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = os.path.join(tmpdir, 'embeddings.sock')
+        for name, max_batch_size, max_delay in settings:
+            ready = context.Event()
+            server = context.Process(target=serve, daemon=True,
+                                     args=(socket_path, max_batch_size, max_delay, synthetic, ready))
+            server.start()
+            if not ready.wait(300):
+                sys.exit('embedding server did not start')
+            stats_client = embedding_server.EmbeddingClient(socket_path)
+            try:
+                for clients in (int(c) for c in args.clients.split(',')):
+                    before = stats_client.stats()
+                    r = drive(socket_path, clients, args.duration)
+                    after = stats_client.stats()
+                    texts = after['texts'] - before['texts']
+                    mean_batch = texts / max(1, after['batches'] - before['batches'])
+                    print(f"{name:<12} {clients:>7} {r['rps']:>8.1f} {r['p50']:>8.1f} "
+                          f"{r['p95']:>8.1f} {r['p99']:>8.1f} {mean_batch:>6.1f}")
+            finally:
+                stats_client.close()
+                server.terminate()
+                server.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Latency and throughput of each encoder backend on CPU.
+
+For every backend the script times one /submit-sized request (the resume
+plus one job description) repeatedly, then encodes a corpus of generated
+postings in batches for throughput. Load time includes the ONNX export on
+a first run.
+
+Usage: python benchmarks/bench_encoders.py [--backends sentence-transformers,onnx,onnx-int8]
+           [--requests 50] [--docs 256] [--batch-size 64]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import encoders
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+
+def build_jobs(count, seed=0):
+    """Generate distinct job descriptions by shuffling lines of test_jobs.txt"""
+    with open(os.path.join(ROOT, 'test_jobs.txt'), 'r') as f:
+        lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    rng = random.Random(seed)
+    return [f"Posting {i}\n" + '\n'.join(rng.sample(lines, min(len(lines), 8))) for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backends', default=','.join(encoders.BACKENDS))
+    parser.add_argument('--requests', type=int, default=50, help='single-request timings per backend')
+    parser.add_argument('--docs', type=int, default=256, help='documents for the throughput run')
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--model-dir', default=encoders.ONNX_MODEL_DIR)
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, 'test_resume.txt'), 'r') as f:
+        resume_text = f.read()
+    jobs = build_jobs(max(args.docs, args.requests))
+
+    print(f"{'backend':<22} {'load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'docs/s':>8}")
+    for backend in args.backends.split(','):
+        start = time.perf_counter()
+        encoder = encoders.load_encoder(MODEL_NAME, backend, args.model_dir)
+        load_time = time.perf_counter() - start
+        encoder.encode(['warm up'], show_progress_bar=False)
+
+        latencies = []
+        for job_desc in jobs[:args.requests]:
+            start = time.perf_counter()
+            encoder.encode([resume_text, job_desc], convert_to_numpy=True, show_progress_bar=False)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+
+        start = time.perf_counter()
+        encoder.encode(jobs[:args.docs], batch_size=args.batch_size, convert_to_numpy=True,
+                       show_progress_bar=False)
+        throughput = args.docs / (time.perf_counter() - start)
+
+        print(f"{backend:<22} {load_time:>7.1f} {latencies[len(latencies) // 2] * 1000:>8.1f} "
+              f"{latencies[int(len(latencies) * 0.95)] * 1000:>8.1f} {throughput:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
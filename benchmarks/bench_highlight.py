@@ -0,0 +1,130 @@
+"""Keyword highlighting: alternation regex vs Aho-Corasick automaton.
+
+Highlights a MAX_TEXT_LENGTH document against keyword sets of increasing
+size, twice per set as /submit does (resume, then job description). It
+compares the old highlight_keywords with highlighter.highlight, both on a
+cold matcher cache and on a warm one, and times the two matchers
+highlight picks between (KeywordPattern and KeywordAutomaton, warm) to
+place REGEX_MAX_KEYWORDS. Every output is checked against a single-escape,
+longest-first regex reference.
+
+Usage: python benchmarks/bench_highlight.py [--sizes 10,25,50,100,1000] [--repeat 20]
+"""
+import argparse
+import html
+import os
+import random
+import re
+import string
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import highlighter
+
+TEXT_LENGTH = 10000
+
+
+def legacy_highlight(text, keywords):
+    """highlight_keywords as it was in resume_matcher.py"""
+    text = html.escape(text)
+    pattern = r'\b(' + '|'.join(re.escape(k) for k in keywords) + r')\b'
+    escaped_text = html.escape(text)
+    return re.sub(
+        pattern,
+        lambda m: f'<span class="highlight">{html.escape(m.group(1))}</span>',
+        escaped_text,
+        flags=re.IGNORECASE
+    )
+
+
+def reference_highlight(text, keywords):
+    """What the automaton should produce: one escape, longest keyword first"""
+    pattern = re.compile(
+        r'\b(' + '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)) + r')\b',
+        re.IGNORECASE)
+    parts = []
+    position = 0
+    for m in pattern.finditer(text):
+        parts.append(html.escape(text[position:m.start()]))
+        parts.append(f'<span class="highlight">{html.escape(m.group(1))}</span>')
+        position = m.end()
+    parts.append(html.escape(text[position:]))
+    return ''.join(parts)
+
+
+def make_vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+def make_text(rng, vocabulary):
+    filler = make_vocabulary(rng, 500)
+    words = []
+    length = 0
+    while length < TEXT_LENGTH:
+        word = rng.choice(vocabulary) if rng.random() < 0.3 else rng.choice(filler)
+        if rng.random() < 0.1:
+            word = word.capitalize() + rng.choice([',', '.', ' &', ' <b>'])
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)[:TEXT_LENGTH]
+
+
+def per_call_ms(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10,25,50,100,1000', help='comma-separated keyword set sizes')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"highlight uses a regex up to {highlighter.REGEX_MAX_KEYWORDS} keywords")
+    print(f"{'keywords':>8} {'legacy ms':>10} {'cold ms':>9} {'warm ms':>9} {'pattern ms':>11} "
+          f"{'automaton ms':>13} {'spans':>6}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        vocabulary = make_vocabulary(rng, size * 2)
+        keywords = set(rng.sample(vocabulary, size))
+        text = make_text(rng, vocabulary)
+
+        expected = reference_highlight(text, keywords)
+        assert highlighter.highlight(text, keywords) == expected, 'output differs from reference'
+        pattern = highlighter.KeywordPattern(keywords)
+        automaton = highlighter.KeywordAutomaton(keywords)
+        assert pattern.find(text) == automaton.find(text), 'matchers disagree'
+
+        def regex_submit():
+            legacy_highlight(text, keywords)
+            legacy_highlight(text, keywords)
+
+        def cold_submit():
+            highlighter.compile_keywords.cache_clear()
+            highlighter.highlight(text, keywords)
+            highlighter.highlight(text, keywords)
+
+        def warm_submit():
+            highlighter.highlight(text, keywords)
+            highlighter.highlight(text, keywords)
+
+        def scan_twice(matcher):
+            return lambda: (matcher.find(text), matcher.find(text))
+
+        print(f"{size:>8} {per_call_ms(regex_submit, args.repeat):>10.2f} "
+              f"{per_call_ms(cold_submit, args.repeat):>9.2f} "
+              f"{per_call_ms(warm_submit, args.repeat):>9.2f} "
+              f"{per_call_ms(scan_twice(pattern), args.repeat):>11.2f} "
+              f"{per_call_ms(scan_twice(automaton), args.repeat):>13.2f} {expected.count('<span'):>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Bulk ingestion: /api/v1/ingest vs one /api/v1/match request per pair.
+
+Writes --pairs synthetic resume/job pairs to a JSONL file, each resume made
+unique so the embedding cache never answers. It then stores them once
+through /api/v1/match, one request and one commit per pair, and once as a
+single streamed /api/v1/ingest request. Peak Python memory (tracemalloc) of
+the ingest request is then measured for --pairs and 4 x --pairs; it should
+not grow with the input. Runs the app as in bench_pipeline.py, so NLTK data
+must be installed. --synthetic swaps the model for the CPU-spinning
+stand-in.
+
+Usage: python benchmarks/bench_ingest.py [--pairs 500] [--chunk-size 128] [--synthetic]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import corpus
+from bench_pipeline import configure
+
+
+def write_pairs(path, resumes, jobs, count, offset):
+    with open(path, 'w') as f:
+        for i in range(count):
+            f.write(json.dumps({'id': offset + i, 'resume_text': f'{resumes[i % len(resumes)]}\nRef {offset + i}',
+                                'job_desc': jobs[i % len(jobs)]}) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pairs', type=int, default=500)
+    parser.add_argument('--chunk-size', type=int, default=None, help='pairs per batch; sets INGEST_CHUNK_SIZE')
+    parser.add_argument('--resume-chars', type=int, default=4000)
+    parser.add_argument('--job-chars', type=int, default=2000)
+    parser.add_argument('--synthetic', action='store_true', help='use a CPU-spinning fake model')
+    args = parser.parse_args()
+
+    resumes, jobs = corpus.generate(20, 20, args.resume_chars, args.job_chars)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        configure(tmpdir)
+        if args.chunk_size:
+            os.environ['INGEST_CHUNK_SIZE'] = str(args.chunk_size)
+        os.chdir(ROOT)
+        import resume_matcher as rm
+        import db
+
+        if args.synthetic:
+            from bench_embedding_server import SyntheticModel
+            rm.model_loader._model = SyntheticModel(5, 2)
+        client = rm.app.test_client()
+        client.post('/register', data={'username': 'benchclient', 'email': 'bench@example.com',
+                                       'password': 'benchmark1'})
+        client.post('/login', data={'username': 'benchclient', 'password': 'benchmark1'})
+        token = client.post('/api/v1/tokens', json={'name': 'bench'}).get_json()['token']
+        api = rm.app.test_client()  # no session cookie
+        headers = {'Authorization': f'Bearer {token}'}
+        path = os.path.join(tmpdir, 'pairs.jsonl')
+
+        def ingest(count, offset):
+            """Stream a file of count pairs through /api/v1/ingest; returns stored rows"""
+            write_pairs(path, resumes, jobs, count, offset)
+            with open(path, 'rb') as f:
+                response = api.post('/api/v1/ingest', headers=headers, input_stream=f,
+                                    content_length=os.path.getsize(path),
+                                    content_type='application/x-ndjson', buffered=False)
+                stored = 0
+                pending = b''
+                for part in response.response:
+                    pending += part if isinstance(part, bytes) else part.encode()
+                    lines = pending.split(b'\n')
+                    pending = lines.pop()
+                    stored += sum(1 for line in lines if b'"submission_id"' in line)
+                response.close()
+            if stored != count:
+                raise RuntimeError(f"Ingest stored {stored} of {count} pairs")
+            return stored
+
+        ingest(20, 0)  # warm up the model and keyword extractor
+
+        offset = 1000000
+        write_pairs(path, resumes, jobs, args.pairs, offset)
+        with open(path) as f:
+            pairs = [json.loads(line) for line in f]
+        start = time.perf_counter()
+        for record in pairs:
+            response = api.post('/api/v1/match', headers=headers,
+                                json={'resume_text': record['resume_text'], 'job_desc': record['job_desc']})
+            if response.status_code != 200:
+                raise RuntimeError(f"/api/v1/match returned {response.status_code}")
+        match_seconds = time.perf_counter() - start
+        del pairs
+
+        offset += args.pairs
+        start = time.perf_counter()
+        ingest(args.pairs, offset)
+        ingest_seconds = time.perf_counter() - start
+
+        peaks = {}
+        for count in (args.pairs, args.pairs * 4):
+            offset += args.pairs * 4
+            tracemalloc.start()
+            ingest(count, offset)
+            peaks[count] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        rm.notification_worker.stop(timeout=5)
+        db.close_connections()
+
+    print(f"{'case':<28} {'seconds':>9} {'pairs/s':>9}")
+    print(f"{'api/v1/match per pair':<28} {match_seconds:>9.2f} {args.pairs / match_seconds:>9.1f}")
+    print(f"{'api/v1/ingest':<28} {ingest_seconds:>9.2f} {args.pairs / ingest_seconds:>9.1f}")
+    print()
+    for count, peak in peaks.items():
+        print(f"ingest {count:>7} pairs: peak {peak / 1024 / 1024:.1f} MB traced")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Keyword queries: comma-joined string parsing vs the inverted index.
+
+Populates submissions through submission_store.save_submission(), then times
+"submissions matching every keyword" and "keyword frequency over the last 30
+days" both by splitting matching_keywords in Python and with indexed SQL.
+
+Usage: python benchmarks/bench_keyword_index.py [--rows 200000] [--users 50]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import db
+import submission_store
+from keyword_extractor import TECHNICAL_TERMS
+
+QUERY = ['kubernetes', 'terraform']
+
+
+def populate(rows, users, seed=0):
+    rng = random.Random(seed)
+    vocabulary = sorted(TECHNICAL_TERMS)
+    conn = db.get_connection()
+    for start in range(0, rows, 5000):
+        with db.transaction() as conn:
+            for _ in range(min(5000, rows - start)):
+                keywords = set(rng.sample(vocabulary, rng.randint(2, 12)))
+                submission_store.save_submission(conn, rng.randrange(1, users + 1), 'resume', 'job',
+                                                 rng.random() * 100, keywords)
+    # Spread created_at over a year so the 30 day window is selective
+    conn.execute("UPDATE submissions SET created_at = datetime('now', '-' || (id % 365) || ' days')")
+
+
+def parse_all_keywords(user_id):
+    rows = db.query_all('SELECT id, matching_keywords FROM submissions WHERE user_id = ? ORDER BY id DESC',
+                        (user_id,))
+    wanted = set(QUERY)
+    return [row[0] for row in rows if wanted <= set(row[1].split(','))]
+
+
+def parse_frequency(user_id):
+    rows = db.query_all('''
+        SELECT matching_keywords FROM submissions
+        WHERE user_id = ? AND created_at >= datetime('now', '-30 days')
+    ''', (user_id,))
+    counter = Counter()
+    for row in rows:
+        counter.update(k for k in row[0].split(',') if k)
+    return counter.most_common(20)
+
+
+def timed(fn, users, repeats):
+    start = time.perf_counter()
+    for i in range(repeats):
+        fn(i % users + 1)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.DB_PATH = os.path.join(tmpdir, 'bench.db')
+        db.migrate()
+        start = time.perf_counter()
+        populate(args.rows, args.users)
+        print(f"Populated {args.rows} submissions for {args.users} users in {time.perf_counter() - start:.1f}s")
+
+        assert parse_all_keywords(1) == submission_store.submissions_with_keywords(1, QUERY, limit=args.rows)
+        results = [
+            ('match all keywords', timed(parse_all_keywords, args.users, args.repeats),
+             timed(lambda u: submission_store.submissions_with_keywords(u, QUERY, limit=args.rows),
+                   args.users, args.repeats)),
+            ('30-day frequency', timed(parse_frequency, args.users, args.repeats),
+             timed(lambda u: submission_store.keyword_frequency(u, days=30), args.users, args.repeats)),
+        ]
+        db.close_connections()
+
+    print(f"{'query':<20} {'parse ms':>10} {'index ms':>10} {'speedup':>8}")
+    for name, parsed, indexed in results:
+        print(f"{name:<20} {parsed:>10.2f} {indexed:>10.2f} {parsed / indexed:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Micro-benchmark for keyword extraction throughput.
+
+Compares the original extract_keywords, copied below, which rebuilt its
+vocabularies on every call, against a single KeywordExtractor reused across
+calls. Both must return the same keywords for every document.
+
+Usage: python benchmarks/bench_keywords.py [--seconds 2]
+"""
+import argparse
+import html
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+
+from keyword_extractor import KeywordExtractor, MAX_TEXT_LENGTH
+
+
+def baseline_extract_keywords(text):
+    """extract_keywords as it was before KeywordExtractor, kept as the reference"""
+    text = html.escape(text[:MAX_TEXT_LENGTH])
+    text = text.lower()
+    text = text.replace('node.js', 'nodejs')
+    text = text.replace('express.js', 'expressjs')
+    text = text.replace('dev ops', 'devops')
+    text = text.replace('dev-ops', 'devops')
+    words = word_tokenize(text)
+
+    stop_words = set(stopwords.words('english'))
+    stop_words.update(['experience', 'year', 'years', 'skill', 'skills', 'strong',
+                       'description', 'candidate', 'looking', 'ideal', 'job',
+                       'knowledge', 'familiarity', 'high', 'control', 'seeking',
+                       'with'])
+    technical_terms = {
+        # Job Titles
+        'developer', 'engineer', 'architect', 'devops', 'sre', 'administrator',
+        'lead', 'senior', 'junior', 'fullstack', 'frontend', 'backend',
+
+        # Programming Languages
+        'python', 'javascript', 'java', 'typescript', 'ruby', 'php', 'scala', 'kotlin', 'swift',
+
+        # Web Technologies
+        'react', 'angular', 'vue', 'nodejs', 'expressjs', 'django', 'flask', 'fastapi',
+        'spring', 'hibernate', 'jquery', 'bootstrap', 'tailwind', 'sass', 'less',
+        'webpack', 'babel', 'html', 'css',
+
+        # DevOps & Infrastructure
+        'docker', 'kubernetes', 'jenkins', 'circleci', 'travis', 'gitlab', 'github',
+        'aws', 'azure', 'gcp', 'terraform', 'ansible', 'puppet', 'chef', 'nginx',
+        'apache', 'container', 'microservices', 'serverless', 'lambda',
+        'ci', 'cd', 'cicd', 'infrastructure', 'orchestration',
+
+        # Databases
+        'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'dynamodb',
+        'cassandra', 'mariadb', 'oracle',
+
+        # Operating Systems & Tools
+        'linux', 'unix', 'windows', 'macos', 'git', 'svn', 'mercurial',
+
+        # API & Architecture
+        'restful', 'graphql', 'api', 'apis', 'soap', 'microservice',
+
+        # Cloud & Infrastructure
+        'cloud', 'iaas', 'paas', 'saas', 'virtualization', 'containerization',
+
+        # UI/UX
+        'material', 'ui', 'ux', 'responsive', 'mobile', 'cross-platform',
+        'accessibility', 'wcag', 'usability',
+
+        # Security
+        'oauth', 'jwt', 'authentication', 'authorization', 'security',
+
+        # Testing
+        'junit', 'pytest', 'jest', 'selenium', 'cypress', 'testing'
+    }
+
+    keywords = []
+    i = 0
+    while i < len(words):
+        word = words[i].strip('.,()[]{}')
+        if len(word) <= 2 or word in stop_words:
+            i += 1
+            continue
+        if i < len(words) - 1:
+            two_words = word + ' ' + words[i + 1].strip('.,()[]{}')
+            if two_words in technical_terms:
+                keywords.append(two_words)
+                i += 2
+                continue
+        if word in technical_terms:
+            keywords.append(word)
+            i += 1
+            continue
+        if '.' in word or '-' in word:
+            parts = word.replace('-', '.').split('.')
+            if all(len(p) > 2 for p in parts):
+                keywords.extend(parts)
+            i += 1
+            continue
+        if word.isalpha() and len(word) > 2:
+            keywords.append(word)
+        i += 1
+    return set(keywords)
+
+
+def load_documents():
+    with open(os.path.join(ROOT, 'test_resume.txt'), 'r') as f:
+        resume = f.read()
+    with open(os.path.join(ROOT, 'test_jobs.txt'), 'r') as f:
+        jobs = [j.strip() for j in f.read().split('#')[1:]]
+    return [resume] + jobs
+
+
+def measure(fn, documents, seconds):
+    """Run fn over the documents repeatedly and return docs/sec"""
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for doc in documents:
+            fn(doc)
+        count += len(documents)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=2.0,
+                        help='time budget per variant')
+    args = parser.parse_args()
+
+    documents = load_documents()
+    extractor = KeywordExtractor()
+
+    # Sanity check: the extractor must match the original implementation
+    for doc in documents:
+        expected = baseline_extract_keywords(doc)
+        actual = extractor.extract(doc)
+        if actual != expected:
+            raise SystemExit(f"Keyword mismatch: missing {sorted(expected - actual)}, "
+                             f"extra {sorted(actual - expected)}")
+
+    per_call = measure(baseline_extract_keywords, documents, args.seconds)
+    shared = measure(extractor.extract, documents, args.seconds)
+
+    print(f"Documents: {len(documents)} (test_resume.txt + test_jobs.txt)")
+    print(f"Original per call:  {per_call:10.1f} docs/sec")
+    print(f"Shared extractor:   {shared:10.1f} docs/sec")
+    print(f"Speedup:            {shared / per_call:10.2f}x")
+
+
+if __name__ == '__main__':
+    main()
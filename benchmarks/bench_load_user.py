@@ -0,0 +1,179 @@
+"""Latency of the load_user query under gunicorn's threaded workers.
+
+Starts gunicorn with --worker-class gthread serving a small Flask-Login app
+whose user loader runs the SELECT that resume_matcher's load_user issues on
+every authenticated request. The loader uses a fresh connection per lookup
+in one run and db.get_connection() in the other. Client processes then log
+in and request a login_required route back to back, closed loop, as in
+loadgen.py. Both the client-side request latency and the time spent in the
+loader (reported by the server in a header) are summarized.
+
+Usage: python benchmarks/bench_load_user.py [--workers 2] [--threads 8] [--clients 16] [--duration 10]
+"""
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+from flask import Flask, g
+from flask_login import LoginManager, UserMixin, login_required, login_user
+
+import db
+import harness
+
+USERS = 1000
+LOAD_USER_SQL = 'SELECT id, username FROM users WHERE id = ?'
+
+
+def fresh_connection(path, user_id):
+    conn = db.connect(path)
+    cursor = conn.cursor()
+    cursor.execute(LOAD_USER_SQL, (user_id,))
+    user = cursor.fetchone()
+    conn.close()
+    return user
+
+
+def pooled_connection(path, user_id):
+    return db.query_one(LOAD_USER_SQL, (user_id,), path=path)
+
+
+class User(UserMixin):
+    def __init__(self, id, username):
+        self.id = id
+        self.username = username
+
+
+# The app gunicorn serves; BENCH_DB_PATH and LOAD_USER_MODE come from main()
+app = Flask(__name__)
+app.secret_key = 'bench-load-user'
+login_manager = LoginManager(app)
+LOOKUP = {'fresh': fresh_connection, 'pooled': pooled_connection}[os.environ.get('LOAD_USER_MODE', 'pooled')]
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    start = time.perf_counter()
+    row = LOOKUP(os.environ.get('BENCH_DB_PATH'), int(user_id))
+    g.load_user_seconds = time.perf_counter() - start
+    return User(row[0], row[1]) if row else None
+
+
+@app.route('/login/<int:user_id>')
+def login(user_id):
+    login_user(User(user_id, f'user{user_id}'))
+    return 'ok'
+
+
+@app.route('/me')
+@login_required
+def me():
+    return 'ok', 200, {'X-Load-User-Seconds': str(g.get('load_user_seconds', 0.0))}
+
+
+def run_client(client, url, duration, start_at):
+    """Request /me until the run ends; returns (request latencies, loader latencies, errors)"""
+    session = requests.Session()
+    session.get(f'{url}/login/{client % USERS + 1}', timeout=10)
+    latencies = []
+    loader = []
+    errors = 0
+    time.sleep(max(0.0, start_at - time.time()))
+    stop_at = time.perf_counter() + duration
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        try:
+            response = session.get(f'{url}/me', timeout=10)
+        except requests.RequestException:
+            errors += 1
+            continue
+        if response.status_code != 200:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+        loader.append(float(response.headers['X-Load-User-Seconds']))
+    return latencies, loader, errors
+
+
+def wait_until_up(url, server, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {server.returncode}")
+        try:
+            requests.get(f'{url}/login/1', timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn did not start")
+
+
+def run(mode, path, args, port):
+    url = f'http://127.0.0.1:{port}'
+    env = dict(os.environ, BENCH_DB_PATH=path, LOAD_USER_MODE=mode)
+    # Started from benchmarks/ so the app's gunicorn.conf.py (model preload) isn't picked up
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '--worker-class', 'gthread',
+                               '--workers', str(args.workers), '--threads', str(args.threads),
+                               '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', 'bench_load_user:app'],
+                              cwd=os.path.join(ROOT, 'benchmarks'), env=env)
+    try:
+        wait_until_up(url, server)
+        start_at = time.time() + 1
+        with multiprocessing.Pool(args.clients) as pool:
+            results = pool.starmap(run_client, [(client, url, args.duration, start_at)
+                                                for client in range(args.clients)])
+    finally:
+        server.terminate()
+        server.wait(10)
+    latencies = [s for result in results for s in result[0]]
+    summary = {
+        'request': harness.summarize(latencies),
+        'load_user': harness.summarize([s for result in results for s in result[1]]),
+    }
+    summary['request']['rps'] = len(latencies) / args.duration
+    summary['request']['errors'] = sum(result[2] for result in results)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=8, help='threads per gunicorn worker')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent client processes')
+    parser.add_argument('--duration', type=float, default=10, help='measured seconds per run')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'bench.db')
+        db.migrate(path)
+        with db.transaction(path) as conn:
+            conn.executemany('INSERT INTO users (username, password, email) VALUES (?, ?, ?)',
+                             [(f'user{i}', 'x', f'user{i}@example.com') for i in range(USERS)])
+        db.close_connections()
+
+        results = {mode: run(mode, path, args, args.port) for mode in ('fresh', 'pooled')}
+
+    print(f"gunicorn gthread: {args.workers} workers x {args.threads} threads, {args.clients} clients, "
+          f"{args.duration:.0f}s per run")
+    print(f"{'':<22} {'mean':>9} {'p50':>9} {'p99':>9} {'max':>9} {'req/s':>8}")
+    for mode, summary in results.items():
+        for part in ('load_user', 'request'):
+            s = summary[part]
+            rps = f"{s['rps']:>8.0f}" if 'rps' in s else ''
+            print(f"{mode + ' ' + part:<22} {s['mean_ms']:>7.3f}ms {s['p50_ms']:>7.3f}ms "
+                  f"{s['p99_ms']:>7.3f}ms {s['max_ms']:>7.2f}ms {rps}")
+    for mode, summary in results.items():
+        if summary['request']['errors']:
+            print(f"{mode}: {summary['request']['errors']} failed requests")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Overhead of the /metrics instrumentation: one observation and one scrape.
+
+Times Histogram.observe and a ``with histogram.time(...)`` span around an
+empty block, single-threaded and with several threads contending for the
+same series, then renders a registry the size of the app's.
+
+Usage: python benchmarks/bench_metrics.py [--calls 200000] [--threads 4]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import metrics
+
+ROUTES = {'submit': ['pdf_extract', 'keywords', 'encode', 'similarity', 'db_insert', 'job_index',
+                     'highlight', 'render'],
+          'dashboard': ['query', 'render'], 'export_pdf': ['report']}
+
+
+def per_call_us(fn, calls, threads=1):
+    def run():
+        for _ in range(calls // threads):
+            fn()
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    registry = metrics.Registry()
+    stages = registry.histogram('stage_seconds', 'Stage time', ['route', 'stage'])
+
+    def span():
+        with stages.time('submit', 'encode'):
+            pass
+
+    print(f"{'operation':<28} {'1 thread us':>12} {f'{args.threads} threads us':>14}")
+    for name, fn in (('observe', lambda: stages.observe(0.003, 'submit', 'encode')), ('with time()', span)):
+        print(f"{name:<28} {per_call_us(fn, args.calls):>12.2f} "
+              f"{per_call_us(fn, args.calls, args.threads):>14.2f}")
+
+    for route, names in ROUTES.items():
+        for stage in names:
+            stages.observe(0.01, route, stage)
+    requests = registry.histogram('request_seconds', 'Request time', ['endpoint', 'status'])
+    for endpoint in ('submit', 'dashboard', 'export_pdf', 'submissions', 'login', 'index'):
+        for status in ('200', '302'):
+            requests.observe(0.05, endpoint, status)
+    start = time.perf_counter()
+    for _ in range(100):
+        text = registry.render()
+    print(f"\nscrape ({len(text.splitlines())} lines)  {(time.perf_counter() - start) / 100 * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
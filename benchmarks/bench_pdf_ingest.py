@@ -0,0 +1,85 @@
+"""Throughput of resume PDF text extraction on a generated multi-page corpus.
+
+Builds PDFs of varying length with reportlab and extracts MAX_TEXT_LENGTH
+characters from each: the old way (every page concatenated, then truncated),
+page by page with an early stop, and through PdfExtractor's process pool.
+
+Usage: python benchmarks/bench_pdf_ingest.py [--docs 40] [--pages 2,8,30] [--workers 4]
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import PyPDF2
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+import pdf_ingest
+
+WORDS = ('python flask sql docker kubernetes aws machine learning data pipeline '
+         'team lead delivered improved designed built scalable services api '
+         'testing monitoring analytics react javascript cloud security').split()
+LINES_PER_PAGE = 50
+
+
+def make_pdf(pages, rng):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    for _ in range(pages):
+        y = 750
+        for _ in range(LINES_PER_PAGE):
+            pdf.drawString(40, y, ' '.join(rng.choice(WORDS) for _ in range(12)))
+            y -= 14
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def full_extract(data, max_chars):
+    """The original submit() loop: every page, then truncate"""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    text = ''
+    for page in reader.pages:
+        text += page.extract_text() + '\n'
+    return text[:max_chars]
+
+
+def run(extract, corpus):
+    start = time.perf_counter()
+    texts = [extract(data) for data in corpus]
+    return len(corpus) / (time.perf_counter() - start), texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=40, help='documents per page count')
+    parser.add_argument('--pages', default='2,8,30', help='comma-separated page counts')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--max-chars', type=int, default=pdf_ingest.MAX_TEXT_LENGTH)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    extractor = pdf_ingest.PdfExtractor(processes=args.workers, max_chars=args.max_chars)
+    try:
+        print(f"{'pages':>5} {'full docs/s':>12} {'stream docs/s':>14} {'pool docs/s':>12}")
+        for pages in (int(p) for p in args.pages.split(',')):
+            corpus = [make_pdf(pages, rng) for _ in range(args.docs)]
+            extractor.extract(corpus[0])  # start the pool outside the timing
+
+            full_rate, expected = run(lambda d: full_extract(d, args.max_chars), corpus)
+            stream_rate, streamed = run(lambda d: pdf_ingest.extract_text(d, args.max_chars), corpus)
+            pool_rate, pooled = run(extractor.extract, corpus)
+            assert streamed == expected and pooled == expected, 'extracted text differs'
+            print(f"{pages:>5} {full_rate:>12.1f} {stream_rate:>14.1f} {pool_rate:>12.1f}")
+    finally:
+        extractor.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Per-stage timings of the matching pipeline, in process, written as JSON.
+
+Generates a synthetic corpus (see corpus.py) and times each stage of /submit
+on its own: PDF text extraction, keyword extraction, model.encode, cosine
+scoring, the database insert, keyword highlighting and rendering
+result.html. It then drives whole POST /submit requests through the Flask
+test client. Every request uses a fresh resume text, so the embedding cache
+never answers. Results go to --output; diff two runs with compare_results.py.
+
+The app runs against a temporary database and job index. Outbound email is
+pointed at a closed local port. NLTK data must be installed as for running the app.
+--synthetic swaps the model for the CPU-spinning stand-in of
+bench_embedding_server.py.
+
+Usage: python benchmarks/bench_pipeline.py [--docs 20] [--repeats 3] [--requests 40]
+           [--output pipeline.json] [--synthetic]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import corpus
+import harness
+
+STAGES = ['pdf_extract', 'extract_keywords', 'encode', 'cosine', 'db_insert', 'highlight', 'render']
+
+
+def configure(tmpdir):
+    """Point the app at throwaway state before it is imported"""
+    os.environ['DATABASE_PATH'] = os.path.join(tmpdir, 'bench.db')
+    os.environ['JOB_INDEX_PATH'] = os.path.join(tmpdir, 'job_index')
+    os.environ.setdefault('HUNTER_API_URL', 'http://127.0.0.1:9/')
+    os.environ.setdefault('HUNTER_SEND_URL', 'http://127.0.0.1:9/')
+    os.environ.setdefault('RENDER_REPORTS_ON_SUBMIT', '0')  # no background renders between samples
+
+
+def time_stages(rm, resumes, jobs, pdfs, repeats, user_id):
+    """Run every stage once per (resume, job) pair, repeats times over the corpus"""
+    from flask import render_template
+    import db
+    import pdf_ingest
+    import submission_store
+    from similarity import cosine_scores
+
+    model = rm.model_loader.get_model()
+    samples = {stage: [] for stage in STAGES}
+    with rm.app.test_request_context('/submit', method='POST'):
+        for _ in range(repeats):
+            for resume, job, pdf in zip(resumes, jobs, pdfs):
+                _, seconds = harness.timed(pdf_ingest.extract_text, pdf, rm.MAX_TEXT_LENGTH)
+                samples['pdf_extract'].append(seconds)
+
+                resume_keywords, seconds = harness.timed(rm.extract_keywords, resume)
+                samples['extract_keywords'].append(seconds)
+                job_keywords, seconds = harness.timed(rm.extract_keywords, job)
+                samples['extract_keywords'].append(seconds)
+                matching = resume_keywords & job_keywords
+
+                # The model itself, bypassing the embedding cache
+                vectors, seconds = harness.timed(model.encode, [resume, job], batch_size=rm.ENCODE_BATCH_SIZE,
+                                                 convert_to_numpy=True, show_progress_bar=False)
+                samples['encode'].append(seconds)
+
+                scores, seconds = harness.timed(cosine_scores, vectors[0], vectors[1][None])
+                samples['cosine'].append(seconds)
+                score = float(scores[0]) * 100
+
+                def insert():
+                    with db.transaction() as conn:
+                        return submission_store.save_submission(conn, user_id, resume, job, score, matching)
+                _, seconds = harness.timed(insert)
+                samples['db_insert'].append(seconds)
+
+                highlighted_resume, seconds = harness.timed(rm.highlight_keywords, resume, matching)
+                samples['highlight'].append(seconds)
+                highlighted_job, seconds = harness.timed(rm.highlight_keywords, job, matching)
+                samples['highlight'].append(seconds)
+
+                _, seconds = harness.timed(
+                    render_template, 'result.html', message="Submission saved successfully!", score=score,
+                    matching_keywords=', '.join(matching), highlighted_resume=highlighted_resume,
+                    highlighted_job_desc=highlighted_job, missing_keywords='', sections=None)
+                samples['render'].append(seconds)
+    return {stage: harness.summarize(values) for stage, values in samples.items()}
+
+
+def time_requests(rm, resumes, jobs, count):
+    """Whole POST /submit requests through the test client, one new resume text each"""
+    client = rm.app.test_client()
+    client.post('/register', data={'username': 'benchclient', 'email': 'bench@example.com',
+                                   'password': 'benchmark1'})
+    client.post('/login', data={'username': 'benchclient', 'password': 'benchmark1'})
+    seconds = []
+    for i in range(count):
+        form = {'resume_text': f'{resumes[i % len(resumes)]}\nRef {i}', 'job_desc': jobs[i % len(jobs)]}
+        response, elapsed = harness.timed(client.post, '/submit', data=form)
+        if response.status_code != 200:
+            raise RuntimeError(f"/submit returned {response.status_code}")
+        seconds.append(elapsed)
+    return {'submit': harness.summarize(seconds)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=20, help='resume/job pairs in the corpus')
+    parser.add_argument('--resume-chars', type=int, default=3000)
+    parser.add_argument('--job-chars', type=int, default=1200)
+    parser.add_argument('--repeats', type=int, default=3, help='passes over the corpus per stage')
+    parser.add_argument('--requests', type=int, default=40, help='end-to-end /submit requests')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='pipeline.json')
+    parser.add_argument('--synthetic', action='store_true', help='use a CPU-spinning fake model')
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+
+    resumes, jobs = corpus.generate(args.docs, args.docs, args.resume_chars, args.job_chars, seed=args.seed)
+    pdfs = [corpus.to_pdf(text) for text in resumes]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        configure(tmpdir)
+        os.chdir(ROOT)
+        import resume_matcher as rm
+        import db
+
+        if args.synthetic:
+            from bench_embedding_server import SyntheticModel
+            rm.model_loader._model = SyntheticModel(5, 2)
+        _, load_seconds = harness.timed(rm.model_loader.get_model)
+        rm.encode_texts(['warm up'])
+        rm.highlight_keywords(resumes[0], {'python'})
+
+        with db.transaction() as conn:
+            user_id = conn.execute("INSERT INTO users (username, password, email) VALUES ('bench', 'x', 'b@example.com')").lastrowid
+        stages = time_stages(rm, resumes, jobs, pdfs, args.repeats, user_id)
+        requests = time_requests(rm, resumes, jobs, args.requests)
+        rm.notification_worker.stop(timeout=5)
+        db.close_connections()
+
+    harness.print_table('stages', stages)
+    harness.print_table('requests', requests)
+    harness.write_results(output, args, model_load_seconds=load_seconds, stages=stages, requests=requests)
+
+
+if __name__ == '__main__':
+    main()
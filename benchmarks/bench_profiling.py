@@ -0,0 +1,72 @@
+"""Cost of request profiling on /submit: unprofiled vs profiled requests.
+
+Sends POST /submit through the Flask test client with sampling off, then with
+every request profiled. From the two, it works out the mean latency cost at
+the given sample rate. Profiles go to a temporary directory. The app runs as
+in bench_pipeline.py, so NLTK data must be installed. --synthetic swaps the
+model for the CPU-spinning stand-in.
+
+Usage: python benchmarks/bench_profiling.py [--requests 100] [--rate 0.01] [--synthetic]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import corpus
+import harness
+from bench_pipeline import configure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--rate', type=float, default=0.01, help='sample rate to estimate the mean cost for')
+    parser.add_argument('--synthetic', action='store_true', help='use a CPU-spinning fake model')
+    args = parser.parse_args()
+
+    resumes, jobs = corpus.generate(20, 20)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        configure(tmpdir)
+        os.environ['PROFILE_DIR'] = os.path.join(tmpdir, 'profiles')
+        os.chdir(ROOT)
+        import resume_matcher as rm
+
+        if args.synthetic:
+            from bench_embedding_server import SyntheticModel
+            rm.model_loader._model = SyntheticModel(5, 2)
+        client = rm.app.test_client()
+        client.post('/register', data={'username': 'benchclient', 'email': 'bench@example.com',
+                                       'password': 'benchmark1'})
+        client.post('/login', data={'username': 'benchclient', 'password': 'benchmark1'})
+
+        def run(sample_rate, offset):
+            rm.request_profiler.sample_rate = sample_rate
+            seconds = []
+            for i in range(args.requests):
+                form = {'resume_text': f'{resumes[i % len(resumes)]}\nRef {offset + i}',
+                        'job_desc': jobs[i % len(jobs)]}
+                _, elapsed = harness.timed(client.post, '/submit', data=form)
+                seconds.append(elapsed)
+                rm.request_profiler.flush()  # keep the writer out of the next sample
+            return harness.summarize(seconds)
+
+        run(0.0, -20)  # warm up
+        plain = run(0.0, 0)
+        profiled = run(1.0, args.requests)
+        captures = len(rm.request_profiler.slowest(limit=10 ** 6))
+        rm.notification_worker.stop(timeout=5)
+
+    harness.print_table('/submit', {'unprofiled': plain, 'profiled': profiled})
+    extra = profiled['mean_ms'] - plain['mean_ms']
+    print(f"\nprofiling adds {extra:.2f} ms ({extra / plain['mean_ms'] * 100:.0f}%) to a profiled request; "
+          f"at a {args.rate:.2%} sample rate that is {extra * args.rate:.3f} ms "
+          f"({extra * args.rate / plain['mean_ms'] * 100:.2f}%) per request on average. "
+          f"{captures} captures kept.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""PDF export cost: per-request rendering vs the report cache, and bulk zip memory.
+
+Times the old export_pdf (a new stylesheet and document on every request),
+a cold render with the shared styles, and a cached fetch. It then builds an
+"export all" archive twice: once streamed with reports.stream_zip, and once
+buffered in memory, tracking peak Python allocations for each.
+
+Usage: python benchmarks/bench_reports.py [--submissions 200]
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import db
+import reports
+
+RESUME = ('Experienced Python developer with Flask, Django and React. Built REST APIs, '
+          'data pipelines and CI/CD on AWS. ') * 12
+JOB = 'Senior Python developer: Flask or Django, SQL, AWS, Docker, Kubernetes. ' * 12
+
+
+def legacy_render(resume_text, job_desc, score, matching_keywords):
+    """export_pdf as it was: stylesheet and styles rebuilt per request"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = []
+    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24, spaceAfter=30)
+    story.append(Paragraph("Resume Keyword Matcher Submission", title_style))
+    story.append(Spacer(1, 20))
+    score_style = ParagraphStyle('Score', parent=styles['Normal'], fontSize=16,
+                                 textColor=colors.blue, spaceAfter=20)
+    story.append(Paragraph(f"Match Score: {score:.2f}%", score_style))
+    story.append(Spacer(1, 20))
+    for heading, text in (("Resume Text:", resume_text), ("Job Description:", job_desc)):
+        story.append(Paragraph(heading, styles['Heading2']))
+        story.append(Spacer(1, 10))
+        story.append(Paragraph(text[:1000] + "...", styles['Normal']))
+        story.append(Spacer(1, 20))
+    story.append(Paragraph("Matching Keywords:", styles['Heading2']))
+    story.append(Spacer(1, 10))
+    story.append(Paragraph(matching_keywords, styles['Normal']))
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def per_call_ms(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1000
+
+
+def peak_kb(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--submissions', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'bench.db')
+        db.migrate(path)
+        with db.transaction(path) as conn:
+            conn.execute("INSERT INTO users (username, password, email) VALUES ('u', 'x', 'u@example.com')")
+            conn.executemany('''
+                INSERT INTO submissions (user_id, resume_text, job_desc, score, matching_keywords)
+                VALUES (1, ?, ?, ?, 'python,flask,sql,aws')
+            ''', [(f'{i} {RESUME}', f'{i} {JOB}', 40 + i % 50) for i in range(args.submissions)])
+        ids = [row[0] for row in db.query_all('SELECT id FROM submissions ORDER BY id', path=path)]
+        rows = {row[0]: row[1:] for row in db.query_all(
+            'SELECT id, resume_text, job_desc, score, matching_keywords FROM submissions', path=path)}
+
+        renderer = reports.ReportRenderer(path)
+        sample = ids[:min(50, len(ids))]
+        legacy_ms = per_call_ms(lambda i: legacy_render(*rows[i]), sample)
+        cold_ms = per_call_ms(renderer.get, sample)
+        cached_ms = per_call_ms(renderer.get, sample)
+        for i in ids:
+            renderer.get(i)
+
+        print(f"per export (mean of {len(sample)}):")
+        print(f"  old export_pdf     {legacy_ms:8.2f} ms")
+        print(f"  cold render        {cold_ms:8.2f} ms")
+        print(f"  cached             {cached_ms:8.3f} ms")
+
+        def streamed():
+            size = 0
+            for chunk in reports.stream_zip((f'submission_{i}.pdf', renderer.get(i)) for i in ids):
+                size += len(chunk)
+            return size
+
+        def buffered():
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w') as archive:
+                for i in ids:
+                    archive.writestr(f'submission_{i}.pdf', renderer.get(i))
+            return buffer.getvalue()
+
+        size = streamed()
+        print(f"\nexport all ({len(ids)} submissions, {size / 1024:.0f} KB archive):")
+        print(f"  streamed zip peak  {peak_kb(streamed):8.0f} KB")
+        print(f"  buffered zip peak  {peak_kb(buffered):8.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Startup time of a worker: app import broken down per package, then model load.
+
+Imports resume_matcher in a fresh interpreter under ``-X importtime`` and
+sums the exclusive import time of every module by top-level package. It
+then loads the sentence-transformers model through model_loader and
+reports how long that took and the process RSS before and after. A
+gunicorn worker forked from a master with PRELOAD_MODEL skips the model
+load entirely.
+
+Usage: python benchmarks/bench_startup.py [--top 15] [--skip-model]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import json, resource, sys, time
+start = time.perf_counter()
+import resume_matcher
+report = {'import_seconds': time.perf_counter() - start,
+          'import_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+if not SKIP_MODEL:
+    try:
+        import model_loader
+        model_loader.get_model()
+        report['model_seconds'] = model_loader.load_seconds
+        report['model_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except Exception as e:
+        report['model_error'] = repr(e)
+print(json.dumps(report))
+'''
+
+
+def parse_importtime(stderr):
+    """Exclusive microseconds per top-level package from -X importtime output"""
+    totals = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        totals[name.strip().split('.')[0]] += int(self_us)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=15, help='packages to list')
+    parser.add_argument('--skip-model', action='store_true', help='only time the app import')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ,
+                   DATABASE_PATH=os.path.join(tmpdir, 'matches.db'),
+                   JOB_INDEX_PATH=os.path.join(tmpdir, 'job_index'))
+        code = CHILD.replace('SKIP_MODEL', str(args.skip_model))
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr[-2000:])
+        sys.exit(result.returncode)
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    totals = parse_importtime(result.stderr)
+    print(f"{'package':<28} {'import ms':>10}")
+    for name, us in sorted(totals.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<28} {us / 1000:>10.1f}")
+    print(f"{'all modules':<28} {sum(totals.values()) / 1000:>10.1f}")
+    print()
+    print(f"import resume_matcher: {report['import_seconds'] * 1000:.0f} ms, "
+          f"RSS {report['import_rss_mb']:.0f} MB")
+    if 'model_seconds' in report:
+        print(f"model load:            {report['model_seconds'] * 1000:.0f} ms, "
+              f"RSS {report['model_rss_mb']:.0f} MB")
+    elif 'model_error' in report:
+        print(f"model load failed: {report['model_error']}")
+
+
+if __name__ == '__main__':
+    main()
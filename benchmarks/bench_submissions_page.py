@@ -0,0 +1,107 @@
+"""/submissions render time and memory: whole history vs one keyset page.
+
+Fills a database with one user's submissions (full-size texts), then renders
+submissions.html the old way, from every row with full texts, and the new
+way, one page of previews read from idx_submissions_listing. Both the newest
+page and a page deep in the history are timed. Peak Python allocations are
+tracked with tracemalloc in a separate pass.
+
+The app is imported, so NLTK data must be installed as for running it.
+
+Usage: python benchmarks/bench_submissions_page.py [--rows 100000] [--resume-chars 8000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+LEGACY_QUERY = '''
+    SELECT id, resume_text, job_desc, score, matching_keywords
+    FROM submissions WHERE user_id = ? ORDER BY id DESC
+'''
+
+
+def populate(path, rows, resume_chars, job_chars):
+    import db
+
+    db.migrate(path)
+    resume = ('Python developer, Flask and SQL, built data pipelines on AWS. ' * (resume_chars // 60 + 1))[:resume_chars]
+    job = ('Looking for a backend engineer with Python, Docker and Kubernetes. ' * (job_chars // 60 + 1))[:job_chars]
+    with db.transaction(path) as conn:
+        conn.execute("INSERT INTO users (username, password, email) VALUES ('u', 'x', 'u@example.com')")
+        conn.executemany('''
+            INSERT INTO submissions
+            (user_id, resume_text, job_desc, score, matching_keywords, resume_preview, job_preview)
+            VALUES (1, ?, ?, ?, 'python,flask,sql', ?, ?)
+        ''', ((f'{i} {resume}', f'{i} {job}', i % 100, f'{i} {resume}'[:db.PREVIEW_CHARS],
+               f'{i} {job}'[:db.PREVIEW_CHARS]) for i in range(rows)))
+    db.close_connections()
+
+
+def measure(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeats * 1000
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--resume-chars', type=int, default=8000)
+    parser.add_argument('--job-chars', type=int, default=4000)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'bench.db')
+        os.environ['DATABASE_PATH'] = path
+        start = time.perf_counter()
+        populate(path, args.rows, args.resume_chars, args.job_chars)
+        print(f"Populated {args.rows} submissions ({os.path.getsize(path) / 1024 / 1024:.0f} MB) "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        os.chdir(ROOT)
+        from flask import render_template
+        import db
+        import resume_matcher
+        import submission_store
+
+        middle = args.rows // 2
+
+        def legacy():
+            rows = db.query_all(LEGACY_QUERY, (1,))
+            return render_template('submissions.html', newer=None, older=None, submissions=[
+                (row[0], row[1][:100], row[2][:100], row[3], row[4]) for row in rows])
+
+        def page(before=None):
+            result = submission_store.submissions_page(1, before=before)
+            return render_template('submissions.html', submissions=result['rows'],
+                                   newer=result['newer'], older=result['older'])
+
+        cases = [
+            ('all rows, full texts', legacy, 1),
+            ('newest page', page, args.repeats),
+            ('page from the middle', lambda: page(before=middle), args.repeats),
+            ('one full text', lambda: submission_store.submission_texts(1, middle), args.repeats),
+        ]
+        print(f"{'render':<22} {'ms':>10} {'peak MB':>9}")
+        with resume_matcher.app.test_request_context('/submissions'):
+            for name, fn, repeats in cases:
+                elapsed, peak = measure(fn, repeats)
+                print(f"{name:<22} {elapsed:>10.2f} {peak:>9.2f}")
+        db.close_connections()
+
+
+if __name__ == '__main__':
+    main()
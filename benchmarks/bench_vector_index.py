@@ -0,0 +1,68 @@
+"""Recall vs latency of the job index IVF search.
+
+Builds a JobIndex over synthetic clustered embeddings and reports recall@k
+and query latency for several nprobe settings against the exact scan.
+
+Usage: python benchmarks/bench_vector_index.py [--rows 100000] [--dim 384]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from similarity import normalize_rows
+from vector_index import JobIndex
+
+
+def synthetic_vectors(rows, dim, clusters, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = normalize_rows(rng.normal(size=(clusters, dim)))
+    noise = 2.0 / np.sqrt(dim) * rng.normal(size=(rows, dim))
+    return normalize_rows(centers[rng.integers(0, clusters, rows)] + noise)
+
+
+def time_queries(index, queries, k, **kwargs):
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, k, **kwargs)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--clusters', type=int, default=500)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--k', type=int, default=20)
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.rows + args.queries, args.dim, args.clusters)
+    corpus, queries = vectors[:args.rows], vectors[args.rows:]
+
+    with tempfile.TemporaryDirectory() as path:
+        index = JobIndex(path)
+        start = time.perf_counter()
+        index.add(list(range(args.rows)), [f'{i:x}' for i in range(args.rows)], corpus)
+        index.train()
+        print(f"Indexed {args.rows} x {args.dim} in {time.perf_counter() - start:.2f}s "
+              f"({len(index.centroids)} lists)")
+
+        exact_ms = time_queries(index, queries, args.k, exact=True)
+        print(f"{'nprobe':>8} {'recall@' + str(args.k):>10} {'ms/query':>10}")
+        print(f"{'exact':>8} {1.0:>10.3f} {exact_ms:>10.2f}")
+        for nprobe in (1, 2, 4, 8, 16, 32, 64):
+            if nprobe > len(index.centroids):
+                break
+            recall = index.recall(queries, args.k, nprobe=nprobe)
+            ms = time_queries(index, queries, args.k, nprobe=nprobe)
+            print(f"{nprobe:>8} {recall:>10.3f} {ms:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Compare match scores of the ONNX encoder backends with sentence-transformers.
+
+Scores test_resume.txt against every posting in test_jobs.txt with the
+reference backend and with each candidate backend. It prints the score
+differences in percentage points and whether the postings rank in the same
+order. The script exits non-zero when any score drifts by more than
+--tolerance points.
+
+Usage: python benchmarks/check_encoder_accuracy.py [--backends onnx,onnx-int8] [--tolerance 1.0]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import encoders
+from similarity import cosine_scores
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+
+def load_samples():
+    with open(os.path.join(ROOT, 'test_resume.txt'), 'r') as f:
+        resume_text = f.read()
+    with open(os.path.join(ROOT, 'test_jobs.txt'), 'r') as f:
+        sections = [s.strip() for s in f.read().split('\n# ') if s.strip()]
+    titles = [s.lstrip('# ').splitlines()[0] for s in sections]
+    jobs = ['\n'.join(s.splitlines()[1:]) for s in sections]
+    return resume_text, titles, jobs
+
+
+def score(encoder, resume_text, jobs):
+    embeddings = encoder.encode([resume_text] + jobs, convert_to_numpy=True, show_progress_bar=False)
+    return cosine_scores(embeddings[0], embeddings[1:]) * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backends', default='onnx,onnx-int8')
+    parser.add_argument('--tolerance', type=float, default=1.0, help='max allowed drift in points')
+    parser.add_argument('--model-dir', default=encoders.ONNX_MODEL_DIR)
+    args = parser.parse_args()
+
+    resume_text, titles, jobs = load_samples()
+    reference = score(encoders.load_encoder(MODEL_NAME), resume_text, jobs)
+    reference_order = list(reference.argsort()[::-1])
+
+    failed = False
+    for backend in args.backends.split(','):
+        scores = score(encoders.load_encoder(MODEL_NAME, backend, args.model_dir), resume_text, jobs)
+        diffs = scores - reference
+        same_order = list(scores.argsort()[::-1]) == reference_order
+        print(f"\n{backend}")
+        print(f"{'posting':<40} {'reference':>9} {backend:>10} {'diff':>7}")
+        for title, ref, got, diff in zip(titles, reference, scores, diffs):
+            print(f"{title[:40]:<40} {ref:>9.2f} {got:>10.2f} {diff:>+7.2f}")
+        max_diff = abs(diffs).max()
+        print(f"max |diff| {max_diff:.3f} points, mean |diff| {abs(diffs).mean():.3f}, "
+              f"ranking {'unchanged' if same_order else 'CHANGED'}")
+        failed = failed or max_diff > args.tolerance
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
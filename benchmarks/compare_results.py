@@ -0,0 +1,59 @@
+"""Compare two result files from bench_pipeline.py or loadgen.py.
+
+Prints every measurement found in both files with its change, and marks
+latencies that grew, or throughput that fell, by more than --threshold.
+Exits with status 1 if anything regressed, so it can gate a CI job.
+
+Usage: python benchmarks/compare_results.py BASELINE.json CANDIDATE.json [--threshold 10]
+           [--metric p50_ms]
+"""
+import argparse
+import json
+import sys
+
+
+def measurements(result, metric):
+    """{(section, name, metric): value} for every summary in a result file"""
+    values = {}
+    for section, rows in result.items():
+        if section == 'meta' or not isinstance(rows, dict):
+            continue
+        for name, summary in rows.items():
+            for key in (metric, 'rps'):
+                if isinstance(summary, dict) and summary.get(key) is not None:
+                    values[(section, name, key)] = summary[key]
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10, help='percent change that counts as a regression')
+    parser.add_argument('--metric', default='p50_ms', help='latency field to compare, e.g. p95_ms')
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    print(f"baseline  {baseline['meta'].get('commit')}  {baseline['meta'].get('created_at')}")
+    print(f"candidate {candidate['meta'].get('commit')}  {candidate['meta'].get('created_at')}")
+
+    before = measurements(baseline, args.metric)
+    after = measurements(candidate, args.metric)
+    regressions = 0
+    print(f"\n{'measurement':<36} {'baseline':>10} {'candidate':>10} {'change':>8}")
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        change = (new - old) / old * 100 if old else 0.0
+        # Latency should go down, throughput up
+        worse = change > args.threshold if key[2] != 'rps' else change < -args.threshold
+        regressions += worse
+        name = '/'.join(key)
+        print(f"{name:<36} {old:>10.3f} {new:>10.3f} {change:>+7.1f}%{'  REGRESSION' if worse else ''}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
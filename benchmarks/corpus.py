@@ -0,0 +1,81 @@
+"""Synthetic resumes and job descriptions seeded from test_resume.txt and test_jobs.txt.
+
+The sample files give the shape of the documents: section headings, bullet
+lines and the technical vocabulary. Generated documents reuse those lines
+with the skills swapped for others from the same vocabulary and repeated up
+to a target length, so a given seed always yields the same corpus.
+"""
+import io
+import os
+import random
+import re
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SKILLS = ('python javascript typescript java sql flask django react angular vue node express '
+          'postgresql mongodb redis sqlite docker kubernetes aws azure gcp git linux jenkins '
+          'circleci terraform ansible graphql restful microservices pandas spark').split()
+_SKILL = re.compile(r'\b(' + '|'.join(SKILLS) + r')\b', re.IGNORECASE)
+
+
+def _read(name):
+    with open(os.path.join(ROOT, name)) as f:
+        return f.read()
+
+
+def seed_lines():
+    """(resume lines, job description blocks) from the sample files"""
+    resume_lines = [line for line in _read('test_resume.txt').splitlines() if line.strip()]
+    jobs = [block.strip() for block in re.split(r'^# .*$', _read('test_jobs.txt'), flags=re.MULTILINE)
+            if block.strip()]
+    return resume_lines, jobs
+
+
+def _mutate(line, rng):
+    return _SKILL.sub(lambda m: rng.choice(SKILLS) if rng.random() < 0.5 else m.group(0), line)
+
+
+def _grow(lines, chars, rng):
+    text = []
+    size = 0
+    while size < chars:
+        line = _mutate(rng.choice(lines), rng)
+        text.append(line)
+        size += len(line) + 1
+    return '\n'.join(text)[:chars]
+
+
+def generate(resumes=20, jobs=20, resume_chars=3000, job_chars=1200, seed=0):
+    """Return (resumes, jobs): lists of synthetic texts around the given lengths"""
+    rng = random.Random(seed)
+    resume_lines, job_blocks = seed_lines()
+    job_lines = [line for block in job_blocks for line in block.splitlines() if line.strip()]
+    resume_texts = []
+    for _ in range(resumes):
+        head = '\n'.join(resume_lines[:2])  # name and title
+        resume_texts.append(head + '\n' + _grow(resume_lines[2:], resume_chars, rng))
+    job_texts = []
+    for _ in range(jobs):
+        head = _mutate(rng.choice(job_blocks), rng)
+        job_texts.append(head + '\n' + _grow(job_lines, max(0, job_chars - len(head)), rng))
+    return resume_texts, job_texts
+
+
+def to_pdf(text):
+    """Lay text out as a PDF, one line per text line, as a resume upload"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    y = 750
+    for line in text.splitlines():
+        while line:
+            pdf.drawString(40, y, line[:95])
+            line = line[95:]
+            y -= 14
+            if y < 40:
+                pdf.showPage()
+                y = 750
+    pdf.save()
+    return buffer.getvalue()
@@ -0,0 +1,86 @@
+"""Timing summaries and JSON result files shared by bench_pipeline.py and loadgen.py.
+
+A result file holds a ``meta`` block (commit, Python, platform, CPUs, the
+arguments used) next to the measurements, so two runs can be compared with
+compare_results.py.
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(1, math.ceil(q / 100 * len(sorted_values))) - 1]
+
+
+def summarize(seconds):
+    """Latency summary in milliseconds of a list of durations in seconds"""
+    values = sorted(s * 1000 for s in seconds)
+    if not values:
+        return {'n': 0}
+    return {
+        'n': len(values),
+        'mean_ms': sum(values) / len(values),
+        'p50_ms': percentile(values, 50),
+        'p95_ms': percentile(values, 95),
+        'p99_ms': percentile(values, 99),
+        'max_ms': values[-1],
+    }
+
+
+def timed(fn, *args, **kwargs):
+    """Call fn and return (result, seconds)"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args):
+    return {
+        'commit': git_commit(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'args': vars(args),
+    }
+
+
+def write_results(path, args, **sections):
+    """Write {'meta': ..., **sections} to path as JSON"""
+    with open(path, 'w') as f:
+        json.dump({'meta': metadata(args), **sections}, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"Results written to {path}")
+
+
+def print_table(title, rows):
+    """Print {name: summary} as an aligned table"""
+    print(f"\n{title}")
+    print(f"{'':<22} {'n':>6} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for name, s in rows.items():
+        if not s.get('n'):
+            print(f"{name:<22} {'skipped':>6}")
+            continue
+        print(f"{name:<22} {s['n']:>6} {s['mean_ms']:>10.3f} {s['p50_ms']:>10.3f} "
+              f"{s['p95_ms']:>10.3f} {s['p99_ms']:>10.3f}")
@@ -0,0 +1,123 @@
+"""HTTP load generator for a running app: latency percentiles and throughput.
+
+Starts --workers processes. Each one logs in with its own session and sends
+requests back to back, closed loop, for --duration seconds after a shared
+start time. Requests that start inside the --warmup window are not
+counted. /submit posts synthetic resume/job pairs from corpus.py, each
+resume made unique so the embedding cache is bypassed unless --reuse-texts
+is given. The user is registered first if it doesn't exist. Results go to
+--output; diff two runs with compare_results.py.
+
+Usage: python benchmarks/loadgen.py [--url http://127.0.0.1:5000] [--path /submit]
+           [--workers 8] [--duration 30] [--warmup 5] [--output load.json]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+
+import corpus
+import harness
+
+
+def login(args):
+    session = requests.Session()
+    response = session.post(f'{args.url}/login', data={'username': args.username, 'password': args.password},
+                            allow_redirects=False, timeout=args.timeout)
+    if response.status_code != 302:
+        raise RuntimeError(f"Login as {args.username} failed")
+    return session
+
+
+def ensure_user(args):
+    requests.post(f'{args.url}/register', data={'username': args.username, 'password': args.password,
+                                                'email': f'{args.username}@example.com'},
+                  allow_redirects=False, timeout=args.timeout)
+    login(args)
+
+
+def run_worker(worker, args, start_at):
+    """Send requests until the run ends; returns (latencies, status counts, error count)"""
+    resumes, jobs = corpus.generate(args.docs, args.docs, seed=args.seed + worker)
+    session = login(args)
+    latencies = []
+    statuses = {}
+    errors = 0
+    sent = 0
+    time.sleep(max(0.0, start_at - time.time()))
+    measure_from = time.perf_counter() + args.warmup
+    stop_at = measure_from + args.duration
+    while True:
+        started = time.perf_counter()
+        if started >= stop_at:
+            break
+        try:
+            if args.path == '/submit':
+                resume = resumes[sent % len(resumes)]
+                if not args.reuse_texts:
+                    resume = f'{resume}\nRef {worker}-{sent}'
+                response = session.post(f'{args.url}/submit', data={
+                    'resume_text': resume, 'job_desc': jobs[sent % len(jobs)]
+                }, allow_redirects=False, timeout=args.timeout)
+            else:
+                response = session.get(f'{args.url}{args.path}', allow_redirects=False, timeout=args.timeout)
+            status = response.status_code
+        except requests.RequestException:
+            status = 'error'
+        elapsed = time.perf_counter() - started
+        sent += 1
+        if started < measure_from:
+            continue
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == 200:
+            latencies.append(elapsed)
+        else:
+            errors += 1
+    return latencies, statuses, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--path', default='/submit', help='/submit, or any GET route such as /submissions')
+    parser.add_argument('--workers', type=int, default=8, help='concurrent client processes')
+    parser.add_argument('--duration', type=float, default=30, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='seconds discarded at the start')
+    parser.add_argument('--username', default='loadgen')
+    parser.add_argument('--password', default='loadgen1')
+    parser.add_argument('--docs', type=int, default=20, help='resume/job pairs per worker')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reuse-texts', action='store_true', help='let repeated texts hit the caches')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--output', default='load.json')
+    args = parser.parse_args()
+    args.url = args.url.rstrip('/')
+
+    ensure_user(args)
+    start_at = time.time() + 1  # let every worker log in before the clock starts
+    with multiprocessing.Pool(args.workers) as pool:
+        results = pool.starmap(run_worker, [(worker, args, start_at) for worker in range(args.workers)])
+
+    latencies = [seconds for result in results for seconds in result[0]]
+    statuses = {}
+    for _, counts, _ in results:
+        for status, count in counts.items():
+            statuses[str(status)] = statuses.get(str(status), 0) + count
+    summary = harness.summarize(latencies)
+    summary['rps'] = len(latencies) / args.duration
+    summary['errors'] = sum(result[2] for result in results)
+    summary['statuses'] = statuses
+
+    harness.print_table(f'{args.path} with {args.workers} workers', {args.path: summary})
+    print(f"{summary['rps']:.1f} requests/s, {summary['errors']} errors, statuses {statuses}")
+    harness.write_results(args.output, args, requests={args.path: summary})
+
+
+if __name__ == '__main__':
+    main()
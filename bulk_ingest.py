@@ -0,0 +1,142 @@
+"""Score and store resume/job pairs from a JSONL stream.
+
+Each input line is a JSON object with ``resume_text`` and ``job_desc``, and
+optionally an ``id`` that is echoed back. Lines are read incrementally and
+processed in chunks: every chunk is embedded in one batch and stored in one
+transaction. One JSON result per input line is written as soon as its chunk
+is done, so memory use does not depend on the size of the input.
+
+Usage:
+    python bulk_ingest.py --user alice < pairs.jsonl > results.jsonl
+    python bulk_ingest.py --user alice pairs.jsonl --output results.jsonl
+
+The same stream can be POSTed to /api/v1/ingest with an API token.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 128  # pairs per encode batch and per transaction
+MAX_LINE_BYTES = 256 * 1024  # two 10k-character texts, JSON-escaped, fit comfortably
+READ_BYTES = 64 * 1024
+
+
+def _lines(stream, max_line_bytes):
+    """Yield each line of stream without its newline, or None for an oversized one
+
+    Reads in blocks and splits them here: werkzeug's request stream serves
+    readline() a byte at a time. At most one block plus one line is held.
+    """
+    read = getattr(stream, 'read1', stream.read)  # don't wait for a full block on a pipe
+    pending = None
+    too_long = False
+    while True:
+        block = read(READ_BYTES)
+        if not block:
+            break
+        if pending is None:
+            pending = block[:0]
+        lines = (pending + block).split(b'\n' if isinstance(block, bytes) else '\n')
+        pending = lines.pop()
+        for line in lines:
+            if too_long:
+                too_long = False  # the tail of a line already reported
+                yield None
+            else:
+                yield line if len(line) <= max_line_bytes else None
+        if len(pending) > max_line_bytes:
+            too_long = True
+            pending = pending[:0]
+    if too_long:
+        yield None
+    elif pending:
+        yield pending
+
+
+def read_records(stream, max_line_bytes=MAX_LINE_BYTES):
+    """Yield ``(line number, record, error)`` for every non-blank line of stream
+
+    stream may be binary or text. Lines longer than max_line_bytes are
+    skipped without being held in memory. Exactly one of record and error
+    is None.
+    """
+    for line_number, line in enumerate(_lines(stream, max_line_bytes), 1):
+        if line is None:
+            yield line_number, None, f'Line longer than {max_line_bytes} bytes'
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, None, 'Invalid JSON'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, 'Expected a JSON object'
+            continue
+        for field in ('resume_text', 'job_desc'):
+            if not isinstance(record.get(field), str) or not record[field].strip():
+                yield line_number, None, f'Please provide {field}'
+                break
+        else:
+            yield line_number, record, None
+
+
+def chunked(items, size):
+    """Yield lists of up to size consecutive items"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', nargs='?', default='-', help='JSONL file, or - for stdin')
+    parser.add_argument('--user', required=True, help='username the submissions are stored under')
+    parser.add_argument('--chunk-size', type=int, help='pairs per encode batch and transaction '
+                                                       '(default: INGEST_CHUNK_SIZE or 128)')
+    parser.add_argument('--output', help='write JSONL results here instead of stdout')
+    args = parser.parse_args()
+
+    # Loads the model, caches and job index, and applies migrations
+    import db
+    import resume_matcher
+
+    row = db.query_one('SELECT id FROM users WHERE username = ?', (args.user,))
+    if row is None:
+        logger.error(f"Unknown user {args.user}")
+        sys.exit(1)
+
+    source = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    out = open(args.output, 'w') if args.output else sys.stdout
+    start = time.perf_counter()
+    stored = failed = 0
+    try:
+        for result in resume_matcher.ingest_jsonl(source, row[0],
+                                                   chunk_size=args.chunk_size or resume_matcher.INGEST_CHUNK_SIZE):
+            out.write(json.dumps(result) + '\n')
+            if 'error' in result:
+                failed += 1
+            else:
+                stored += 1
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    logger.info(f"Stored {stored} submissions, {failed} lines failed, in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
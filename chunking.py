@@ -0,0 +1,69 @@
+import re
+
+from similarity import pooled_chunk_scores
+
+# all-MiniLM-L6-v2 reads at most 256 word pieces; English averages ~1.3 per word
+CHUNK_WORDS = 180
+CHUNK_OVERLAP = 30  # words repeated between windows cut out of one long paragraph
+MAX_CHUNKS = 64  # per document, bounds the encode batch
+LABEL_WORDS = 8
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+
+def split_chunks(text, max_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP, max_chunks=MAX_CHUNKS):
+    """Split text into windows of at most max_words words
+
+    Paragraphs are packed together while they fit, so windows usually break
+    at section boundaries; a paragraph longer than a window is cut into
+    overlapping windows of its own.
+    """
+    chunks = []
+    current = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        words = paragraph.split()
+        if not words:
+            continue
+        if current and len(current) + len(words) > max_words:
+            chunks.append(current)
+            current = []
+        if len(words) <= max_words:
+            current.extend(words)
+            continue
+        step = max_words - overlap
+        for start in range(0, len(words), step):
+            chunks.append(words[start:start + max_words])
+            if start + max_words >= len(words):
+                break
+    if current:
+        chunks.append(current)
+    return [' '.join(words) for words in chunks[:max_chunks]]
+
+
+def chunk_label(chunk, words=LABEL_WORDS):
+    """Short label for a chunk: its opening words"""
+    head = chunk.split()[:words]
+    label = ' '.join(head)
+    return label + '...' if len(chunk.split()) > words else label
+
+
+def score_chunked(encode, resume_text, job_desc, pooling='max'):
+    """Score a resume against a job description chunk by chunk
+
+    Every chunk of both documents, plus the two whole documents, goes to
+    ``encode`` in one batch. Returns ``(score, sections, resume_embedding,
+    job_embedding)``: the pooled score in percent, one ``{'label', 'score'}``
+    entry per resume chunk in document order, and the whole-document
+    embeddings used by the upload cache and the job index.
+    """
+    resume_chunks = split_chunks(resume_text) or [resume_text]
+    job_chunks = split_chunks(job_desc) or [job_desc]
+    vectors = encode(resume_chunks + job_chunks + [resume_text, job_desc])
+    split = len(resume_chunks)
+    score, section_scores = pooled_chunk_scores(
+        vectors[:split], vectors[split:-2],
+        [max(1, len(c.split())) for c in resume_chunks], [max(1, len(c.split())) for c in job_chunks],
+        pooling=pooling)
+    sections = [{'label': chunk_label(chunk), 'score': float(s) * 100}
+                for chunk, s in zip(resume_chunks, section_scores)]
+    return score * 100, sections, vectors[-2], vectors[-1]
@@ -0,0 +1,413 @@
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.environ.get('DATABASE_PATH', 'matches.db')
+BUSY_TIMEOUT = 30  # seconds to wait for another worker's lock
+STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection
+PREVIEW_CHARS = 100  # stored excerpt of each text shown on /submissions
+
+# Per-connection tuning; journal_mode=WAL is persistent and set by migrate()
+PRAGMAS = (
+    ('synchronous', 'NORMAL'),  # safe with WAL, avoids an fsync per commit
+    ('cache_size', -64000),  # 64MB page cache
+    ('mmap_size', 256 * 1024 * 1024),
+    ('temp_store', 'MEMORY'),
+)
+
+
+def connect(path=None):
+    """Open a connection with the standard pragmas applied"""
+    conn = sqlite3.connect(path or DB_PATH, timeout=BUSY_TIMEOUT,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    for name, value in PRAGMAS:
+        conn.execute(f'PRAGMA {name} = {value}')
+    return conn
+
+
+_local = threading.local()
+
+
+def get_connection(path=None):
+    """Return this thread's long-lived connection to path, opening it on first use
+
+    Connections stay open for the life of the thread, so requests reuse the
+    connection and its prepared statement cache. They run in autocommit
+    mode; use transaction() to group writes. A forked child never reuses
+    its parent's connections.
+    """
+    path = path or DB_PATH
+    if getattr(_local, 'pid', None) != os.getpid():
+        _local.pid = os.getpid()
+        _local.connections = {}
+    conn = _local.connections.get(path)
+    if conn is None:
+        conn = connect(path)
+        conn.isolation_level = None
+        _local.connections[path] = conn
+    return conn
+
+
+def close_connections():
+    """Close every connection opened by the current thread"""
+    for conn in getattr(_local, 'connections', {}).values():
+        conn.close()
+    _local.connections = {}
+
+
+@contextmanager
+def transaction(path=None, immediate=False):
+    """Run the block in one transaction, committing on success
+
+    Nested use joins the outer transaction. ``immediate=True`` takes the
+    write lock up front, avoiding a lock upgrade failure for read-then-write
+    blocks.
+    """
+    conn = get_connection(path)
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+    try:
+        yield conn
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+
+def query_one(sql, params=(), path=None):
+    return get_connection(path).execute(sql, params).fetchone()
+
+
+def query_all(sql, params=(), path=None):
+    return get_connection(path).execute(sql, params).fetchall()
+
+
+def execute(sql, params=(), path=None):
+    """Execute a single statement and return its cursor"""
+    return get_connection(path).execute(sql, params)
+
+
+def add_cache_bytes(conn, name, delta, entries=0):
+    """Adjust a cache's stored size (and row count) in cache_totals and return the new size
+
+    Call inside the transaction that changed the cache, so the total stays
+    exact across every process sharing the database.
+    """
+    conn.execute('UPDATE cache_totals SET bytes = bytes + ?, entries = entries + ? WHERE name = ?',
+                 (delta, entries, name))
+    return conn.execute('SELECT bytes FROM cache_totals WHERE name = ?', (name,)).fetchone()[0]
+
+
+def _create_base_schema(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS submissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            resume_text TEXT NOT NULL,
+            job_desc TEXT NOT NULL,
+            score REAL,
+            matching_keywords TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    ''')
+
+
+def _add_submission_indexes(cursor):
+    # /submissions: WHERE user_id = ? ORDER BY id (rowid is implicit in the index)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_user ON submissions(user_id)')
+    # /dashboard: WHERE user_id = ? ORDER BY created_at
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_submissions_user_created
+        ON submissions(user_id, created_at)
+    ''')
+
+
+def _add_dashboard_rollups(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_keyword_counts (
+            user_id INTEGER NOT NULL,
+            keyword TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, keyword)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_keyword_counts_top
+        ON user_keyword_counts(user_id, count DESC)
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_daily_scores (
+            user_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            submissions INTEGER NOT NULL DEFAULT 0,
+            score_sum REAL NOT NULL DEFAULT 0,
+            score_min REAL,
+            score_max REAL,
+            PRIMARY KEY (user_id, day)
+        ) WITHOUT ROWID
+    ''')
+
+    # Backfill from the submissions stored so far
+    cursor.execute('''
+        INSERT OR REPLACE INTO user_daily_scores
+        (user_id, day, submissions, score_sum, score_min, score_max)
+        SELECT user_id, date(created_at), COUNT(*), COALESCE(SUM(score), 0), MIN(score), MAX(score)
+        FROM submissions GROUP BY user_id, date(created_at)
+    ''')
+    counts = {}
+    for user_id, keywords in cursor.execute('SELECT user_id, matching_keywords FROM submissions').fetchall():
+        for keyword in (keywords or '').split(','):
+            if keyword:
+                counts[(user_id, keyword)] = counts.get((user_id, keyword), 0) + 1
+    cursor.executemany(
+        'INSERT OR REPLACE INTO user_keyword_counts (user_id, keyword, count) VALUES (?, ?, ?)',
+        [(user_id, keyword, count) for (user_id, keyword), count in counts.items()]
+    )
+
+
+def _add_keyword_index(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS keywords (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            keyword TEXT UNIQUE NOT NULL
+        )
+    ''')
+    # Posting lists: keyword -> (user, submission)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS submission_keywords (
+            keyword_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            submission_id INTEGER NOT NULL,
+            PRIMARY KEY (keyword_id, user_id, submission_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_submission_keywords_submission
+        ON submission_keywords(submission_id)
+    ''')
+
+    # Backfill from the comma-joined matching_keywords column
+    rows = cursor.execute('SELECT id, user_id, matching_keywords FROM submissions').fetchall()
+    keywords = set()
+    for _, _, joined in rows:
+        keywords.update(k for k in (joined or '').split(',') if k)
+    cursor.executemany('INSERT OR IGNORE INTO keywords (keyword) VALUES (?)', [(k,) for k in keywords])
+    keyword_ids = dict(cursor.execute('SELECT keyword, id FROM keywords').fetchall())
+    cursor.executemany(
+        'INSERT OR IGNORE INTO submission_keywords (keyword_id, user_id, submission_id) VALUES (?, ?, ?)',
+        [(keyword_ids[k], user_id, submission_id)
+         for submission_id, user_id, joined in rows
+         for k in set((joined or '').split(',')) if k]
+    )
+
+
+def _add_email_outbox(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            body TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_email_outbox_due
+        ON email_outbox(status, next_attempt_at)
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS email_verifications (
+            email TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            checked_at REAL NOT NULL
+        )
+    ''')
+
+
+def _add_upload_cache(cursor):
+    # Extracted text, keywords and embedding per uploaded PDF, keyed by SHA-256 of its bytes
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS pdf_uploads (
+            digest TEXT PRIMARY KEY,
+            namespace TEXT NOT NULL,
+            resume_text TEXT NOT NULL,
+            keywords TEXT NOT NULL,
+            dim INTEGER NOT NULL,
+            embedding BLOB NOT NULL,
+            bytes INTEGER NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            last_used_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_pdf_uploads_lru ON pdf_uploads(last_used_at)')
+
+
+def _add_report_cache(cursor):
+    # Rendered /export PDFs; submissions are immutable, so entries never go stale
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS submission_reports (
+            submission_id INTEGER PRIMARY KEY,
+            pdf BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _add_submission_previews(cursor):
+    # /submissions lists previews only; full texts are fetched per row on demand
+    cursor.execute('ALTER TABLE submissions ADD COLUMN resume_preview TEXT')
+    cursor.execute('ALTER TABLE submissions ADD COLUMN job_preview TEXT')
+    cursor.execute(f'''
+        UPDATE submissions SET
+            resume_preview = substr(resume_text, 1, {PREVIEW_CHARS}),
+            job_preview = substr(job_desc, 1, {PREVIEW_CHARS})
+    ''')
+    # Covering index for the listing: a page is read from the index alone,
+    # never from table rows whose texts spill into overflow pages
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_submissions_listing
+        ON submissions(user_id, id, score, matching_keywords, resume_preview, job_preview)
+    ''')
+
+
+def _add_api_tokens(cursor):
+    # Bearer tokens for /api/v1; only a SHA-256 of each token is stored
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS api_tokens (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            token_hash TEXT UNIQUE NOT NULL,
+            user_id INTEGER NOT NULL,
+            name TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_tokens_user ON api_tokens(user_id)')
+
+
+def _add_cache_totals(cursor):
+    # Running byte totals per cache table, so eviction checks don't SUM the table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cache_totals (
+            name TEXT PRIMARY KEY,
+            bytes INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        INSERT OR REPLACE INTO cache_totals (name, bytes)
+        SELECT 'pdf_uploads', COALESCE(SUM(bytes), 0) FROM pdf_uploads
+    ''')
+
+
+def _add_report_cache_budget(cursor):
+    # Rendered reports get a size and an LRU clock so they can be evicted like uploads
+    cursor.execute('ALTER TABLE submission_reports ADD COLUMN bytes INTEGER NOT NULL DEFAULT 0')
+    cursor.execute('ALTER TABLE submission_reports ADD COLUMN last_used_at REAL NOT NULL DEFAULT 0')
+    cursor.execute('UPDATE submission_reports SET bytes = length(pdf)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_submission_reports_lru ON submission_reports(last_used_at)')
+    cursor.execute('''
+        INSERT OR REPLACE INTO cache_totals (name, bytes)
+        SELECT 'submission_reports', COALESCE(SUM(bytes), 0) FROM submission_reports
+    ''')
+
+
+def _add_embedding_cache(cursor):
+    # Persistent embedding tier. Older releases created the table on first use,
+    # so it may already exist without the size and LRU columns.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS embeddings (
+            key TEXT PRIMARY KEY,
+            dim INTEGER NOT NULL,
+            vector BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('ALTER TABLE embeddings ADD COLUMN bytes INTEGER NOT NULL DEFAULT 0')
+    cursor.execute('ALTER TABLE embeddings ADD COLUMN last_used_at REAL NOT NULL DEFAULT 0')
+    cursor.execute('UPDATE embeddings SET bytes = length(vector)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_embeddings_lru ON embeddings(last_used_at)')
+    cursor.execute('''
+        INSERT OR REPLACE INTO cache_totals (name, bytes)
+        SELECT 'embeddings', COALESCE(SUM(bytes), 0) FROM embeddings
+    ''')
+
+
+def _add_cache_entry_counts(cursor):
+    # Row counts next to the byte totals, so stats() doesn't COUNT(*) the cache tables
+    cursor.execute('ALTER TABLE cache_totals ADD COLUMN entries INTEGER NOT NULL DEFAULT 0')
+    for table in ('pdf_uploads', 'submission_reports', 'embeddings'):
+        cursor.execute(f"UPDATE cache_totals SET entries = (SELECT COUNT(*) FROM {table}) WHERE name = '{table}'")
+
+
+# Ordered (version, step) pairs; never edit a released step, append a new one
+MIGRATIONS = [
+    (1, _create_base_schema),
+    (2, _add_submission_indexes),
+    (3, _add_dashboard_rollups),
+    (4, _add_keyword_index),
+    (5, _add_email_outbox),
+    (6, _add_upload_cache),
+    (7, _add_report_cache),
+    (8, _add_submission_previews),
+    (9, _add_api_tokens),
+    (10, _add_cache_totals),
+    (11, _add_report_cache_budget),
+    (12, _add_embedding_cache),
+    (13, _add_cache_entry_counts),
+]
+
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(path=None):
+    """Bring the database schema up to the latest version
+
+    Safe to call from every worker at startup: the first caller takes the
+    write lock with BEGIN IMMEDIATE and applies pending steps, the others
+    wait for it and then find nothing left to do.
+    """
+    conn = connect(path)
+    conn.isolation_level = None
+    try:
+        mode = conn.execute('PRAGMA journal_mode = WAL').fetchone()[0]
+        if mode.lower() != 'wal':
+            logger.warning(f"Could not enable WAL journaling, using {mode}")
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            version = schema_version(conn)
+            cursor = conn.cursor()
+            for target, step in MIGRATIONS:
+                if target > version:
+                    step(cursor)
+                    cursor.execute(f'PRAGMA user_version = {target}')
+                    logger.info(f"Applied database migration {target}: {step.__name__}")
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('PRAGMA optimize')
+        return schema_version(conn)
+    finally:
+        conn.close()
@@ -0,0 +1,200 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import db
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64MB of float32 vectors
+DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024  # ~350k 384-dim vectors in the embeddings table
+_WHITESPACE = re.compile(r'\s+')
+
+MODEL_SECONDS = metrics.histogram('embedding_model_encode_seconds', 'Time spent in model.encode per batch')
+MODEL_BATCH_SIZE = metrics.histogram('embedding_model_batch_size', 'Texts per model.encode call (cache misses)',
+                                     buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512))
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different copies share a cache entry"""
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+class EmbeddingCache:
+    """Two-tier cache of sentence embeddings keyed by a hash of the normalized text.
+
+    The first tier is an in-process LRU bounded by ``max_bytes``; the second is
+    an ``embeddings`` table of float32 blobs in the SQLite database, shared by
+    every worker and bounded by ``max_disk_bytes``, least recently used rows
+    going first. Only texts missing from both tiers reach the model, and they
+    are encoded together in a single batch. The table comes from
+    ``db.migrate``.
+    """
+
+    def __init__(self, db_path='matches.db', namespace='all-MiniLM-L6-v2',
+                 max_bytes=DEFAULT_MAX_BYTES, persistent=True, max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        self.db_path = db_path
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.persistent = persistent
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+    def key(self, text):
+        digest = hashlib.sha256()
+        digest.update(self.namespace.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(normalize_text(text).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _remember(self, key, vector):
+        """Insert into the LRU tier, evicting least recently used entries"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            if vector.nbytes > self.max_bytes:
+                return
+            self._entries[key] = vector
+            self._bytes += vector.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def _lookup_memory(self, key):
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+            return vector
+
+    def _load(self, keys):
+        """Fetch vectors for keys from the persistent tier"""
+        if not self.persistent or not keys:
+            return {}
+        found = {}
+        placeholders = ','.join('?' * len(keys))
+        rows = db.query_all(f'SELECT key, vector FROM embeddings WHERE key IN ({placeholders})',
+                            list(keys), path=self.db_path)
+        for key, blob in rows:
+            found[key] = np.frombuffer(blob, dtype=np.float32)
+        if found:
+            # Rows served from here move to the memory tier, so this runs once per key and process
+            db.execute(f'UPDATE embeddings SET last_used_at = ? WHERE key IN ({",".join("?" * len(found))})',
+                       [time.time(), *found], path=self.db_path)
+        return found
+
+    def _store(self, items):
+        """Write freshly computed vectors to the persistent tier"""
+        if not self.persistent or not items:
+            return
+        now = time.time()
+        with db.transaction(self.db_path, immediate=True) as conn:
+            added = rows = 0
+            for key, vector in items:
+                if conn.execute('''
+                    INSERT OR IGNORE INTO embeddings (key, dim, vector, bytes, last_used_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (key, vector.shape[0], vector.tobytes(), vector.nbytes, now)).rowcount:
+                    added += vector.nbytes
+                    rows += 1
+            evicted = self._evict(conn, db.add_cache_bytes(conn, 'embeddings', added, entries=rows))
+        if evicted:
+            with self._lock:
+                self.disk_evictions += evicted
+
+    def _evict(self, conn, total):
+        """Delete least recently used rows until total fits; total comes from cache_totals"""
+        if total <= self.max_disk_bytes:
+            return 0
+        victims = []
+        freed = 0
+        cursor = conn.execute('SELECT key, bytes FROM embeddings ORDER BY last_used_at')
+        for key, size in cursor:
+            if total - freed <= self.max_disk_bytes:
+                break
+            victims.append((key,))
+            freed += size
+        cursor.close()
+        conn.executemany('DELETE FROM embeddings WHERE key = ?', victims)
+        db.add_cache_bytes(conn, 'embeddings', -freed, entries=-len(victims))
+        return len(victims)
+
+    def encode(self, model, texts, batch_size=32):
+        """Return a float32 array with one embedding row per text
+
+        Texts found in either tier skip the model; the rest are encoded in one
+        batched ``model.encode`` call and written back to both tiers.
+        """
+        keys = [self.key(text) for text in texts]
+        vectors = {}
+        for key in keys:
+            if key not in vectors:
+                vector = self._lookup_memory(key)
+                if vector is not None:
+                    vectors[key] = vector
+        memory_hits = len(vectors)
+
+        try:
+            stored = self._load([key for key in set(keys) if key not in vectors])
+        except sqlite3.Error as e:
+            logger.error(f"Error reading embedding cache: {str(e)}")
+            stored = {}
+        for key, vector in stored.items():
+            vectors[key] = vector
+            self._remember(key, vector)
+
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in pending:
+                pending[key] = text
+        if pending:
+            start = time.perf_counter()
+            encoded = model.encode(list(pending.values()), batch_size=batch_size,
+                                   convert_to_numpy=True, show_progress_bar=False)
+            MODEL_SECONDS.observe(time.perf_counter() - start)
+            MODEL_BATCH_SIZE.observe(len(pending))
+            encoded = np.asarray(encoded, dtype=np.float32)
+            fresh = list(zip(pending.keys(), encoded))
+            for key, vector in fresh:
+                vectors[key] = vector
+                self._remember(key, vector)
+            try:
+                self._store(fresh)
+            except sqlite3.Error as e:
+                logger.error(f"Error writing embedding cache: {str(e)}")
+
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.disk_hits += len(stored)
+            self.misses += len(pending)
+
+        return np.stack([vectors[key] for key in keys])
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'disk_evictions': self.disk_evictions,
+                'max_disk_bytes': self.max_disk_bytes,
+            }
@@ -0,0 +1,324 @@
+"""Embedding inference server shared by every Flask worker.
+
+Loads the sentence-transformers model once and serves encode requests over a
+Unix socket. Requests arriving within ``max_delay`` of each other are
+coalesced into one ``model.encode`` call of up to ``max_batch_size`` texts.
+
+A request not answered within ``encode_timeout`` gets an error reply, and
+is dropped if its batch hasn't started; clients built with a ``fallback``
+then encode in-process instead.
+
+Usage: python embedding_server.py [--socket /tmp/embeddings.sock]
+                                  [--max-batch-size 64] [--max-delay-ms 5]
+                                  [--encode-timeout 20]
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SOCKET_PATH = os.environ.get('EMBEDDING_SERVER_SOCKET', '/tmp/resume-matcher-embeddings.sock')
+MAX_BATCH_SIZE = int(os.environ.get('EMBEDDING_MAX_BATCH_SIZE', 64))
+MAX_DELAY = float(os.environ.get('EMBEDDING_MAX_DELAY_MS', 5)) / 1000
+# The server gives up on a request before the client's socket times out, so
+# the client gets a reply it can act on rather than a dead connection
+ENCODE_TIMEOUT = float(os.environ.get('EMBEDDING_ENCODE_TIMEOUT', 20))  # seconds
+CLIENT_TIMEOUT = 30.0  # seconds
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+_FRAME_HEADER = struct.Struct('!I')
+
+
+class EmbeddingServerError(Exception):
+    """The embedding server could not be reached or failed to encode"""
+
+
+def send_frame(sock, payload):
+    sock.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise EOFError('connection closed')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_frame(sock):
+    """Read one length-prefixed frame, or None if the peer closed cleanly"""
+    header = sock.recv(_FRAME_HEADER.size, socket.MSG_WAITALL)
+    if not header:
+        return None
+    if len(header) < _FRAME_HEADER.size:
+        raise EOFError('connection closed mid-frame')
+    (size,) = _FRAME_HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"frame of {size} bytes exceeds {MAX_FRAME_SIZE}")
+    return _recv_exactly(sock, size)
+
+
+class MicroBatcher:
+    """Coalesces concurrent encode requests into batched model calls
+
+    The first queued request opens a batch; requests arriving before
+    ``max_delay`` has passed, or until ``max_batch_size`` texts are queued,
+    join it. A single request larger than the batch size is encoded alone.
+    """
+
+    def __init__(self, model, max_batch_size=MAX_BATCH_SIZE, max_delay=MAX_DELAY):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self._thread = threading.Thread(target=self._run, name='embedding-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        """Queue texts for encoding; the future resolves to a float32 array"""
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            count = len(item[0])
+            deadline = time.monotonic() + self.max_delay
+            while count < self.max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                count += len(item[0])
+            self._encode(batch)
+
+    def _encode(self, batch):
+        # Requests whose handler already gave up were cancelled; skip them
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        texts = [text for texts, _ in batch for text in texts]
+        try:
+            vectors = self.model.encode(texts, batch_size=self.max_batch_size,
+                                        convert_to_numpy=True, show_progress_bar=False)
+            vectors = np.asarray(vectors, dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Error encoding batch of {len(texts)} texts: {str(e)}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        with self._lock:
+            self.batches += 1
+            self.texts += len(texts)
+        offset = 0
+        for texts, future in batch:
+            future.set_result(vectors[offset:offset + len(texts)])
+            offset += len(texts)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'texts': self.texts,
+                'mean_batch_size': self.texts / self.batches if self.batches else 0.0,
+                'max_batch_size': self.max_batch_size,
+                'max_delay_ms': self.max_delay * 1000,
+            }
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                payload = recv_frame(self.request)
+            except (EOFError, ConnectionError, ValueError):
+                return
+            if payload is None:
+                return
+            try:
+                message = json.loads(payload)
+                if message.get('op') == 'stats':
+                    send_frame(self.request, json.dumps(self.server.batcher.stats()).encode('utf-8'))
+                    continue
+                future = self.server.batcher.submit(message['texts'])
+                try:
+                    vectors = future.result(timeout=self.server.encode_timeout)
+                except FutureTimeout:
+                    future.cancel()
+                    raise EmbeddingServerError(f"encode timed out after {self.server.encode_timeout:g}s")
+                header = {'rows': vectors.shape[0], 'dim': vectors.shape[1] if vectors.ndim == 2 else 0}
+                send_frame(self.request, json.dumps(header).encode('utf-8'))
+                send_frame(self.request, vectors.tobytes())
+            except ConnectionError:
+                return
+            except Exception as e:
+                send_frame(self.request, json.dumps({'error': str(e)}).encode('utf-8'))
+
+
+class EmbeddingServer(socketserver.ThreadingUnixStreamServer):
+    """Unix-socket front end for a MicroBatcher, one thread per connection"""
+
+    daemon_threads = True
+
+    def __init__(self, model, socket_path=SOCKET_PATH, max_batch_size=MAX_BATCH_SIZE,
+                 max_delay=MAX_DELAY, encode_timeout=ENCODE_TIMEOUT):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # left behind by a previous run
+        self.batcher = MicroBatcher(model, max_batch_size=max_batch_size, max_delay=max_delay)
+        self.encode_timeout = encode_timeout
+        super().__init__(socket_path, _Handler)
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.stop()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class EmbeddingClient:
+    """Drop-in for the model's ``encode`` that forwards to an EmbeddingServer
+
+    Each thread keeps one connection open to the server; a forked child
+    never reuses its parent's socket. If ``fallback`` is given, it is called
+    (once) to load a local model when the server can't be reached, times out
+    or fails, and ``encode`` uses that model for the request instead of
+    raising.
+    """
+
+    def __init__(self, socket_path=SOCKET_PATH, timeout=CLIENT_TIMEOUT, fallback=None):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.fallback = fallback
+        self._fallback_model = None
+        self._fallback_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connection(self):
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.pid = os.getpid()
+            self._local.sock = None
+        if self._local.sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError as e:
+                sock.close()
+                raise EmbeddingServerError(f"Cannot reach embedding server at {self.socket_path}: {e}")
+            self._local.sock = sock
+        return self._local.sock
+
+    def close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _exchange(self, message, frames):
+        """Send one request and read its response frames, reconnecting once if the
+        kept-alive connection turns out to be stale"""
+        payload = json.dumps(message).encode('utf-8')
+        for attempt in (0, 1):
+            reused = getattr(self._local, 'sock', None) is not None and self._local.pid == os.getpid()
+            sock = self._connection()
+            try:
+                send_frame(sock, payload)
+                replies = [recv_frame(sock)]
+                if replies[0] is None:
+                    raise EOFError('connection closed')
+                header = json.loads(replies[0])
+                if 'error' in header:
+                    raise EmbeddingServerError(header['error'])
+                for _ in range(frames - 1):
+                    replies.append(recv_frame(sock))
+                return header, replies[1:]
+            except (EOFError, BrokenPipeError, ConnectionResetError) as e:
+                self.close()
+                if attempt or not reused:
+                    raise EmbeddingServerError(f"Embedding server connection lost: {e}")
+            except socket.timeout as e:
+                self.close()
+                raise EmbeddingServerError(f"Embedding server timed out: {e}")
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        """Return a float32 array with one row per text"""
+        texts = list(texts)
+        try:
+            header, (data,) = self._exchange({'op': 'encode', 'texts': texts}, 2)
+        except EmbeddingServerError as e:
+            if self.fallback is None:
+                raise
+            logger.warning(f"Encoding {len(texts)} texts in-process: {str(e)}")
+            vectors = self._local_model().encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                                                 show_progress_bar=show_progress_bar)
+            return np.asarray(vectors, dtype=np.float32)
+        return np.frombuffer(data, dtype=np.float32).reshape(header['rows'], header['dim'])
+
+    def _local_model(self):
+        if self._fallback_model is None:
+            with self._fallback_lock:
+                if self._fallback_model is None:
+                    self._fallback_model = self.fallback()
+        return self._fallback_model
+
+    def stats(self):
+        header, _ = self._exchange({'op': 'stats'}, 1)
+        return header
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--socket', default=SOCKET_PATH)
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument('--max-delay-ms', type=float, default=MAX_DELAY * 1000)
+    parser.add_argument('--encode-timeout', type=float, default=ENCODE_TIMEOUT,
+                        help='seconds before a request gets an error reply')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    import model_loader
+    model = model_loader.load_model()
+    server = EmbeddingServer(model, args.socket, max_batch_size=args.max_batch_size,
+                             max_delay=args.max_delay_ms / 1000, encode_timeout=args.encode_timeout)
+    logger.info(f"Serving embeddings on {args.socket} "
+                f"(batch {args.max_batch_size}, delay {args.max_delay_ms}ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""Sentence encoder backends for the similarity model.
+
+``sentence-transformers`` (the default) runs the PyTorch model as before.
+``onnx`` runs the same transformer exported to ONNX under ONNX Runtime, and
+``onnx-int8`` runs a copy with dynamically quantized int8 weights. Both ONNX
+backends do mean pooling and normalization themselves, matching the
+sentence-transformers pipeline of all-MiniLM-L6-v2. They need onnxruntime;
+exporting also needs onnx and sentence-transformers.
+
+Usage: python encoders.py export [--output onnx_model]
+"""
+import argparse
+import fcntl
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('sentence-transformers', 'onnx', 'onnx-int8')
+DEFAULT_BACKEND = 'sentence-transformers'
+ONNX_MODEL_DIR = os.environ.get('ONNX_MODEL_DIR', 'onnx_model')
+ONNX_FILE = 'model.onnx'
+ONNX_INT8_FILE = 'model.int8.onnx'
+CONFIG_FILE = 'encoder.json'
+TOKENIZER_FILE = 'tokenizer.json'
+LOCK_FILE = 'export.lock'
+
+_export_lock = threading.Lock()
+
+
+def export_onnx(model_name, output_dir=ONNX_MODEL_DIR):
+    """Export the model's transformer, tokenizer and an int8 copy to output_dir"""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device='cpu')
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+    os.makedirs(output_dir, exist_ok=True)
+
+    inputs = tokenizer(['an example sentence to trace'], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in inputs]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+
+    # Write to temporary names and rename, so concurrent loaders never see half a file.
+    # encoder.json marks the export as complete, so it goes last.
+    tmp_path = os.path.join(output_dir, f'.{ONNX_FILE}.{os.getpid()}')
+    with torch.no_grad():
+        torch.onnx.export(transformer, tuple(inputs[name] for name in input_names), tmp_path,
+                          input_names=input_names, output_names=['last_hidden_state'],
+                          dynamic_axes=dynamic_axes, opset_version=14)
+    tmp_int8_path = os.path.join(output_dir, f'.{ONNX_INT8_FILE}.{os.getpid()}')
+    quantize_dynamic(tmp_path, tmp_int8_path, weight_type=QuantType.QInt8)
+    tmp_tokenizer_dir = os.path.join(output_dir, f'.tokenizer.{os.getpid()}')
+    tokenizer.save_pretrained(tmp_tokenizer_dir)
+    for name in os.listdir(tmp_tokenizer_dir):
+        os.replace(os.path.join(tmp_tokenizer_dir, name), os.path.join(output_dir, name))
+    os.rmdir(tmp_tokenizer_dir)
+    os.replace(tmp_int8_path, os.path.join(output_dir, ONNX_INT8_FILE))
+    os.replace(tmp_path, os.path.join(output_dir, ONNX_FILE))
+
+    tmp_config_path = os.path.join(output_dir, f'.{CONFIG_FILE}.{os.getpid()}')
+    with open(tmp_config_path, 'w') as f:
+        json.dump({'model': model_name, 'max_seq_length': model.max_seq_length,
+                   'input_names': input_names}, f)
+    os.replace(tmp_config_path, os.path.join(output_dir, CONFIG_FILE))
+    logger.info(f"Exported {model_name} to {output_dir}")
+
+
+def _exported(model_name, model_dir):
+    """Whether model_dir holds a complete export of model_name"""
+    try:
+        with open(os.path.join(model_dir, CONFIG_FILE)) as f:
+            return json.load(f).get('model') == model_name
+    except FileNotFoundError:
+        return False
+
+
+class OnnxEncoder:
+    """ONNX Runtime encoder with the ``encode`` signature of SentenceTransformer"""
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, quantized=False, threads=None):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, CONFIG_FILE)) as f:
+            config = json.load(f)
+        self.input_names = config['input_names']
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(config['max_seq_length'])
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        path = os.path.join(model_dir, ONNX_INT8_FILE if quantized else ONNX_FILE)
+        self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+
+    def _encode_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        features = {
+            'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+            'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        tokens = self.session.run(['last_hidden_state'],
+                                  {name: features[name] for name in self.input_names})[0]
+        # Mean pooling over real tokens, then L2 normalization
+        mask = features['attention_mask'][..., None].astype(np.float32)
+        pooled = (tokens * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        """Return a float32 array with one normalized embedding per text"""
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # Batch texts of similar length together to keep padding down
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = None
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            encoded = self._encode_batch([texts[i] for i in chunk])
+            if vectors is None:
+                vectors = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+            vectors[chunk] = encoded
+        return vectors[0] if single else vectors
+
+
+def load_encoder(model_name, backend=DEFAULT_BACKEND, model_dir=ONNX_MODEL_DIR):
+    """Build the encoder for backend, exporting the ONNX files on first use"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    if backend == 'sentence-transformers':
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    if not _exported(model_name, model_dir):
+        # The flock serializes exports across gunicorn workers, the thread lock within one
+        os.makedirs(model_dir, exist_ok=True)
+        with _export_lock, open(os.path.join(model_dir, LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if not _exported(model_name, model_dir):
+                    logger.info(f"No ONNX export of {model_name} in {model_dir}, exporting now")
+                    export_onnx(model_name, model_dir)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return OnnxEncoder(model_dir, quantized=backend == 'onnx-int8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=['export'])
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--output', default=ONNX_MODEL_DIR)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    export_onnx(args.model, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Gunicorn settings for the Procfile
+
+With PRELOAD_MODEL (on by default) the master loads the sentence-transformers
+model once before forking, so workers start without importing torch or
+reading the weights, and share one copy of them copy-on-write. Nothing is
+preloaded when EMBEDDING_SERVER_SOCKET sends encoding to embedding_server.py.
+
+Each worker starts its background threads once the app is loaded, so the
+email outbox is drained after a restart even before anyone submits.
+
+Workers are gunicorn's default sync workers, so a worker is restarted once
+a single request runs past ``timeout``. The default is raised from 30 to 120
+seconds to leave room for /api/v1/ingest uploads.
+"""
+import gc
+import os
+
+import model_loader
+
+PRELOAD_MODEL = os.environ.get('PRELOAD_MODEL', '1').lower() in ('1', 'true', 'yes')
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+
+def when_ready(server):
+    if PRELOAD_MODEL and not model_loader.EMBEDDING_SERVER_SOCKET:
+        model_loader.get_model()
+        server.log.info(f"Loaded {model_loader.MODEL_NAME} in the master "
+                        f"in {model_loader.load_seconds:.2f}s")
+        # Move the loaded objects out of the collector's reach so the first
+        # collection in a worker doesn't touch (and copy) their pages
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    import resume_matcher
+    resume_matcher.start_background_workers()
@@ -0,0 +1,157 @@
+import html
+import re
+from collections import deque
+from functools import lru_cache
+
+AUTOMATON_CACHE_SIZE = 64  # distinct keyword sets kept compiled
+REGEX_MAX_KEYWORDS = 64  # the compiled regex is faster up to ~75 keywords (bench_highlight.py)
+HIGHLIGHT_OPEN = '<span class="highlight">'
+HIGHLIGHT_CLOSE = '</span>'
+
+
+def is_word_char(char):
+    """Same notion of a word character as the \\w in a Unicode regex"""
+    return char.isalnum() or char == '_'
+
+
+def fold_case(text):
+    """Lowercase text without changing its length, so offsets stay valid"""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton matching a fixed keyword set case-insensitively
+
+    ``find`` scans the text once and returns leftmost-longest,
+    non-overlapping matches. A match must not continue a word: when a
+    keyword starts or ends with a word character, the neighbouring text
+    character on that side must not be one. For ordinary keywords this is
+    the regex ``\\b`` rule.
+    """
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        # Per state: (length, starts with a word char, ends with a word char)
+        # for every keyword ending there, including via failure links
+        self.out = [()]
+        for keyword in keywords:
+            if keyword:
+                self._insert(fold_case(keyword))
+        self._link()
+
+    def _insert(self, keyword):
+        state = 0
+        for char in keyword:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            state = next_state
+        self.out[state] = ((len(keyword), is_word_char(keyword[0]), is_word_char(keyword[-1])),)
+
+    def _link(self):
+        """Breadth-first pass filling failure links and merged outputs"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+                queue.append(child)
+
+    def find(self, text):
+        """Return (start, end) spans of keyword matches in text"""
+        folded = fold_case(text)
+        goto, fail, out = self.goto, self.fail, self.out
+        size = len(text)
+        best = {}  # start -> longest valid end
+        state = 0
+        for end, char in enumerate(folded, 1):
+            next_state = goto[state].get(char)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = goto[state].get(char)
+            state = next_state or 0
+            if out[state]:
+                for length, word_start, word_end in out[state]:
+                    start = end - length
+                    if word_start and start > 0 and is_word_char(text[start - 1]):
+                        continue
+                    if word_end and end < size and is_word_char(text[end]):
+                        continue
+                    if end > best.get(start, -1):
+                        best[start] = end
+
+        spans = []
+        position = 0
+        for start in sorted(best):
+            if start >= position:
+                spans.append((start, best[start]))
+                position = best[start]
+        return spans
+
+
+class KeywordPattern:
+    """Compiled-regex equivalent of KeywordAutomaton for small keyword sets
+
+    Keywords are tried longest first with the same one-sided word boundary
+    checks, so ``find`` returns the same spans as the automaton. Keywords
+    starting with a word character share one lookbehind; they can never
+    match at the same position as the others, so splitting them keeps the
+    longest match at each start.
+    """
+
+    def __init__(self, keywords):
+        groups = {True: [], False: []}
+        for keyword in sorted((k for k in keywords if k), key=len, reverse=True):
+            groups[is_word_char(keyword[0])].append(
+                re.escape(keyword) + (r'(?!\w)' if is_word_char(keyword[-1]) else ''))
+        alternatives = []
+        if groups[True]:
+            alternatives.append(r'(?<!\w)(?:' + '|'.join(groups[True]) + ')')
+        if groups[False]:
+            alternatives.append('|'.join(groups[False]))
+        self.pattern = re.compile('|'.join(alternatives), re.IGNORECASE) if alternatives else None
+
+    def find(self, text):
+        """Return (start, end) spans of keyword matches in text"""
+        if self.pattern is None:
+            return []
+        return [m.span() for m in self.pattern.finditer(text)]
+
+
+@lru_cache(maxsize=AUTOMATON_CACHE_SIZE)
+def compile_keywords(keywords):
+    """Build (or reuse) the matcher for a frozenset of keywords
+
+    Sets of up to REGEX_MAX_KEYWORDS keywords get a compiled regex, larger
+    ones the automaton, whose cost barely grows with the set size.
+    """
+    if len(keywords) <= REGEX_MAX_KEYWORDS:
+        return KeywordPattern(keywords)
+    return KeywordAutomaton(keywords)
+
+
+def highlight(text, keywords):
+    """Escape text for HTML and wrap every keyword match in a highlight span"""
+    if not keywords:
+        return html.escape(text)
+    matcher = compile_keywords(frozenset(keywords))
+    parts = []
+    position = 0
+    for start, end in matcher.find(text):
+        parts.append(html.escape(text[position:start]))
+        parts.append(HIGHLIGHT_OPEN + html.escape(text[start:end]) + HIGHLIGHT_CLOSE)
+        position = end
+    parts.append(html.escape(text[position:]))
+    return ''.join(parts)
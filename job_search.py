@@ -0,0 +1,153 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+CACHE_TTL = 15 * 60  # seconds
+CACHE_SIZE = 512  # distinct queries
+PREFETCH_RESULTS = 20
+
+ADZUNA_SECONDS = metrics.histogram('adzuna_request_seconds', 'Adzuna API call latency', ['status'])
+
+
+class TTLCache:
+    """Size-bounded LRU mapping whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, max_size=CACHE_SIZE, ttl=CACHE_TTL, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+def normalize_query(query):
+    """Case- and whitespace-insensitive form of a search query"""
+    return ' '.join(query.lower().split())
+
+
+class AdzunaClient:
+    """Adzuna job search over a pooled session with a TTL cache per normalized query
+
+    With ``prefetch`` a whole result page is fetched instead of a single
+    posting, and ``on_results`` is called with the fresh postings so they can
+    be embedded in one batch before anyone scores against them. That call
+    runs on a background thread; ``search`` returns without waiting for it.
+    """
+
+    def __init__(self, app_id, api_key, url, timeout=REQUEST_TIMEOUT, cache=None,
+                 prefetch=False, prefetch_results=PREFETCH_RESULTS, on_results=None, pool_size=10):
+        self.app_id = app_id
+        self.api_key = api_key
+        self.url = url
+        self.timeout = timeout
+        self.cache = cache or TTLCache()
+        self.prefetch = prefetch
+        self.prefetch_results = prefetch_results
+        self.on_results = on_results
+        self._executor = None
+        self._pid = None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def search(self, query):
+        """Return a list of postings for query, served from cache when fresh"""
+        results_per_page = self.prefetch_results if self.prefetch else 1
+        key = (normalize_query(query), results_per_page)
+        jobs = self.cache.get(key)
+        if jobs is not None:
+            return jobs
+
+        params = {
+            'app_id': self.app_id,
+            'app_key': self.api_key,
+            'what': key[0],
+            'results_per_page': results_per_page
+        }
+        start = time.perf_counter()
+        try:
+            response = self.session.get(self.url, params=params, timeout=self.timeout)
+        except requests.RequestException:
+            ADZUNA_SECONDS.observe(time.perf_counter() - start, 'error')
+            raise
+        ADZUNA_SECONDS.observe(time.perf_counter() - start, str(response.status_code))
+        if response.status_code != 200:
+            logger.error(f"Adzuna returned HTTP {response.status_code}")
+            return []
+
+        jobs = [{
+            'title': job.get('title', ''),
+            'description': job.get('description', ''),
+            'company': job.get('company_name', ''),
+            'location': job.get('location', {}).get('display_name', '')
+        } for job in response.json().get('results', [])]
+        self.cache.set(key, jobs)
+
+        if self.prefetch and jobs and self.on_results is not None:
+            self._schedule_prefetch(jobs)
+        return jobs
+
+    def _schedule_prefetch(self, jobs):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='adzuna-prefetch')
+                self._pid = os.getpid()
+                self._pending = set()
+            future = self._executor.submit(self._prefetch, jobs)
+            self._pending.add(future)
+        future.add_done_callback(self._forget)
+
+    def _forget(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def _prefetch(self, jobs):
+        try:
+            self.on_results(jobs)
+        except Exception as e:
+            logger.error(f"Error prefetching job results: {str(e)}")
+
+    def wait_for_prefetch(self, timeout=None):
+        """Block until queued prefetches are done; returns False on timeout"""
+        with self._lock:
+            pending = list(self._pending)
+        return not wait(pending, timeout).not_done
@@ -0,0 +1,147 @@
+import html
+from nltk.tokenize import word_tokenize
+from nltk.corpus import stopwords
+
+MAX_TEXT_LENGTH = 10000  # ~2000 words
+
+# Common words that shouldn't be considered as keywords
+EXTRA_STOP_WORDS = frozenset([
+    'experience', 'year', 'years', 'skill', 'skills', 'strong',
+    'description', 'candidate', 'looking', 'ideal', 'job',
+    'knowledge', 'familiarity', 'high', 'control', 'seeking',
+    'with'
+])
+
+# Technical terms that should always be considered
+TECHNICAL_TERMS = frozenset({
+    # Job Titles
+    'developer', 'engineer', 'architect', 'devops', 'sre', 'administrator',
+    'lead', 'senior', 'junior', 'fullstack', 'frontend', 'backend',
+
+    # Programming Languages
+    'python', 'javascript', 'java', 'typescript', 'ruby', 'php', 'scala', 'kotlin', 'swift',
+
+    # Web Technologies
+    'react', 'angular', 'vue', 'nodejs', 'expressjs', 'django', 'flask', 'fastapi',
+    'spring', 'hibernate', 'jquery', 'bootstrap', 'tailwind', 'sass', 'less',
+    'webpack', 'babel', 'html', 'css',
+
+    # DevOps & Infrastructure
+    'docker', 'kubernetes', 'jenkins', 'circleci', 'travis', 'gitlab', 'github',
+    'aws', 'azure', 'gcp', 'terraform', 'ansible', 'puppet', 'chef', 'nginx',
+    'apache', 'container', 'microservices', 'serverless', 'lambda',
+    'ci', 'cd', 'cicd', 'infrastructure', 'orchestration',
+
+    # Databases
+    'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'dynamodb',
+    'cassandra', 'mariadb', 'oracle',
+
+    # Operating Systems & Tools
+    'linux', 'unix', 'windows', 'macos', 'git', 'svn', 'mercurial',
+
+    # API & Architecture
+    'restful', 'graphql', 'api', 'apis', 'soap', 'microservice',
+
+    # Cloud & Infrastructure
+    'cloud', 'iaas', 'paas', 'saas', 'virtualization', 'containerization',
+
+    # UI/UX
+    'material', 'ui', 'ux', 'responsive', 'mobile', 'cross-platform',
+    'accessibility', 'wcag', 'usability',
+
+    # Security
+    'oauth', 'jwt', 'authentication', 'authorization', 'security',
+
+    # Testing
+    'junit', 'pytest', 'jest', 'selenium', 'cypress', 'testing'
+})
+
+# Spellings normalized before tokenizing
+TEXT_REPLACEMENTS = (
+    ('node.js', 'nodejs'),
+    ('express.js', 'expressjs'),
+    ('dev ops', 'devops'),
+    ('dev-ops', 'devops'),
+)
+
+STRIP_CHARS = '.,()[]{}'
+MAX_TOKEN_CACHE_SIZE = 50000
+
+
+class KeywordExtractor:
+    """Keyword extractor with vocabularies built once and reused for every call.
+
+    ``extract`` returns exactly what the per-call ``extract_keywords`` used to
+    return; the stop words, technical terms and per-token decisions are
+    computed once instead of on every request.
+    """
+
+    def __init__(self, stop_words=None, technical_terms=TECHNICAL_TERMS,
+                 max_text_length=MAX_TEXT_LENGTH):
+        if stop_words is None:
+            stop_words = set(stopwords.words('english')) | EXTRA_STOP_WORDS
+        self.stop_words = frozenset(stop_words)
+        self.technical_terms = frozenset(technical_terms)
+        self.two_word_terms = frozenset(t for t in self.technical_terms if ' ' in t)
+        self.max_text_length = max_text_length
+        # Token -> keywords it contributes (None for tokens that are skipped)
+        self._token_cache = {}
+
+    def _classify(self, word):
+        """Return the keywords a single cleaned token contributes"""
+        if len(word) <= 2 or word in self.stop_words:
+            return None
+        if word in self.technical_terms:
+            return (word,)
+        # Handle compound terms
+        if '.' in word or '-' in word:
+            parts = word.replace('-', '.').split('.')
+            if all(len(p) > 2 for p in parts):
+                return tuple(parts)
+            return ()
+        if word.isalpha():
+            return (word,)
+        return ()
+
+    def normalize(self, text):
+        """Sanitize, truncate and lowercase text the way keyword matching expects"""
+        text = html.escape(text[:self.max_text_length]).lower()
+        for old, new in TEXT_REPLACEMENTS:
+            if old in text:
+                text = text.replace(old, new)
+        return text
+
+    def extract(self, text):
+        words = [w.strip(STRIP_CHARS) for w in word_tokenize(self.normalize(text))]
+
+        cache = self._token_cache
+        two_word_terms = self.two_word_terms
+        keywords = set()
+        add = keywords.add
+        last = len(words) - 1
+        i = 0
+        while i <= last:
+            word = words[i]
+            try:
+                found = cache[word]
+            except KeyError:
+                if len(cache) >= MAX_TOKEN_CACHE_SIZE:
+                    cache.clear()
+                found = cache[word] = self._classify(word)
+            if found is None:
+                i += 1
+                continue
+
+            # Try to match two-word technical terms
+            if two_word_terms and i < last:
+                two_words = word + ' ' + words[i + 1]
+                if two_words in two_word_terms:
+                    add(two_words)
+                    i += 2
+                    continue
+
+            for keyword in found:
+                add(keyword)
+            i += 1
+
+        return keywords
@@ -0,0 +1,149 @@
+"""Match a folder of resumes against a folder of job descriptions.
+
+Both corpora are embedded in batches, the resume x job similarity matrix is
+computed in memory-bounded float32 tiles, and only the top-k jobs per resume
+are kept. Keyword overlap is computed for the surviving pairs only.
+
+Usage:
+    python match_corpus.py resumes/ jobs/ --top-k 5 --output matches.jsonl
+
+Resumes and jobs may be .txt or .pdf files. Results are written as one JSON
+object per resume.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from keyword_extractor import KeywordExtractor, MAX_TEXT_LENGTH
+from similarity import normalize_rows, tiled_top_k
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+MAX_SUGGESTIONS = 5
+SUPPORTED_EXTENSIONS = ('.txt', '.pdf')
+
+
+def read_document(path):
+    """Read a .txt or .pdf file and return its text truncated to MAX_TEXT_LENGTH"""
+    if path.lower().endswith('.pdf'):
+        import PyPDF2
+        with open(path, 'rb') as f:
+            reader = PyPDF2.PdfReader(f)
+            text = ''
+            for page in reader.pages:
+                text += (page.extract_text() or '') + '\n'
+                if len(text) >= MAX_TEXT_LENGTH:
+                    break
+    else:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read(MAX_TEXT_LENGTH)
+    return text[:MAX_TEXT_LENGTH]
+
+
+def load_corpus(directory):
+    """Return (names, texts) for every supported file in directory"""
+    names = []
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path) or not name.lower().endswith(SUPPORTED_EXTENSIONS):
+            continue
+        try:
+            text = read_document(path)
+        except Exception as e:
+            logger.error(f"Error reading {path}: {str(e)}")
+            continue
+        if text.strip():
+            names.append(name)
+            texts.append(text)
+    return names, texts
+
+
+def embed(model, texts, batch_size):
+    return normalize_rows(model.encode(texts, batch_size=batch_size,
+                                       convert_to_numpy=True, show_progress_bar=False))
+
+
+def tile_shape(memory_mb, job_count):
+    """Pick tile sizes so one float32 similarity block fits in memory_mb"""
+    cells = max(1, int(memory_mb * 1024 * 1024 / 4))
+    tile_cols = max(1, min(job_count, 8192))
+    tile_rows = max(1, cells // tile_cols)
+    return tile_rows, tile_cols
+
+
+def match_corpus(model, resume_names, resume_texts, job_names, job_texts,
+                 top_k=5, batch_size=64, memory_mb=256, extractor=None):
+    """Yield one result dict per resume with its top_k job matches"""
+    extractor = extractor or KeywordExtractor()
+
+    resume_embeddings = embed(model, resume_texts, batch_size)
+    job_embeddings = embed(model, job_texts, batch_size)
+    tile_rows, tile_cols = tile_shape(memory_mb, len(job_texts))
+
+    # Job keywords are only extracted for jobs that make someone's top-k
+    job_keywords = {}
+
+    for start, indices, scores in tiled_top_k(resume_embeddings, job_embeddings, top_k,
+                                              tile_rows=tile_rows, tile_cols=tile_cols):
+        for row in range(indices.shape[0]):
+            resume_index = start + row
+            resume_keywords = extractor.extract(resume_texts[resume_index])
+            matches = []
+            for job_index, score in zip(indices[row], scores[row]):
+                job_index = int(job_index)
+                if job_index not in job_keywords:
+                    job_keywords[job_index] = extractor.extract(job_texts[job_index])
+                keywords = job_keywords[job_index]
+                matches.append({
+                    'job': job_names[job_index],
+                    'score': float(score) * 100,
+                    'matching_keywords': sorted(resume_keywords & keywords),
+                    'missing_keywords': sorted(keywords - resume_keywords, key=len,
+                                               reverse=True)[:MAX_SUGGESTIONS]
+                })
+            yield {'resume': resume_names[resume_index], 'matches': matches}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Match a folder of resumes against a folder of job descriptions')
+    parser.add_argument('resumes', help='directory of resume .txt/.pdf files')
+    parser.add_argument('jobs', help='directory of job description .txt/.pdf files')
+    parser.add_argument('--top-k', type=int, default=5, help='matches to keep per resume')
+    parser.add_argument('--batch-size', type=int, default=64, help='encode batch size')
+    parser.add_argument('--memory-mb', type=float, default=256,
+                        help='upper bound for one similarity tile in MB')
+    parser.add_argument('--output', help='write JSONL here instead of stdout')
+    args = parser.parse_args()
+
+    resume_names, resume_texts = load_corpus(args.resumes)
+    job_names, job_texts = load_corpus(args.jobs)
+    if not resume_names or not job_names:
+        logger.error("Both directories must contain at least one .txt or .pdf file")
+        sys.exit(1)
+    logger.info(f"Loaded {len(resume_names)} resumes and {len(job_names)} job descriptions")
+
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(MODEL_NAME)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        for result in match_corpus(model, resume_names, resume_texts, job_names, job_texts,
+                                   top_k=args.top_k, batch_size=args.batch_size,
+                                   memory_mb=args.memory_mb):
+            out.write(json.dumps(result) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    logger.info(f"Matched {len(resume_names)} x {len(job_names)} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import bisect
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans from well under a millisecond (cosine) to a slow PDF
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class Histogram:
+    """Cumulative histogram per label combination, in the Prometheus sense
+
+    Label values are passed positionally, in ``labelnames`` order, which
+    keeps ``observe`` to a tuple lookup, a bisect and three additions under
+    a lock.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labels):
+        """Context manager observing the seconds spent in its block"""
+        return _Timer(self, labels)
+
+    def snapshot(self):
+        """{labels: (cumulative bucket counts, sum, count)}"""
+        with self._lock:
+            series = {labels: (list(counts), total, n) for labels, (counts, total, n) in self._series.items()}
+        for labels, (counts, total, n) in series.items():
+            for i in range(1, len(counts)):
+                counts[i] += counts[i - 1]
+        return series
+
+    def expose(self):
+        lines = []
+        for labels, (counts, total, n) in sorted(self.snapshot().items()):
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                lines.append(f'{self.name}_bucket'
+                             f'{_format_labels(self.labelnames, labels, [("le", _format_value(bound))])} {count}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {n}')
+        return lines
+
+
+class Registry:
+    """The metrics of one process, rendered in the Prometheus text format
+
+    Besides the histograms updated on the hot path, collectors are called
+    at scrape time to report values other objects already keep, such as the
+    caches' hit counts, without touching those objects' fast paths.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Return the histogram called name, creating it on first use"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, help, labelnames, buckets)
+            return metric
+
+    def collector(self, fn):
+        """Register fn() -> iterable of (name, kind, help, [(labels dict, value)])"""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.expose())
+        for collect in self._collectors:
+            try:
+                collected = list(collect())
+            except Exception as e:
+                logger.error(f"Error collecting metrics from {collect.__name__}: {str(e)}")
+                continue
+            for name, kind, help, samples in collected:
+                lines.append(f'# HELP {name} {help}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+histogram = REGISTRY.histogram
+collector = REGISTRY.collector
+render = REGISTRY.render
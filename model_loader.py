@@ -0,0 +1,58 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+# sentence-transformers, onnx or onnx-int8; see encoders.py
+ENCODER_BACKEND = os.environ.get('ENCODER_BACKEND', 'sentence-transformers')
+# Cached embeddings are only reused by the backend that computed them
+CACHE_NAMESPACE = MODEL_NAME if ENCODER_BACKEND == 'sentence-transformers' else f'{MODEL_NAME}:{ENCODER_BACKEND}'
+# When set, encode through embedding_server.py instead of a model in this process
+EMBEDDING_SERVER_SOCKET = os.environ.get('EMBEDDING_SERVER_SOCKET')
+
+_model = None
+_lock = threading.Lock()
+load_seconds = None
+
+
+def load_model():
+    """Load a fresh copy of the model with the configured encoder backend"""
+    global load_seconds
+    logger.info(f"Initializing {MODEL_NAME} with the {ENCODER_BACKEND} backend...")
+    start = time.perf_counter()
+    import encoders
+    model = encoders.load_encoder(MODEL_NAME, ENCODER_BACKEND)
+    load_seconds = time.perf_counter() - start
+    logger.info(f"Model initialized successfully in {load_seconds:.2f}s")
+    return model
+
+
+def get_model():
+    """Return the shared encoder, creating it on first use
+
+    This is the model itself, loaded in-process, unless
+    EMBEDDING_SERVER_SOCKET points at an embedding server, in which case it
+    is a client with the same ``encode`` method and no weights are loaded
+    here unless the server stops answering, when the client loads a local
+    copy and encodes in-process. The backend's libraries (torch for the default) are only imported
+    when the model is loaded, so importing the app stays cheap. If the gunicorn
+    master already loaded the model before forking (see gunicorn.conf.py),
+    every worker gets it for free and shares the weights copy-on-write.
+    """
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                if EMBEDDING_SERVER_SOCKET:
+                    from embedding_server import EmbeddingClient
+                    _model = EmbeddingClient(EMBEDDING_SERVER_SOCKET, fallback=load_model)
+                else:
+                    _model = load_model()
+    return _model
+
+
+def is_loaded():
+    return _model is not None
@@ -0,0 +1,201 @@
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import db
+import metrics
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+VERIFICATION_TTL = 7 * 24 * 3600  # re-verify an address after a week
+MAX_ATTEMPTS = 5
+BASE_RETRY_DELAY = 30  # seconds, doubled on every attempt
+CLAIM_LEASE = 300  # seconds before a claimed but unfinished email is retried
+
+HUNTER_SECONDS = metrics.histogram('hunter_request_seconds', 'Hunter API call latency',
+                                   ['endpoint', 'status'])
+
+
+class TransientError(Exception):
+    """A delivery failure worth retrying (timeouts, 5xx, rate limits)"""
+
+
+class HunterClient:
+    """Hunter API client sharing one pooled session, with per-address verification cache"""
+
+    def __init__(self, api_key, verify_url, send_url, db_path=None,
+                 timeout=REQUEST_TIMEOUT, pool_size=10, verification_ttl=VERIFICATION_TTL):
+        self.api_key = api_key
+        self.verify_url = verify_url
+        self.send_url = send_url
+        self.db_path = db_path
+        self.timeout = timeout
+        self.verification_ttl = verification_ttl
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _request(self, method, url, params):
+        endpoint = 'verify' if url == self.verify_url else 'send'
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            HUNTER_SECONDS.observe(time.perf_counter() - start, endpoint, 'error')
+            raise TransientError(str(e))
+        HUNTER_SECONDS.observe(time.perf_counter() - start, endpoint, str(response.status_code))
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientError(f"HTTP {response.status_code} from {url}")
+        return response
+
+    def verify(self, email):
+        """Return Hunter's status for email, using a cached result when fresh"""
+        row = db.query_one('SELECT status, checked_at FROM email_verifications WHERE email = ?',
+                           (email,), path=self.db_path)
+        if row and time.time() - row[1] < self.verification_ttl:
+            return row[0]
+
+        response = self._request('GET', self.verify_url, {'api_key': self.api_key, 'email': email})
+        status = response.json().get('data', {}).get('status') or 'unknown'
+        db.execute('''
+            INSERT OR REPLACE INTO email_verifications (email, status, checked_at) VALUES (?, ?, ?)
+        ''', (email, status, time.time()), path=self.db_path)
+        return status
+
+    def send(self, email, subject, body):
+        response = self._request('POST', self.send_url, {
+            'api_key': self.api_key,
+            'to': email,
+            'subject': subject,
+            'text': body
+        })
+        return response.status_code == 200
+
+
+def enqueue_email(conn, email, subject, body):
+    """Add an email to the outbox; call inside the caller's transaction"""
+    cursor = conn.execute('''
+        INSERT INTO email_outbox (email, subject, body, next_attempt_at) VALUES (?, ?, ?, ?)
+    ''', (email, subject, body, time.time()))
+    return cursor.lastrowid
+
+
+class NotificationWorker:
+    """Drains the email_outbox table in a background thread
+
+    Due rows are claimed under BEGIN IMMEDIATE, so several gunicorn workers
+    can each run a drainer without sending an email twice. Deliveries run on
+    a bounded thread pool; transient failures are retried with exponential
+    backoff until ``max_attempts``.
+    """
+
+    def __init__(self, client, db_path=None, concurrency=4, max_attempts=MAX_ATTEMPTS,
+                 base_delay=BASE_RETRY_DELAY, poll_interval=5.0):
+        self.client = client
+        self.db_path = db_path
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def ensure_started(self):
+        """Start the drain thread in this process if it isn't running yet"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='email-outbox', daemon=True)
+            self._thread.start()
+
+    def notify(self):
+        """Wake the drain thread so a freshly queued email goes out immediately"""
+        self.ensure_started()
+        self._wakeup.set()
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=self.concurrency,
+                                thread_name_prefix='email-send') as executor:
+            while not self._stopping.is_set():
+                try:
+                    drained = self.drain_once(executor)
+                except Exception as e:
+                    logger.error(f"Error draining email outbox: {str(e)}")
+                    drained = 0
+                if not drained:
+                    self._wakeup.wait(self.poll_interval)
+                    self._wakeup.clear()
+        db.close_connections()
+
+    def _claim(self, limit):
+        now = time.time()
+        with db.transaction(self.db_path, immediate=True) as conn:
+            rows = conn.execute('''
+                SELECT id, email, subject, body, attempts FROM email_outbox
+                WHERE status IN ('pending', 'sending') AND next_attempt_at <= ?
+                ORDER BY next_attempt_at LIMIT ?
+            ''', (now, limit)).fetchall()
+            conn.executemany('''
+                UPDATE email_outbox SET status = 'sending', attempts = attempts + 1, next_attempt_at = ?
+                WHERE id = ?
+            ''', [(now + CLAIM_LEASE, row[0]) for row in rows])
+        return rows
+
+    def drain_once(self, executor=None):
+        """Deliver one batch of due emails; returns how many were claimed"""
+        rows = self._claim(self.concurrency * 2)
+        if not rows:
+            return 0
+        if executor is None:
+            for row in rows:
+                self._deliver(row)
+        else:
+            list(executor.map(self._deliver, rows))
+        return len(rows)
+
+    def _deliver(self, row):
+        outbox_id, email, subject, body, attempts = row
+        attempts += 1
+        try:
+            if self.client.verify(email) != 'valid':
+                self._finish(outbox_id, 'skipped', 'address did not verify')
+            elif self.client.send(email, subject, body):
+                self._finish(outbox_id, 'sent')
+            else:
+                self._finish(outbox_id, 'failed', 'rejected by email API')
+        except TransientError as e:
+            if attempts >= self.max_attempts:
+                logger.error(f"Giving up on email {outbox_id} after {attempts} attempts: {str(e)}")
+                self._finish(outbox_id, 'failed', str(e))
+            else:
+                delay = self.base_delay * 2 ** (attempts - 1) * random.uniform(0.8, 1.2)
+                db.execute('''
+                    UPDATE email_outbox SET status = 'pending', next_attempt_at = ?, last_error = ?
+                    WHERE id = ?
+                ''', (time.time() + delay, str(e), outbox_id), path=self.db_path)
+        except Exception as e:
+            logger.error(f"Error sending email {outbox_id}: {str(e)}")
+            self._finish(outbox_id, 'failed', str(e))
+
+    def _finish(self, outbox_id, status, error=None):
+        db.execute('UPDATE email_outbox SET status = ?, last_error = ? WHERE id = ?',
+                   (status, error, outbox_id), path=self.db_path)
@@ -0,0 +1,292 @@
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXT_LENGTH = 10000
+PDF_TIMEOUT = 10  # seconds per document
+PAGES_PER_TASK = 4
+MAX_TASKS_PER_CHILD = 200  # recycle workers so a bad PDF can't bloat one forever
+# Workers come from a forkserver: forking a threaded gunicorn worker could copy
+# a lock held by another thread (logging, sqlite) into the child. The server
+# starts from a fresh interpreter and imports only these modules.
+FORKSERVER_PRELOAD = ['pdf_ingest', 'PyPDF2']
+
+
+class PdfTimeoutError(Exception):
+    """Text extraction took longer than the per-document timeout"""
+
+
+def iter_page_text(data, start=0, stop=None):
+    """Yield the text of each page in [start, stop) followed by a newline"""
+    import PyPDF2
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    for page in reader.pages[start:stop]:
+        yield (page.extract_text() or '') + '\n'
+
+
+def extract_text(data, max_chars=MAX_TEXT_LENGTH):
+    """Extract text page by page, stopping as soon as max_chars is reached"""
+    parts = []
+    length = 0
+    for text in iter_page_text(data):
+        parts.append(text)
+        length += len(text)
+        if length >= max_chars:
+            break
+    return ''.join(parts)[:max_chars]
+
+
+def _extract_pages(reader, start, stop, max_chars):
+    """Worker task: text of pages [start, stop) up to max_chars, plus the page count"""
+    page_count = len(reader.pages)
+    parts = []
+    length = 0
+    for page in reader.pages[start:stop]:
+        text = (page.extract_text() or '') + '\n'
+        parts.append(text)
+        length += len(text)
+        if length >= max_chars:
+            break
+    return ''.join(parts), page_count
+
+
+def _worker_main(conn, extract_pages):
+    """Child process loop: run extract_pages for each task until told to stop
+
+    A task is ``(data, start, stop, max_chars)``. The PDF is parsed when
+    ``data`` is given and reused by the following tasks, which send None in
+    its place; an empty task drops it.
+    """
+    import PyPDF2
+    reader = None
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        if not task:
+            reader = None
+            continue
+        data, start, stop, max_chars = task
+        try:
+            if data is not None:
+                reader = PyPDF2.PdfReader(io.BytesIO(data))
+            result = (True, extract_pages(reader, start, stop, max_chars))
+        except Exception as e:
+            result = (False, e)
+        try:
+            conn.send(result)
+        except Exception:
+            # The exception itself didn't pickle
+            conn.send((False, RuntimeError(str(result[1]))))
+    conn.close()
+
+
+def _context():
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(FORKSERVER_PRELOAD)
+    return context
+
+
+class _Worker:
+    """One extraction process and the pipe it takes tasks over"""
+
+    def __init__(self, context, extract_pages):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, extract_pages), daemon=True)
+        self.process.start()
+        child.close()
+        self.tasks = 0
+        self.busy = False
+        self.loaded = False
+
+    def submit(self, data, start, stop, max_chars):
+        """Queue pages [start, stop); the PDF bytes only go over the pipe once per document"""
+        self.conn.send((None if self.loaded else data, start, stop, max_chars))
+        self.loaded = True
+        self.tasks += 1
+        self.busy = True
+
+    def forget(self):
+        """Drop the child's parsed document"""
+        self.conn.send(())
+        self.loaded = False
+
+    def result(self, deadline):
+        """The pending task's result; raises PdfTimeoutError past deadline"""
+        if not self.conn.poll(max(0.0, deadline - time.monotonic())):
+            raise PdfTimeoutError('PDF extraction timed out')
+        ok, value = self.conn.recv()
+        self.busy = False
+        if not ok:
+            raise value
+        return value
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class PdfExtractor:
+    """Extracts PDF text in worker processes with a per-document timeout
+
+    The first pages are parsed by one worker, which also reports the page
+    count. If the character budget isn't met yet, the remaining pages are
+    spread over whichever other workers are free, in fixed windows,
+    collected in order and stopping at the first window that fills the
+    budget. Each document checks its workers out for its own use, so when
+    it exceeds its timeout only those workers are killed; documents being
+    extracted alongside it are unaffected, and replacements are forked on
+    demand. At most ``processes`` workers exist at once. A worker receives
+    a document's bytes and parses them once, however many windows it runs.
+
+    ``processes=0`` extracts in the calling process with no timeout.
+    ``extract_pages`` is the task run in the workers; it must be importable
+    by name, since workers are started from a forkserver.
+    """
+
+    def __init__(self, processes=None, timeout=PDF_TIMEOUT, max_chars=MAX_TEXT_LENGTH,
+                 pages_per_task=PAGES_PER_TASK, extract_pages=_extract_pages):
+        self.processes = min(4, os.cpu_count() or 1) if processes is None else processes
+        self.timeout = timeout
+        self.max_chars = max_chars
+        self.pages_per_task = pages_per_task
+        self.extract_pages = extract_pages
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(max(1, self.processes))
+        self._pid = os.getpid()
+
+    def _acquire(self, deadline=None):
+        """Check out a worker, waiting until deadline; None with no deadline means don't wait"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()  # forked: the parent's workers aren't ours
+            slots = self._slots
+        if deadline is None:
+            acquired = slots.acquire(blocking=False)
+        else:
+            acquired = slots.acquire(timeout=max(0.0, deadline - time.monotonic()))
+        if not acquired:
+            if deadline is None:
+                return None
+            raise PdfTimeoutError('No PDF worker became free in time')
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        try:
+            return _Worker(_context(), self.extract_pages)
+        except Exception:
+            slots.release()
+            raise
+
+    def _release(self, worker, deadline):
+        """Return a worker to the idle set, or retire it if it's spent or stuck"""
+        try:
+            if worker.busy:
+                # An abandoned window: finish it within the document's deadline, else kill
+                try:
+                    worker.result(deadline)
+                except PdfTimeoutError:
+                    worker.kill()
+                    return
+                except Exception:
+                    pass
+            if worker.tasks >= MAX_TASKS_PER_CHILD or not worker.process.is_alive():
+                worker.stop()  # recycle workers so a bad PDF can't bloat one forever
+                return
+            try:
+                worker.forget()
+            except OSError:
+                worker.kill()
+                return
+            with self._lock:
+                if self._pid == os.getpid():
+                    self._idle.append(worker)
+                    return
+            worker.kill()
+        finally:
+            if self._pid == os.getpid():
+                self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+
+    def extract(self, data):
+        """Return the document text truncated to max_chars"""
+        if not self.processes:
+            return extract_text(data, self.max_chars)
+
+        deadline = time.monotonic() + self.timeout
+        workers = []
+        timed_out = False
+        try:
+            first = self._acquire(deadline)
+            workers.append(first)
+            first.submit(data, 0, self.pages_per_task, self.max_chars)
+            text, page_count = first.result(deadline)
+            parts = [text]
+            length = len(text)
+
+            # Remaining pages in fixed windows, at most one in flight per worker
+            windows = iter(range(self.pages_per_task, page_count, self.pages_per_task))
+            pending = deque()
+
+            def submit_next(worker):
+                start = next(windows, None)
+                if start is not None:
+                    worker.submit(data, start, start + self.pages_per_task, self.max_chars)
+                    pending.append(worker)
+
+            if length < self.max_chars:
+                submit_next(first)
+                # Extra workers only if they're free right now
+                while len(workers) < self.processes and len(pending) == len(workers):
+                    worker = self._acquire()
+                    if worker is None:
+                        break
+                    workers.append(worker)
+                    submit_next(worker)
+            while pending and length < self.max_chars:
+                worker = pending.popleft()
+                text, _ = worker.result(deadline)
+                parts.append(text)
+                length += len(text)
+                submit_next(worker)
+        except PdfTimeoutError:
+            timed_out = True
+            logger.error(f"PDF extraction exceeded {self.timeout}s, killing its workers")
+            raise PdfTimeoutError(f"PDF extraction exceeded {self.timeout} seconds")
+        finally:
+            for worker in workers:
+                if timed_out and worker.busy:
+                    worker.kill()
+                    self._slots.release()
+                else:
+                    self._release(worker, deadline)
+
+        return ''.join(parts)[:self.max_chars]
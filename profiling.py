@@ -0,0 +1,142 @@
+import cProfile
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = 'profiles'
+MAX_PROFILES = 200  # captures kept on disk; the oldest are deleted first
+TOP_FUNCTIONS = 25  # by cumulative time, stored next to each capture
+
+_CAPTURE_NAME = re.compile(r'^\d{20}-\d+$')
+
+
+def function_label(func):
+    """Short name for a pstats (file, line, function) key"""
+    filename, line, name = func
+    if filename == '~':
+        return name  # built-in, e.g. "<method 'encode' of 'str' objects>"
+    return f'{os.path.basename(filename)}:{line}({name})'
+
+
+def top_functions(stats, limit=TOP_FUNCTIONS):
+    """The functions with the most cumulative time, as JSON-friendly dicts"""
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [{'function': function_label(func), 'calls': nc, 'tottime': tt, 'cumtime': ct}
+            for func, (cc, nc, tt, ct, callers) in rows]
+
+
+class RequestProfiler:
+    """Profiles a random sample of requests with cProfile, keeping the latest on disk
+
+    ``run`` profiles a call when it is forced (an admin asked for it) or
+    wins the ``sample_rate`` draw. At most one call per process is profiled
+    at a time; others run normally while one is being captured. Each
+    capture is written, off the request thread, as a ``.prof`` file (for
+    pstats or snakeviz) plus a ``.json`` summary with its duration and top
+    functions. Only the newest ``max_profiles`` captures are kept.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, sample_rate=0.0, max_profiles=MAX_PROFILES):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_profiles = max_profiles
+        self._active = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def _get_executor(self):
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='profile-writer')
+            self._pid = os.getpid()
+        return self._executor
+
+    def should_profile(self, forced=False):
+        return forced or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def run(self, name, fn, *args, forced=False, info=None, **kwargs):
+        """Call fn(*args, **kwargs), profiling it if sampled; returns its result"""
+        if not self.should_profile(forced) or not self._active.acquire(blocking=False):
+            return fn(*args, **kwargs)
+        try:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one profiler per process; someone else has it
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.disable()
+                seconds = time.perf_counter() - start
+                self._get_executor().submit(self._save, name, seconds, profile,
+                                            dict(info or {}, forced=forced))
+        finally:
+            self._active.release()
+
+    def _save(self, name, seconds, profile, info):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            capture = f'{time.time_ns():020d}-{os.getpid()}'
+            stats = pstats.Stats(profile)
+            path = os.path.join(self.directory, capture)
+            stats.dump_stats(path + '.prof.tmp')
+            os.replace(path + '.prof.tmp', path + '.prof')
+            summary = dict(info, id=capture, name=name, seconds=seconds,
+                           created_at=time.strftime('%Y-%m-%d %H:%M:%S'),
+                           top=top_functions(stats))
+            with open(path + '.json.tmp', 'w') as f:
+                json.dump(summary, f)
+            os.replace(path + '.json.tmp', path + '.json')
+            self._prune()
+        except Exception as e:
+            logger.error(f"Error saving profile: {str(e)}")
+
+    def _captures(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(n[:-5] for n in names if n.endswith('.json') and _CAPTURE_NAME.match(n[:-5]))
+
+    def _prune(self):
+        captures = self._captures()
+        for capture in captures[:max(0, len(captures) - self.max_profiles)]:
+            for suffix in ('.json', '.prof'):
+                try:
+                    os.remove(os.path.join(self.directory, capture + suffix))
+                except FileNotFoundError:
+                    pass  # another worker pruned it first
+
+    def slowest(self, limit=50):
+        """Summaries of the kept captures, slowest first"""
+        summaries = []
+        for capture in self._captures():
+            try:
+                with open(os.path.join(self.directory, capture + '.json')) as f:
+                    summaries.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        summaries.sort(key=lambda s: s['seconds'], reverse=True)
+        return summaries[:limit]
+
+    def profile_path(self, capture):
+        """Path of a capture's .prof file, or None for an unknown or malformed id"""
+        if not _CAPTURE_NAME.match(capture):
+            return None
+        path = os.path.join(self.directory, capture + '.prof')
+        return path if os.path.exists(path) else None
+
+    def flush(self):
+        """Wait for captures still being written (tests and shutdown)"""
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.submit(lambda: None).result()
@@ -0,0 +1,228 @@
+import io
+import logging
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import db
+
+logger = logging.getLogger(__name__)
+
+REPORT_WORKERS = 2
+RENDER_TIMEOUT = 60  # seconds a download waits for its PDF
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # rendered PDFs kept in submission_reports
+
+
+@lru_cache(maxsize=1)
+def _styles():
+    """reportlab styles, built once per process on first render"""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+    styles = getSampleStyleSheet()
+    title = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        spaceAfter=30
+    )
+    score = ParagraphStyle(
+        'Score',
+        parent=styles['Normal'],
+        fontSize=16,
+        textColor=colors.blue,
+        spaceAfter=20
+    )
+    return styles['Heading2'], styles['Normal'], title, score
+
+
+def render_submission(resume_text, job_desc, score, matching_keywords):
+    """Render one submission as PDF bytes"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+    heading_style, normal_style, title_style, score_style = _styles()
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    story = []
+
+    # Title
+    story.append(Paragraph("Resume Keyword Matcher Submission", title_style))
+    story.append(Spacer(1, 20))
+
+    # Score
+    story.append(Paragraph(f"Match Score: {score:.2f}%", score_style))
+    story.append(Spacer(1, 20))
+
+    # Resume Text
+    story.append(Paragraph("Resume Text:", heading_style))
+    story.append(Spacer(1, 10))
+    story.append(Paragraph(resume_text[:1000] + "...", normal_style))
+    story.append(Spacer(1, 20))
+
+    # Job Description
+    story.append(Paragraph("Job Description:", heading_style))
+    story.append(Spacer(1, 10))
+    story.append(Paragraph(job_desc[:1000] + "...", normal_style))
+    story.append(Spacer(1, 20))
+
+    # Matching Keywords
+    story.append(Paragraph("Matching Keywords:", heading_style))
+    story.append(Spacer(1, 10))
+    story.append(Paragraph(matching_keywords, normal_style))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+class ReportRenderer:
+    """Renders submission PDFs on a small thread pool and caches them in SQLite
+
+    Submissions never change once stored, so a rendered PDF stays valid in
+    the ``submission_reports`` table until evicted: once the stored size
+    passes ``max_bytes`` the least recently downloaded reports are dropped,
+    and are rendered again if asked for. ``schedule`` queues a render
+    without waiting (used right after /submit); ``get`` returns the cached
+    PDF or waits for its render. Concurrent requests for the same
+    submission share one render.
+    """
+
+    def __init__(self, db_path=None, workers=REPORT_WORKERS, timeout=RENDER_TIMEOUT,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.db_path = db_path
+        self.workers = workers
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self._executor = None
+        self._pid = None
+        self._pending = {}
+        # Re-entrant: a future that is already done runs its callback inside schedule()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.renders = 0
+        self.evictions = 0
+
+    def _get_executor(self):
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='report')
+            self._pid = os.getpid()
+            self._pending = {}
+        return self._executor
+
+    def cached(self, submission_id):
+        row = db.query_one('SELECT pdf FROM submission_reports WHERE submission_id = ?',
+                           (submission_id,), path=self.db_path)
+        return row[0] if row else None
+
+    def schedule(self, submission_id):
+        """Queue a render of submission_id and return its future"""
+        with self._lock:
+            future = self._pending.get(submission_id)
+            if future is None:
+                future = self._get_executor().submit(self._render, submission_id)
+                self._pending[submission_id] = future
+                future.add_done_callback(lambda _: self._forget(submission_id))
+            return future
+
+    def _forget(self, submission_id):
+        with self._lock:
+            self._pending.pop(submission_id, None)
+
+    def get(self, submission_id):
+        """Return the PDF for submission_id, rendering it if it isn't cached yet"""
+        pdf = self.cached(submission_id)
+        if pdf is not None:
+            with self._lock:
+                self.hits += 1
+            db.execute('UPDATE submission_reports SET last_used_at = ? WHERE submission_id = ?',
+                       (time.time(), submission_id), path=self.db_path)
+            return pdf
+        return self.schedule(submission_id).result(self.timeout)
+
+    def _render(self, submission_id):
+        pdf = self.cached(submission_id)
+        if pdf is not None:
+            return pdf
+        row = db.query_one('''
+            SELECT resume_text, job_desc, score, matching_keywords
+            FROM submissions WHERE id = ?
+        ''', (submission_id,), path=self.db_path)
+        if row is None:
+            raise KeyError(f"Submission {submission_id} not found")
+        try:
+            pdf = render_submission(*row)
+        except Exception as e:
+            logger.error(f"Error generating PDF for submission {submission_id}: {str(e)}")
+            raise
+        with db.transaction(self.db_path, immediate=True) as conn:
+            inserted = conn.execute('''
+                INSERT OR IGNORE INTO submission_reports (submission_id, pdf, bytes, last_used_at)
+                VALUES (?, ?, ?, ?)
+            ''', (submission_id, pdf, len(pdf), time.time())).rowcount
+            evicted = 0
+            if inserted:
+                evicted = self._evict(conn, db.add_cache_bytes(conn, 'submission_reports', len(pdf), entries=1))
+        with self._lock:
+            self.renders += 1
+            self.evictions += evicted
+        return pdf
+
+    def _evict(self, conn, total):
+        """Delete least recently used reports until total fits; total comes from cache_totals"""
+        if total <= self.max_bytes:
+            return 0
+        victims = []
+        freed = 0
+        cursor = conn.execute('SELECT submission_id, bytes FROM submission_reports ORDER BY last_used_at')
+        for submission_id, size in cursor:
+            if total - freed <= self.max_bytes:
+                break
+            victims.append((submission_id,))
+            freed += size
+        cursor.close()
+        conn.executemany('DELETE FROM submission_reports WHERE submission_id = ?', victims)
+        db.add_cache_bytes(conn, 'submission_reports', -freed, entries=-len(victims))
+        return len(victims)
+
+    def stats(self):
+        size, entries = db.query_one("SELECT bytes, entries FROM cache_totals WHERE name = 'submission_reports'",
+                                     path=self.db_path)
+        with self._lock:
+            return {'hits': self.hits, 'renders': self.renders, 'evictions': self.evictions,
+                    'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes, 'pending': len(self._pending)}
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable file that collects what zipfile writes until drained"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries):
+    """Yield a zip archive of (name, bytes) entries piece by piece
+
+    Only one entry is held in memory at a time. PDFs are already compressed,
+    so entries are stored rather than deflated.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+            yield sink.drain()
+    yield sink.drain()
@@ -1,27 +1,37 @@
-from flask import Flask, request, render_template, redirect, url_for, flash, send_file
+from flask import Flask, request, render_template, redirect, url_for, flash, send_file, jsonify, Response, stream_with_context, g, abort
 import sqlite3
-import PyPDF2
-from sentence_transformers import SentenceTransformer, util
 import io
 import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
-import re
 import html
+import json
 import logging
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from io import BytesIO
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
 import os
-import requests
-from collections import Counter
+import time
 from datetime import datetime
+from functools import wraps
+from keyword_extractor import KeywordExtractor
+from embedding_cache import EmbeddingCache
+from similarity import cosine_scores, normalize_rows
+from vector_index import JobIndex
+import db
+import submission_store
+import notifications
+import job_search
+import pdf_ingest
+import upload_cache
+import highlighter
+import model_loader
+import chunking
+import reports
+import metrics
+import profiling
+import api_tokens
+import bulk_ingest
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -43,81 +53,181 @@ class User(UserMixin):
 @login_manager.user_loader
 def load_user(user_id):
     try:
-        conn = sqlite3.connect('matches.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, username FROM users WHERE id = ?', (user_id,))
-        user = cursor.fetchone()
-        conn.close()
+        user = db.query_one('SELECT id, username FROM users WHERE id = ?', (user_id,))
         if user:
             return User(user[0], user[1])
     except Exception as e:
         logger.error(f"Error loading user: {str(e)}")
     return None
 
-# Initialize the database
-init_db()
-
-# Initialize the NLP model
-try:
-    logger.info("Initializing sentence-transformers model...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    logger.info("Model initialized successfully")
-except Exception as e:
-    logger.error(f"Error initializing model: {str(e)}")
-    raise
+# Scoring: 'truncate' embeds each document once, 'chunked' scores token-sized windows
+SCORING_MODE = os.environ.get('SCORING_MODE', 'truncate')
+CHUNK_POOLING = os.environ.get('CHUNK_POOLING', 'max')  # or 'mean'
 
 # Constants
 MAX_TEXT_LENGTH = 10000  # ~2000 words
+# Chunked scoring reads the whole document; this is only a safety limit. It
+# applies to the scorer and PDF extraction, while keywords, highlighting and
+# stored texts keep MAX_TEXT_LENGTH.
+CHUNKED_MAX_TEXT_LENGTH = int(os.environ.get('CHUNKED_MAX_TEXT_LENGTH', 50000))
+SCORED_TEXT_LENGTH = CHUNKED_MAX_TEXT_LENGTH if SCORING_MODE == 'chunked' else MAX_TEXT_LENGTH
 MAX_PDF_SIZE = 5 * 1024 * 1024  # 5MB
 MAX_SUGGESTIONS = 5
+MAX_BATCH_JOBS = 500
+ENCODE_BATCH_SIZE = 64
 
 # Hunter API configuration
 HUNTER_API_KEY = os.environ.get('HUNTER_API_KEY', 'your-api-key-here')
-HUNTER_API_URL = 'https://api.hunter.io/v2/email-verifier'
+HUNTER_API_URL = os.environ.get('HUNTER_API_URL', 'https://api.hunter.io/v2/email-verifier')
+HUNTER_SEND_URL = os.environ.get('HUNTER_SEND_URL', 'https://api.hunter.io/v2/email-sender')
+EMAIL_WORKER_CONCURRENCY = int(os.environ.get('EMAIL_WORKER_CONCURRENCY', 4))
 ADZUNA_APP_ID = os.environ.get('ADZUNA_APP_ID', 'your-app-id-here')
 ADZUNA_API_KEY = os.environ.get('ADZUNA_API_KEY', 'your-api-key-here')
-ADZUNA_API_URL = 'https://api.adzuna.com/v1/api/jobs/us/search/1'
+ADZUNA_API_URL = os.environ.get('ADZUNA_API_URL', 'https://api.adzuna.com/v1/api/jobs/us/search/1')
+ADZUNA_PREFETCH = os.environ.get('ADZUNA_PREFETCH', '').lower() in ('1', 'true', 'yes')
+ADZUNA_CACHE_TTL = int(os.environ.get('ADZUNA_CACHE_TTL', 15 * 60))
+PDF_WORKERS = int(os.environ['PDF_WORKERS']) if 'PDF_WORKERS' in os.environ else None
+PDF_TIMEOUT = float(os.environ.get('PDF_TIMEOUT', pdf_ingest.PDF_TIMEOUT))
 
 def init_db():
+    """Apply pending schema migrations; existing data is kept"""
     try:
-        conn = sqlite3.connect('matches.db')
-        cursor = conn.cursor()
-        
-        # Drop existing tables
-        cursor.execute('DROP TABLE IF EXISTS submissions')
-        cursor.execute('DROP TABLE IF EXISTS users')
-        
-        # Create users table
-        cursor.execute('''
-            CREATE TABLE users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL
-            )
-        ''')
-        
-        # Create submissions table with user_id foreign key and created_at
-        cursor.execute('''
-            CREATE TABLE submissions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                resume_text TEXT NOT NULL,
-                job_desc TEXT NOT NULL,
-                score REAL,
-                matching_keywords TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY(user_id) REFERENCES users(id)
-            )
-        ''')
-        
-        conn.commit()
-        logger.info("Database initialized successfully")
+        version = db.migrate()
+        logger.info(f"Database initialized successfully (schema version {version})")
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}")
         raise
-    finally:
-        conn.close()
+
+# Initialize the database
+init_db()
+
+# Keyword extraction vocabularies are built once per process
+keyword_extractor = KeywordExtractor(max_text_length=MAX_TEXT_LENGTH)
+
+# Embeddings are cached by content hash in memory and in matches.db
+EMBEDDING_CACHE_MAX_BYTES = int(os.environ.get('EMBEDDING_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+EMBEDDING_DISK_MAX_BYTES = int(os.environ.get('EMBEDDING_DISK_MAX_BYTES', 512 * 1024 * 1024))
+embedding_cache = EmbeddingCache(db.DB_PATH, namespace=model_loader.CACHE_NAMESPACE,
+                                 max_bytes=EMBEDDING_CACHE_MAX_BYTES, max_disk_bytes=EMBEDDING_DISK_MAX_BYTES)
+
+def encode_texts(texts, batch_size=32):
+    """Embed texts through the cache, loading the model on first use"""
+    return embedding_cache.encode(model_loader.get_model(), texts, batch_size=batch_size)
+
+# Vector index over every stored job description
+JOB_INDEX_PATH = os.environ.get('JOB_INDEX_PATH', 'job_index')
+JOB_INDEX_NPROBE = int(os.environ.get('JOB_INDEX_NPROBE', 8))
+MAX_SIMILAR_JOBS = 100
+job_index = JobIndex(JOB_INDEX_PATH, nprobe=JOB_INDEX_NPROBE)
+
+# PDF text is extracted in a process pool, stopping once the scorer has enough
+pdf_extractor = pdf_ingest.PdfExtractor(processes=PDF_WORKERS, timeout=PDF_TIMEOUT,
+                                        max_chars=SCORED_TEXT_LENGTH)
+
+# Repeat uploads of the same PDF reuse its text, keywords and embedding
+UPLOAD_CACHE_MAX_BYTES = int(os.environ.get('UPLOAD_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+uploads = upload_cache.UploadCache(namespace=f'{model_loader.CACHE_NAMESPACE}:{SCORED_TEXT_LENGTH}',
+                                   max_bytes=UPLOAD_CACHE_MAX_BYTES)
+
+# Export PDFs are rendered once, in the background, and kept in matches.db up to a size cap
+RENDER_REPORTS_ON_SUBMIT = os.environ.get('RENDER_REPORTS_ON_SUBMIT', '1').lower() in ('1', 'true', 'yes')
+REPORT_CACHE_MAX_BYTES = int(os.environ.get('REPORT_CACHE_MAX_BYTES', reports.DEFAULT_MAX_BYTES))
+report_renderer = reports.ReportRenderer(workers=int(os.environ.get('REPORT_WORKERS', reports.REPORT_WORKERS)),
+                                         max_bytes=REPORT_CACHE_MAX_BYTES)
+
+# Email notifications go through a durable outbox drained in the background
+hunter_client = notifications.HunterClient(HUNTER_API_KEY, HUNTER_API_URL, HUNTER_SEND_URL)
+notification_worker = notifications.NotificationWorker(hunter_client, concurrency=EMAIL_WORKER_CONCURRENCY)
+
+def start_background_workers():
+    """Start this process's outbox drainer so emails queued before a restart go out
+
+    Called once per gunicorn worker (gunicorn.conf.py) and by ``__main__``.
+    """
+    notification_worker.ensure_started()
+
+def prefetch_job_embeddings(jobs):
+    """Embed a fetched result page in one batch so later scoring hits the cache"""
+    encode_texts([truncate_text(job['description']) for job in jobs], batch_size=ENCODE_BATCH_SIZE)
+
+# Adzuna searches are cached per normalized query
+adzuna_client = job_search.AdzunaClient(
+    ADZUNA_APP_ID, ADZUNA_API_KEY, ADZUNA_API_URL,
+    cache=job_search.TTLCache(ttl=ADZUNA_CACHE_TTL),
+    prefetch=ADZUNA_PREFETCH,
+    on_results=prefetch_job_embeddings
+)
+
+# Latency histograms for /metrics; a timed span costs a few microseconds
+STAGE_SECONDS = metrics.histogram('resume_matcher_stage_seconds', 'Time spent in each stage of a request',
+                                  ['route', 'stage'])
+REQUEST_SECONDS = metrics.histogram('resume_matcher_request_seconds', 'Request latency by endpoint and status',
+                                    ['endpoint', 'status'])
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # when set, /metrics requires "Authorization: Bearer <token>"
+
+@metrics.collector
+def cache_metrics():
+    """Hit counts the caches keep anyway, read at scrape time"""
+    embeddings = embedding_cache.stats()
+    upload_stats = uploads.stats()
+    job_search_stats = adzuna_client.cache.stats()
+    report_stats = report_renderer.stats()
+    yield 'resume_matcher_cache_lookups_total', 'counter', 'Cache lookups by cache and result', [
+        ({'cache': 'embeddings', 'result': 'memory_hit'}, embeddings['memory_hits']),
+        ({'cache': 'embeddings', 'result': 'disk_hit'}, embeddings['disk_hits']),
+        ({'cache': 'embeddings', 'result': 'miss'}, embeddings['misses']),
+        ({'cache': 'uploads', 'result': 'hit'}, upload_stats['hits']),
+        ({'cache': 'uploads', 'result': 'miss'}, upload_stats['misses']),
+        ({'cache': 'job_search', 'result': 'hit'}, job_search_stats['hits']),
+        ({'cache': 'job_search', 'result': 'miss'}, job_search_stats['misses']),
+        ({'cache': 'reports', 'result': 'hit'}, report_stats['hits']),
+        ({'cache': 'reports', 'result': 'miss'}, report_stats['renders']),
+    ]
+    yield 'resume_matcher_model_loaded', 'gauge', 'Whether this process has loaded the model', [
+        ({}, int(model_loader.is_loaded())),
+    ]
+
+# Sampled cProfile captures of /submit, kept in a ring of files under PROFILE_DIR
+ADMIN_USERS = {name.strip() for name in os.environ.get('ADMIN_USERS', '').split(',') if name.strip()}
+request_profiler = profiling.RequestProfiler(
+    directory=os.environ.get('PROFILE_DIR', profiling.PROFILE_DIR),
+    sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', 0)),
+    max_profiles=int(os.environ.get('PROFILE_MAX_CAPTURES', profiling.MAX_PROFILES))
+)
+
+def is_admin():
+    return current_user.is_authenticated and current_user.username in ADMIN_USERS
+
+def profiled(view):
+    """Profile a sample of calls to view; an admin's "X-Profile: 1" header forces a capture"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        forced = request.headers.get('X-Profile') == '1' and is_admin()
+        info = {'method': request.method, 'path': request.path, 'user_id': current_user.get_id()}
+        return request_profiler.run(request.endpoint, view, *args, forced=forced, info=info, **kwargs)
+    return wrapper
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    # Streamed responses are measured up to their first byte
+    start = g.pop('request_start', None)
+    if start is not None and request.endpoint not in (None, 'static', 'metrics_endpoint'):
+        REQUEST_SECONDS.observe(time.perf_counter() - start, request.endpoint, str(response.status_code))
+    return response
+
+def json_object(fallback=None):
+    """The request's JSON object, or fallback ({} if None) when there's no JSON body
+
+    Returns None for JSON that isn't an object, such as ``[]``.
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        return {} if fallback is None else fallback
+    return data if isinstance(data, dict) else None
 
 def sanitize_text(text):
     """Sanitize text input to prevent XSS"""
@@ -127,117 +237,13 @@ def truncate_text(text):
     """Truncate text to prevent performance issues"""
     return text[:MAX_TEXT_LENGTH] if len(text) > MAX_TEXT_LENGTH else text
 
+def scoring_text(text):
+    """Cut text to what compute_similarity reads; longer than truncate_text in chunked mode"""
+    return text[:SCORED_TEXT_LENGTH] if len(text) > SCORED_TEXT_LENGTH else text
+
 def extract_keywords(text):
-    # Sanitize and truncate input
-    text = sanitize_text(truncate_text(text))
-    
-    # Convert to lowercase and handle special cases
-    text = text.lower()
-    text = text.replace('node.js', 'nodejs')
-    text = text.replace('express.js', 'expressjs')
-    text = text.replace('dev ops', 'devops')
-    text = text.replace('dev-ops', 'devops')
-    text = text.replace('devops engineer', 'devops engineer')
-    
-    # Tokenize
-    words = word_tokenize(text)
-    
-    # Remove stopwords and non-alphabetic tokens
-    stop_words = set(stopwords.words('english'))
-    # Add common words that shouldn't be considered as keywords
-    stop_words.update(['experience', 'year', 'years', 'skill', 'skills', 'strong',
-                      'description', 'candidate', 'looking', 'ideal', 'job',
-                      'knowledge', 'familiarity', 'high', 'control', 'seeking',
-                      'with'])
-    
-    # Define technical terms that should always be considered
-    technical_terms = {
-        # Job Titles
-        'developer', 'engineer', 'architect', 'devops', 'sre', 'administrator',
-        'lead', 'senior', 'junior', 'fullstack', 'frontend', 'backend',
-        
-        # Programming Languages
-        'python', 'javascript', 'java', 'typescript', 'ruby', 'php', 'scala', 'kotlin', 'swift',
-        
-        # Web Technologies
-        'react', 'angular', 'vue', 'nodejs', 'expressjs', 'django', 'flask', 'fastapi',
-        'spring', 'hibernate', 'jquery', 'bootstrap', 'tailwind', 'sass', 'less',
-        'webpack', 'babel', 'html', 'css',
-        
-        # DevOps & Infrastructure
-        'docker', 'kubernetes', 'jenkins', 'circleci', 'travis', 'gitlab', 'github',
-        'aws', 'azure', 'gcp', 'terraform', 'ansible', 'puppet', 'chef', 'nginx',
-        'apache', 'container', 'microservices', 'serverless', 'lambda',
-        'ci', 'cd', 'cicd', 'infrastructure', 'orchestration',
-        
-        # Databases
-        'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'dynamodb',
-        'cassandra', 'mariadb', 'oracle',
-        
-        # Operating Systems & Tools
-        'linux', 'unix', 'windows', 'macos', 'git', 'svn', 'mercurial',
-        
-        # API & Architecture
-        'restful', 'graphql', 'api', 'apis', 'soap', 'microservice',
-        
-        # Cloud & Infrastructure
-        'cloud', 'iaas', 'paas', 'saas', 'virtualization', 'containerization',
-        
-        # UI/UX
-        'material', 'ui', 'ux', 'responsive', 'mobile', 'cross-platform',
-        'accessibility', 'wcag', 'usability',
-        
-        # Security
-        'oauth', 'jwt', 'authentication', 'authorization', 'security',
-        
-        # Testing
-        'junit', 'pytest', 'jest', 'selenium', 'cypress', 'testing'
-    }
-    
-    # Extract keywords
-    keywords = []
-    i = 0
-    while i < len(words):
-        # Clean the current word
-        word = words[i].strip('.,()[]{}')
-        
-        # Skip if word is too short or in stop words
-        if len(word) <= 2 or word in stop_words:
-            i += 1
-            continue
-        
-        # Try to match two-word technical terms
-        if i < len(words) - 1:
-            two_words = word + ' ' + words[i + 1].strip('.,()[]{}')
-            if two_words in technical_terms:
-                keywords.append(two_words)
-                i += 2
-                continue
-        
-        # Handle technical terms
-        if word in technical_terms:
-            keywords.append(word)
-            i += 1
-            continue
-        
-        # Handle compound terms
-        if '.' in word or '-' in word:
-            parts = word.replace('-', '.').split('.')
-            if all(len(p) > 2 for p in parts):
-                keywords.extend(parts)
-            i += 1
-            continue
-        
-        # Handle regular words
-        if word.isalpha() and len(word) > 2:
-            keywords.append(word)
-        i += 1
-    
-    # Get unique keywords while preserving order
-    seen = set()
-    unique_keywords = [x for x in keywords if not (x in seen or seen.add(x))]
-    
-    return set(unique_keywords)
+    """Extract the keyword set used for matching"""
+    return keyword_extractor.extract(text)
 
 def get_important_keywords(text):
     """Extract important keywords that should be considered for matching"""
@@ -283,73 +289,83 @@ def get_important_keywords(text):
 
 def highlight_keywords(text, keywords):
     """Highlight keywords in text while properly escaping HTML"""
-    # Sanitize input
-    text = sanitize_text(text)
-    
-    # Create a regex pattern for the keywords
-    pattern = r'\b(' + '|'.join(re.escape(k) for k in keywords) + r')\b'
-    
-    # Replace keywords with highlighted version, but escape HTML first
-    escaped_text = html.escape(text)
-    highlighted_text = re.sub(
-        pattern,
-        lambda m: f'<span class="highlight">{html.escape(m.group(1))}</span>',
-        escaped_text,
-        flags=re.IGNORECASE
-    )
-    return highlighted_text
+    return highlighter.highlight(text, keywords)
 
-def send_email_notification(user_email, score):
-    """Send email notification using Hunter API"""
-    try:
-        # Verify email first
-        verify_params = {
-            'api_key': HUNTER_API_KEY,
-            'email': user_email
-        }
-        verify_response = requests.get(HUNTER_API_URL, params=verify_params)
-        verify_data = verify_response.json()
-        
-        if verify_data.get('data', {}).get('status') == 'valid':
-            # Send email using Hunter's email sending service
-            email_params = {
-                'api_key': HUNTER_API_KEY,
-                'to': user_email,
-                'subject': 'New Resume Match Submission',
-                'text': f'Your resume match submission has been processed.\n\nMatch Score: {score:.2f}%\n\nView your submissions at: {request.host_url}submissions'
-            }
-            response = requests.post('https://api.hunter.io/v2/email-sender', params=email_params)
-            return response.status_code == 200
-        return False
-    except Exception as e:
-        logger.error(f"Error sending email notification: {str(e)}")
-        return False
+def queue_email_notification(conn, user_email, score):
+    """Queue the submission email; the outbox worker delivers it off-request"""
+    notifications.enqueue_email(
+        conn,
+        user_email,
+        'New Resume Match Submission',
+        f'Your resume match submission has been processed.\n\nMatch Score: {score:.2f}%\n\nView your submissions at: {request.host_url}submissions'
+    )
 
 def fetch_job_description(query):
     """Fetch job description from Adzuna API"""
     try:
-        params = {
-            'app_id': ADZUNA_APP_ID,
-            'app_key': ADZUNA_API_KEY,
-            'what': query,
-            'results_per_page': 1
-        }
-        response = requests.get(ADZUNA_API_URL, params=params)
-        data = response.json()
-        
-        if response.status_code == 200 and data.get('results'):
-            job = data['results'][0]
-            return {
-                'title': job.get('title', ''),
-                'description': job.get('description', ''),
-                'company': job.get('company_name', ''),
-                'location': job.get('location', {}).get('display_name', '')
-            }
-        return None
+        jobs = adzuna_client.search(query)
+        return jobs[0] if jobs else None
     except Exception as e:
         logger.error(f"Error fetching job description: {str(e)}")
         return None
 
+def compare_keywords(resume_keywords, job_keywords):
+    """Matching keywords, and the longest missing ones as suggestions"""
+    matching_keywords = resume_keywords.intersection(job_keywords)
+    # Sort missing keywords by length (longer keywords first) and limit to top 5
+    missing_keywords = sorted(list(job_keywords - resume_keywords), key=len, reverse=True)[:MAX_SUGGESTIONS]
+    return matching_keywords, missing_keywords
+
+def compute_similarity(resume_text, job_desc, route, cached_upload=None):
+    """Score in percent, section scores (chunked mode only) and both embeddings"""
+    sections = None
+    # Chunked scoring also pools its section scores inside this stage
+    with STAGE_SECONDS.time(route, 'encode'):
+        if SCORING_MODE == 'chunked':
+            score, sections, resume_embedding, job_embedding = chunking.score_chunked(
+                lambda texts: encode_texts(texts, batch_size=ENCODE_BATCH_SIZE),
+                resume_text, job_desc, pooling=CHUNK_POOLING)
+        elif cached_upload is not None:
+            resume_embedding = cached_upload[2]
+            job_embedding = encode_texts([job_desc])[0]
+        else:
+            resume_embedding, job_embedding = encode_texts([resume_text, job_desc])
+    if sections is None:
+        with STAGE_SECONDS.time(route, 'similarity'):
+            score = float(cosine_scores(resume_embedding, job_embedding[None])[0]) * 100
+    return score, sections, resume_embedding, job_embedding
+
+def save_match(user_id, resume_text, job_desc, score, matching_keywords, job_embedding, route, notify=True):
+    """Store a match with its rollups, job index entry and report
+
+    Returns ``(submission_id, email_queued)``.
+    """
+    user_email = None
+    with STAGE_SECONDS.time(route, 'db_insert'), db.transaction() as conn:
+        submission_id = submission_store.save_submission(
+            conn, user_id, resume_text, job_desc, score, matching_keywords)
+        
+        # Queue the email notification with the submission
+        if notify:
+            user_email = conn.execute('SELECT email FROM users WHERE id = ?', (user_id,)).fetchone()[0]
+            if user_email:
+                queue_email_notification(conn, user_email, score)
+    
+    if user_email:
+        notification_worker.notify()
+    
+    # Make the job description searchable from /jobs/similar
+    try:
+        with STAGE_SECONDS.time(route, 'job_index'):
+            job_index.add([submission_id], [embedding_cache.key(job_desc)], job_embedding)
+    except Exception as e:
+        logger.error(f"Error updating job index: {str(e)}")
+    
+    # Render the export PDF now so the first download is served from cache
+    if RENDER_REPORTS_ON_SUBMIT:
+        report_renderer.schedule(submission_id)
+    return submission_id, bool(user_email)
+
 @app.route('/')
 @login_required
 def index():
@@ -357,6 +373,7 @@ def index():
 
 @app.route('/submit', methods=['POST'])
 @login_required
+@profiled
 def submit():
     try:
         resume_text = request.form.get('resume_text', '')
@@ -372,6 +389,8 @@ def submit():
             return redirect(url_for('index'))
             
         # Handle PDF upload
+        upload_key = None
+        cached_upload = None
         if 'resume' in request.files:
             resume_file = request.files['resume']
             if resume_file.filename != '':
@@ -389,88 +408,396 @@ def submit():
                     return redirect(url_for('index'))
                 
                 try:
-                    # Read PDF content
-                    pdf_reader = PyPDF2.PdfReader(resume_file)
-                    resume_text = ''
-                    for page in pdf_reader.pages:
-                        resume_text += page.extract_text() + '\n'
+                    data = resume_file.read()
+                    upload_key = upload_cache.digest(data)
+                    cached_upload = uploads.get(upload_key)
+                    if cached_upload is not None:
+                        resume_text = cached_upload[0]
+                    else:
+                        # Read PDF content, skipping pages past SCORED_TEXT_LENGTH
+                        with STAGE_SECONDS.time('submit', 'pdf_extract'):
+                            resume_text = pdf_extractor.extract(data)
+                except pdf_ingest.PdfTimeoutError as e:
+                    logger.error(f"Error processing PDF: {str(e)}")
+                    flash('PDF took too long to process', 'error')
+                    return redirect(url_for('index'))
                 except Exception as e:
                     logger.error(f"Error processing PDF: {str(e)}")
                     flash('Error processing PDF file', 'error')
                     return redirect(url_for('index'))
         
-        # Truncate texts if too long
+        # Truncate texts if too long; chunked scoring reads further
+        scored_resume, scored_job = scoring_text(resume_text), scoring_text(job_desc)
         resume_text = truncate_text(resume_text)
         job_desc = truncate_text(job_desc)
         
         # Extract keywords
-        resume_keywords = extract_keywords(resume_text)
-        job_keywords = extract_keywords(job_desc)
+        with STAGE_SECONDS.time('submit', 'keywords'):
+            resume_keywords = cached_upload[1] if cached_upload else extract_keywords(resume_text)
+            job_keywords = extract_keywords(job_desc)
         
         # Find matching and missing keywords
-        matching_keywords = resume_keywords.intersection(job_keywords)
-        missing_keywords = job_keywords - resume_keywords
-        
-        # Sort missing keywords by length (longer keywords first) and limit to top 5
-        missing_keywords = sorted(list(missing_keywords), key=len, reverse=True)[:MAX_SUGGESTIONS]
+        matching_keywords, missing_keywords = compare_keywords(resume_keywords, job_keywords)
         
         # Compute similarity score
         try:
-            resume_embedding = model.encode(resume_text, convert_to_tensor=True)
-            job_embedding = model.encode(job_desc, convert_to_tensor=True)
-            score = util.pytorch_cos_sim(resume_embedding, job_embedding).item() * 100
+            score, sections, resume_embedding, job_embedding = compute_similarity(
+                scored_resume, scored_job, 'submit', cached_upload)
         except Exception as e:
             logger.error(f"Error computing similarity: {str(e)}")
             flash(f"Error computing similarity: {str(e)}", 'error')
             return redirect(url_for('index'))
         
+        # Remember the processed upload for the next submission of the same PDF
+        if upload_key is not None and cached_upload is None:
+            try:
+                uploads.put(upload_key, scored_resume, resume_keywords, resume_embedding)
+            except Exception as e:
+                logger.error(f"Error caching upload: {str(e)}")
+        
         # Store in database with user_id
         try:
-            conn = sqlite3.connect('matches.db')
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO submissions 
-                (user_id, resume_text, job_desc, score, matching_keywords) 
-                VALUES (?, ?, ?, ?, ?)
-            ''', (current_user.id, resume_text, job_desc, score, ','.join(matching_keywords)))
-            conn.commit()
-            
-            # Get user's email from database
-            cursor.execute('SELECT email FROM users WHERE id = ?', (current_user.id,))
-            user_email = cursor.fetchone()[0]
-            
-            # Send email notification
-            if user_email:
-                if send_email_notification(user_email, score):
-                    flash('Email notification sent successfully', 'success')
-                else:
-                    flash('Submission successful, but email notification failed', 'warning')
-            
+            _, email_queued = save_match(current_user.id, resume_text, job_desc, score,
+                                         matching_keywords, job_embedding, 'submit')
+            if email_queued:
+                flash('Email notification queued', 'success')
         except Exception as e:
             logger.error(f"Error saving to database: {str(e)}")
             flash(f"Error saving to database: {str(e)}", 'error')
             return redirect(url_for('index'))
-        finally:
-            conn.close()
         
         # Highlight keywords in texts
-        highlighted_resume = highlight_keywords(resume_text, matching_keywords)
-        highlighted_job_desc = highlight_keywords(job_desc, matching_keywords)
+        with STAGE_SECONDS.time('submit', 'highlight'):
+            highlighted_resume = highlight_keywords(resume_text, matching_keywords)
+            highlighted_job_desc = highlight_keywords(job_desc, matching_keywords)
         
         flash('Submission successful!', 'success')
-        return render_template('result.html', 
-                             message="Submission saved successfully!", 
-                             score=score,
-                             matching_keywords=', '.join(matching_keywords),
-                             highlighted_resume=highlighted_resume,
-                             highlighted_job_desc=highlighted_job_desc,
-                             missing_keywords=', '.join(missing_keywords))
+        with STAGE_SECONDS.time('submit', 'render'):
+            return render_template('result.html', 
+                                 message="Submission saved successfully!", 
+                                 score=score,
+                                 matching_keywords=', '.join(matching_keywords),
+                                 highlighted_resume=highlighted_resume,
+                                 highlighted_job_desc=highlighted_job_desc,
+                                 missing_keywords=', '.join(missing_keywords),
+                                 sections=sections)
     
     except Exception as e:
         logger.error(f"Unexpected error in submit route: {str(e)}")
         flash(f"An unexpected error occurred: {str(e)}", 'error')
         return redirect(url_for('index'))
 
+def score_jobs(resume_text, job_descs, batch_size=ENCODE_BATCH_SIZE, top_k=None):
+    """Score one resume against many job descriptions in a single pass
+
+    All texts are embedded with one batched encode and the cosine scores come
+    from one matrix product. Returns results ranked by score, highest first,
+    keeping only the best ``top_k`` when it is given.
+    """
+    resume_text = truncate_text(resume_text)
+    job_descs = [truncate_text(job_desc) for job_desc in job_descs]
+
+    embeddings = encode_texts([resume_text] + job_descs, batch_size=batch_size)
+    scores = cosine_scores(embeddings[0], embeddings[1:]) * 100
+
+    resume_keywords = extract_keywords(resume_text)
+    results = []
+    for index, job_desc in enumerate(job_descs):
+        job_keywords = extract_keywords(job_desc)
+        missing_keywords = sorted(job_keywords - resume_keywords, key=len, reverse=True)[:MAX_SUGGESTIONS]
+        results.append({
+            'index': index,
+            'score': float(scores[index]),
+            'matching_keywords': sorted(resume_keywords & job_keywords),
+            'missing_keywords': missing_keywords
+        })
+
+    results.sort(key=lambda r: r['score'], reverse=True)
+    return results[:top_k] if top_k else results
+
+@app.route('/api/batch-score', methods=['POST'])
+@login_required
+def batch_score():
+    data = json_object()
+    if data is None:
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    resume_text = data.get('resume_text', '')
+    job_descs = data.get('job_descriptions')
+
+    # Input validation
+    if not isinstance(resume_text, str) or not resume_text.strip():
+        return jsonify({'error': 'Please provide resume_text'}), 400
+    if not isinstance(job_descs, list) or not job_descs:
+        return jsonify({'error': 'Please provide a list of job_descriptions'}), 400
+    if len(job_descs) > MAX_BATCH_JOBS:
+        return jsonify({'error': f'At most {MAX_BATCH_JOBS} job descriptions per request'}), 400
+    if not all(isinstance(j, str) and j.strip() for j in job_descs):
+        return jsonify({'error': 'Job descriptions must be non-empty strings'}), 400
+
+    top_k = data.get('top_k')
+    try:
+        results = score_jobs(resume_text, job_descs,
+                             top_k=top_k if isinstance(top_k, int) and top_k > 0 else None)
+    except Exception as e:
+        logger.error(f"Error in batch scoring: {str(e)}")
+        return jsonify({'error': 'Error computing similarity'}), 500
+
+    return jsonify({'count': len(job_descs), 'results': results})
+
+def api_token_required(view):
+    """Authenticate with "Authorization: Bearer <token>" instead of the session cookie"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        header = request.headers.get('Authorization', '')
+        user_id = api_tokens.authenticate(header[7:]) if header.startswith('Bearer ') else None
+        if user_id is None:
+            return jsonify({'error': 'Invalid or missing API token'}), 401
+        g.api_user_id = user_id
+        return view(*args, **kwargs)
+    return wrapper
+
+@app.route('/api/v1/match', methods=['POST'])
+@api_token_required
+def api_match():
+    """Score one resume against one job description and return JSON
+
+    The match is stored like a /submit (history, dashboard, job index) but
+    sends no email. Highlighted HTML is only produced with
+    ``"highlight": true``.
+    """
+    data = json_object()
+    if data is None:
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    resume_text = data.get('resume_text')
+    job_desc = data.get('job_desc')
+
+    # Input validation
+    if not isinstance(resume_text, str) or not resume_text.strip():
+        return jsonify({'error': 'Please provide resume_text'}), 400
+    if not isinstance(job_desc, str) or not job_desc.strip():
+        return jsonify({'error': 'Please provide job_desc'}), 400
+
+    scored_resume, scored_job = scoring_text(resume_text), scoring_text(job_desc)
+    resume_text = truncate_text(resume_text)
+    job_desc = truncate_text(job_desc)
+    with STAGE_SECONDS.time('api_match', 'keywords'):
+        resume_keywords = extract_keywords(resume_text)
+        job_keywords = extract_keywords(job_desc)
+    matching_keywords, missing_keywords = compare_keywords(resume_keywords, job_keywords)
+
+    try:
+        score, sections, _, job_embedding = compute_similarity(scored_resume, scored_job, 'api_match')
+    except Exception as e:
+        logger.error(f"Error computing similarity: {str(e)}")
+        return jsonify({'error': 'Error computing similarity'}), 500
+
+    try:
+        submission_id, _ = save_match(g.api_user_id, resume_text, job_desc, score, matching_keywords,
+                                      job_embedding, 'api_match', notify=False)
+    except Exception as e:
+        logger.error(f"Error saving to database: {str(e)}")
+        return jsonify({'error': 'Error saving to database'}), 500
+
+    result = {
+        'submission_id': submission_id,
+        'score': round(score, 2),
+        'matching_keywords': sorted(matching_keywords),
+        'missing_keywords': missing_keywords
+    }
+    if sections is not None:
+        result['sections'] = sections
+    if data.get('highlight') is True:
+        with STAGE_SECONDS.time('api_match', 'highlight'):
+            result['highlighted_resume'] = highlight_keywords(resume_text, matching_keywords)
+            result['highlighted_job_desc'] = highlight_keywords(job_desc, matching_keywords)
+    return jsonify(result)
+
+@app.route('/api/v1/tokens', methods=['GET', 'POST'])
+@login_required
+def manage_api_tokens():
+    """List the current user's API tokens, or issue a new one (shown only once)"""
+    if request.method == 'POST':
+        data = json_object(request.form)
+        if data is None:
+            return jsonify({'error': 'Expected a JSON object'}), 400
+        name = data.get('name')
+        token_id, token = api_tokens.create_token(current_user.id, name)
+        return jsonify({'id': token_id, 'name': name, 'token': token}), 201
+    return jsonify({'tokens': [{'id': row[0], 'name': row[1], 'created_at': row[2]}
+                               for row in api_tokens.list_tokens(current_user.id)]})
+
+@app.route('/api/v1/tokens/<int:token_id>', methods=['DELETE'])
+@login_required
+def revoke_api_token(token_id):
+    if not api_tokens.revoke_token(current_user.id, token_id):
+        return jsonify({'error': 'Token not found'}), 404
+    return '', 204
+
+def ingest_chunk(user_id, chunk):
+    """Score and store one chunk of ``(line number, record, error)`` tuples
+
+    Returns one result dict per tuple, in order. Keywords are extracted
+    once per distinct text, all texts are embedded in one batch (one call
+    per pair in chunked mode), and the rows are stored in one transaction
+    with their rollups; the job index is updated once.
+    """
+    results = [{'line': line_number} for line_number, _, _ in chunk]
+    pending = []
+    for i, (_, record, error) in enumerate(chunk):
+        if record is None:
+            results[i]['error'] = error
+            continue
+        if 'id' in record:
+            results[i]['id'] = record['id']
+        pending.append((i, record))
+    if not pending:
+        return results
+
+    resume_texts = [truncate_text(record['resume_text']) for _, record in pending]
+    job_descs = [truncate_text(record['job_desc']) for _, record in pending]
+    with STAGE_SECONDS.time('ingest', 'keywords'):
+        # Bulk input tends to repeat job descriptions; extract each text once
+        keywords = {text: extract_keywords(text) for text in set(resume_texts + job_descs)}
+        compared = [compare_keywords(keywords[resume_text], keywords[job_desc])
+                    for resume_text, job_desc in zip(resume_texts, job_descs)]
+
+    def fail(message):
+        for i, _ in pending:
+            results[i]['error'] = message
+        return results
+
+    try:
+        sections = None
+        if SCORING_MODE == 'chunked':
+            scored = [compute_similarity(scoring_text(record['resume_text']), scoring_text(record['job_desc']),
+                                         'ingest') for _, record in pending]
+            scores = [s[0] for s in scored]
+            sections = [s[1] for s in scored]
+            job_embeddings = [s[3] for s in scored]
+        else:
+            with STAGE_SECONDS.time('ingest', 'encode'):
+                embeddings = encode_texts(resume_texts + job_descs, batch_size=ENCODE_BATCH_SIZE)
+            with STAGE_SECONDS.time('ingest', 'similarity'):
+                resume_embeddings, job_embeddings = embeddings[:len(pending)], embeddings[len(pending):]
+                scores = ((normalize_rows(resume_embeddings) * normalize_rows(job_embeddings)).sum(axis=1)
+                          * 100).tolist()
+    except Exception as e:
+        logger.error(f"Error computing similarity: {str(e)}")
+        return fail('Error computing similarity')
+
+    try:
+        with STAGE_SECONDS.time('ingest', 'db_insert'), db.transaction(immediate=True) as conn:
+            submission_ids = submission_store.save_submissions(conn, user_id, [
+                (resume_text, job_desc, score, matching_keywords)
+                for resume_text, job_desc, score, (matching_keywords, _)
+                in zip(resume_texts, job_descs, scores, compared)])
+    except Exception as e:
+        logger.error(f"Error saving to database: {str(e)}")
+        return fail('Error saving to database')
+
+    # Export PDFs are not pre-rendered here; they render on first download
+    try:
+        with STAGE_SECONDS.time('ingest', 'job_index'):
+            job_index.add(submission_ids, [embedding_cache.key(job_desc) for job_desc in job_descs], job_embeddings)
+    except Exception as e:
+        logger.error(f"Error updating job index: {str(e)}")
+
+    for (i, _), submission_id, score, (matching_keywords, missing_keywords), section_scores in zip(
+            pending, submission_ids, scores, compared, sections or [None] * len(pending)):
+        results[i].update(submission_id=submission_id, score=round(score, 2),
+                          matching_keywords=sorted(matching_keywords), missing_keywords=missing_keywords)
+        if section_scores is not None:
+            results[i]['sections'] = section_scores
+    return results
+
+INGEST_CHUNK_SIZE = int(os.environ.get('INGEST_CHUNK_SIZE', bulk_ingest.CHUNK_SIZE))
+INGEST_CONTENT_TYPES = ('application/x-ndjson', 'application/jsonl')
+
+def ingest_jsonl(stream, user_id, chunk_size=INGEST_CHUNK_SIZE):
+    """Score and store every pair in a JSONL stream, yielding one result per line"""
+    for chunk in bulk_ingest.chunked(bulk_ingest.read_records(stream), chunk_size):
+        yield from ingest_chunk(user_id, chunk)
+
+@app.route('/api/v1/ingest', methods=['POST'])
+@api_token_required
+def api_ingest():
+    """Bulk /api/v1/match: a JSONL body or ``file`` upload in, JSONL results out
+
+    Results are streamed back chunk by chunk while the input is still being
+    read. Like /api/v1/match, matches are stored without sending email. Other
+    content types get a 415: a form-encoded body would be consumed by form
+    parsing and read as empty.
+    """
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({'error': 'Please provide file'}), 400
+        stream = upload.stream
+    elif request.mimetype in INGEST_CONTENT_TYPES:
+        stream = request.stream
+    else:
+        return jsonify({'error': f"Send {' or '.join(INGEST_CONTENT_TYPES)}, "
+                                 f"or multipart/form-data with a file"}), 415
+    user_id = g.api_user_id
+    results = (json.dumps(result) + '\n' for result in ingest_jsonl(stream, user_id))
+    return Response(stream_with_context(results), mimetype='application/x-ndjson')
+
+def backfill_job_index(batch_size=ENCODE_BATCH_SIZE):
+    """Index job descriptions stored before the job index existed"""
+    # A dedicated connection: the cursor stays open while the cache writes
+    conn = db.connect()
+    try:
+        cursor = conn.execute('SELECT MIN(id), job_desc FROM submissions GROUP BY job_desc')
+        added = 0
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            pending = [(row_id, job_desc, embedding_cache.key(job_desc)) for row_id, job_desc in rows]
+            pending = [p for p in pending if not job_index.contains(p[2])]
+            if pending:
+                embeddings = encode_texts([p[1] for p in pending], batch_size=batch_size)
+                added += job_index.add([p[0] for p in pending], [p[2] for p in pending], embeddings)
+        logger.info(f"Backfilled {added} job descriptions into the job index")
+        return added
+    finally:
+        conn.close()
+
+@app.route('/jobs/similar', methods=['POST'])
+@login_required
+def similar_jobs():
+    data = json_object(request.form)
+    if data is None:
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    resume_text = data.get('resume_text', '')
+    if not isinstance(resume_text, str) or not resume_text.strip():
+        return jsonify({'error': 'Please provide resume_text'}), 400
+    try:
+        k = min(int(data.get('k', 20)), MAX_SIMILAR_JOBS)
+        nprobe = int(data['nprobe']) if data.get('nprobe') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'k and nprobe must be integers'}), 400
+    exact = str(data.get('exact', '')).lower() in ('1', 'true', 'yes')
+
+    try:
+        resume_embedding = encode_texts([truncate_text(resume_text)])[0]
+        matches = job_index.search(resume_embedding, k=k, nprobe=nprobe, exact=exact)
+    except Exception as e:
+        logger.error(f"Error searching job index: {str(e)}")
+        return jsonify({'error': 'Error searching job index'}), 500
+
+    previews = {}
+    if matches:
+        ids = [submission_id for submission_id, _ in matches]
+        placeholders = ','.join('?' * len(ids))
+        previews = dict(db.query_all(
+            f'SELECT id, substr(job_desc, 1, 200) FROM submissions WHERE id IN ({placeholders})', ids))
+
+    return jsonify({'results': [
+        {'submission_id': submission_id, 'score': score * 100, 'job_desc': previews.get(submission_id, '')}
+        for submission_id, score in matches
+    ]})
+
 @app.route('/register', methods=['GET', 'POST'])
 def register():
     if request.method == 'POST':
@@ -504,26 +831,21 @@ def register():
             return render_template('register.html')
         
         try:
-            conn = sqlite3.connect('matches.db')
-            cursor = conn.cursor()
-            
             # Check if username exists
-            cursor.execute('SELECT id FROM users WHERE username = ?', (username,))
-            if cursor.fetchone():
+            if db.query_one('SELECT id FROM users WHERE username = ?', (username,)):
                 flash('Username already exists', 'error')
                 return render_template('register.html')
                 
             # Check if email exists
-            cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
-            if cursor.fetchone():
+            if db.query_one('SELECT id FROM users WHERE email = ?', (email,)):
                 flash('Email already registered', 'error')
                 return render_template('register.html')
             
             # Hash password and create user
             hashed_password = generate_password_hash(password)
-            cursor.execute('INSERT INTO users (username, email, password) VALUES (?, ?, ?)',
-                         (username, email, hashed_password))
-            conn.commit()
+            with db.transaction() as conn:
+                conn.execute('INSERT INTO users (username, email, password) VALUES (?, ?, ?)',
+                             (username, email, hashed_password))
             
             flash('Registration successful! Please log in', 'success')
             return redirect(url_for('login'))
@@ -531,8 +853,6 @@ def register():
             logger.error(f"Error in registration: {str(e)}")
             flash('An error occurred during registration', 'error')
             return render_template('register.html')
-        finally:
-            conn.close()
     
     return render_template('register.html')
 
@@ -552,10 +872,7 @@ def login():
             return render_template('login.html')
         
         try:
-            conn = sqlite3.connect('matches.db')
-            cursor = conn.cursor()
-            cursor.execute('SELECT id, username, password FROM users WHERE username = ?', (username,))
-            user = cursor.fetchone()
+            user = db.query_one('SELECT id, username, password FROM users WHERE username = ?', (username,))
             
             if user and check_password_hash(user[2], password):
                 user_obj = User(user[0], user[1])
@@ -567,8 +884,6 @@ def login():
         except Exception as e:
             logger.error(f"Error in login: {str(e)}")
             flash('An error occurred during login', 'error')
-        finally:
-            conn.close()
     
     return render_template('login.html')
 
@@ -583,91 +898,44 @@ def logout():
 @login_required
 def submissions():
     try:
-        conn = sqlite3.connect('matches.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id, resume_text, job_desc, score, matching_keywords 
-            FROM submissions 
-            WHERE user_id = ? 
-            ORDER BY id DESC
-        ''', (current_user.id,))
-        submissions = cursor.fetchall()
-        conn.close()
+        page = submission_store.submissions_page(
+            current_user.id,
+            before=request.args.get('before', type=int),
+            after=request.args.get('after', type=int)
+        )
         
-        return render_template('submissions.html', submissions=submissions)
+        return render_template('submissions.html', submissions=page['rows'],
+                               newer=page['newer'], older=page['older'])
     except Exception as e:
         logger.error(f"Error fetching submissions: {str(e)}")
         flash('Error loading submissions', 'error')
         return redirect(url_for('index'))
 
+@app.route('/submissions/<int:submission_id>')
+@login_required
+def submission_detail(submission_id):
+    texts = submission_store.submission_texts(current_user.id, submission_id)
+    if texts is None:
+        return jsonify({'error': 'Submission not found'}), 404
+    return jsonify(texts)
+
 @app.route('/export/<int:submission_id>')
 @login_required
 def export_pdf(submission_id):
     try:
-        conn = sqlite3.connect('matches.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT resume_text, job_desc, score, matching_keywords 
-            FROM submissions 
-            WHERE id = ? AND user_id = ?
-        ''', (submission_id, current_user.id))
-        submission = cursor.fetchone()
-        conn.close()
+        submission = db.query_one('SELECT id FROM submissions WHERE id = ? AND user_id = ?',
+                                  (submission_id, current_user.id))
         
         if not submission:
             flash('Submission not found', 'error')
             return redirect(url_for('submissions'))
         
-        # Create PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30
-        )
-        story.append(Paragraph("Resume Keyword Matcher Submission", title_style))
-        story.append(Spacer(1, 20))
-        
-        # Score
-        score_style = ParagraphStyle(
-            'Score',
-            parent=styles['Normal'],
-            fontSize=16,
-            textColor=colors.blue,
-            spaceAfter=20
-        )
-        story.append(Paragraph(f"Match Score: {submission[2]:.2f}%", score_style))
-        story.append(Spacer(1, 20))
-        
-        # Resume Text
-        story.append(Paragraph("Resume Text:", styles['Heading2']))
-        story.append(Spacer(1, 10))
-        story.append(Paragraph(submission[0][:1000] + "...", styles['Normal']))
-        story.append(Spacer(1, 20))
-        
-        # Job Description
-        story.append(Paragraph("Job Description:", styles['Heading2']))
-        story.append(Spacer(1, 10))
-        story.append(Paragraph(submission[1][:1000] + "...", styles['Normal']))
-        story.append(Spacer(1, 20))
-        
-        # Matching Keywords
-        story.append(Paragraph("Matching Keywords:", styles['Heading2']))
-        story.append(Spacer(1, 10))
-        story.append(Paragraph(submission[3], styles['Normal']))
-        
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
+        # Served from the report cache; rendered on first request if needed
+        with STAGE_SECONDS.time('export_pdf', 'report'):
+            pdf = report_renderer.get(submission_id)
         
         return send_file(
-            buffer,
+            BytesIO(pdf),
             as_attachment=True,
             download_name=f'submission_{submission_id}.pdf',
             mimetype='application/pdf'
@@ -678,70 +946,113 @@ def export_pdf(submission_id):
         flash('Error generating PDF', 'error')
         return redirect(url_for('submissions'))
 
+@app.route('/export/all')
+@login_required
+def export_all():
+    """Stream a zip of every submission's PDF, one file at a time"""
+    try:
+        submission_ids = [row[0] for row in db.query_all(
+            'SELECT id FROM submissions WHERE user_id = ? ORDER BY id', (current_user.id,))]
+    except Exception as e:
+        logger.error(f"Error listing submissions for export: {str(e)}")
+        flash('Error exporting submissions', 'error')
+        return redirect(url_for('submissions'))
+    
+    def entries():
+        for submission_id in submission_ids:
+            yield f'submission_{submission_id}.pdf', report_renderer.get(submission_id)
+    
+    return Response(
+        stream_with_context(reports.stream_zip(entries())),
+        mimetype='application/zip',
+        headers={'Content-Disposition': 'attachment; filename=submissions.zip'}
+    )
+
 @app.route('/dashboard')
 @login_required
 def dashboard():
     try:
-        conn = sqlite3.connect('matches.db')
-        cursor = conn.cursor()
+        # Aggregates are maintained on insert, so this reads O(top-k) rows
+        with STAGE_SECONDS.time('dashboard', 'query'):
+            summary = submission_store.dashboard_summary(current_user.id)
         
-        # Get all submissions for the user
-        cursor.execute('''
-            SELECT score, matching_keywords, created_at 
-            FROM submissions 
-            WHERE user_id = ? 
-            ORDER BY created_at DESC
-        ''', (current_user.id,))
-        submissions = cursor.fetchall()
-        
-        if not submissions:
+        if not summary:
             flash('No submissions found. Make your first submission to see analytics.', 'info')
             return render_template('dashboard.html')
         
-        # Prepare data for charts
-        dates = []
-        scores = []
-        all_keywords = []
-        recent_submissions = []
-        
-        for submission in submissions:
-            # Add to recent submissions
-            recent_submissions.append({
-                'date': submission[2],
-                'score': submission[0],
-                'matching_keywords': submission[1]
-            })
-            
-            # Add to score chart data
-            dates.append(submission[2])
-            scores.append(submission[0])
-            
-            # Add to keyword data
-            keywords = submission[1].split(',')
-            all_keywords.extend(keywords)
-        
-        # Get top 10 keywords
-        keyword_counter = Counter(all_keywords)
-        top_keywords = keyword_counter.most_common(10)
-        keywords = [k[0] for k in top_keywords]
-        keyword_counts = [k[1] for k in top_keywords]
-        
-        # Limit recent submissions to 10
-        recent_submissions = recent_submissions[:10]
-        
-        return render_template('dashboard.html',
-                             dates=dates,
-                             scores=scores,
-                             keywords=keywords,
-                             keyword_counts=keyword_counts,
-                             recent_submissions=recent_submissions)
+        with STAGE_SECONDS.time('dashboard', 'render'):
+            return render_template('dashboard.html', **summary)
                              
     except Exception as e:
         logger.error(f"Error in dashboard: {str(e)}")
         flash('Error loading dashboard', 'error')
         return redirect(url_for('index'))
-    finally:
-        conn.close()
+
+@app.route('/submissions/search')
+@login_required
+def search_submissions():
+    keywords = request.args.get('keywords', '').split(',')
+    try:
+        ids = submission_store.submissions_with_keywords(current_user.id, keywords)
+        rows = []
+        if ids:
+            placeholders = ','.join('?' * len(ids))
+            rows = db.query_all(f'''
+                SELECT id, score, matching_keywords, created_at FROM submissions
+                WHERE id IN ({placeholders}) ORDER BY id DESC
+            ''', ids)
+        return jsonify({'submissions': [
+            {'id': row[0], 'score': row[1], 'matching_keywords': row[2], 'created_at': row[3]}
+            for row in rows
+        ]})
+    except Exception as e:
+        logger.error(f"Error searching submissions: {str(e)}")
+        return jsonify({'error': 'Error searching submissions'}), 500
+
+@app.route('/keywords/frequency')
+@login_required
+def keyword_frequency():
+    days = request.args.get('days', 30, type=int)
+    try:
+        rows = submission_store.keyword_frequency(current_user.id, days=days)
+        return jsonify({'days': days, 'keywords': [{'keyword': k, 'count': n} for k, n in rows]})
+    except Exception as e:
+        logger.error(f"Error computing keyword frequency: {str(e)}")
+        return jsonify({'error': 'Error computing keyword frequency'}), 500
+
+@app.route('/cache/stats')
+@login_required
+def cache_stats():
+    return jsonify({
+        'embeddings': embedding_cache.stats(),
+        'job_search': adzuna_client.cache.stats(),
+        'uploads': uploads.stats(),
+        'reports': report_renderer.stats()
+    })
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text exposition of this worker's metrics"""
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/admin/profiles')
+@login_required
+def admin_profiles():
+    if not is_admin():
+        abort(404)
+    return render_template('profiles.html', profiles=request_profiler.slowest(),
+                           sample_rate=request_profiler.sample_rate)
+
+@app.route('/admin/profiles/<capture>.prof')
+@login_required
+def download_profile(capture):
+    path = request_profiler.profile_path(capture) if is_admin() else None
+    if path is None:
+        abort(404)
+    return send_file(os.path.abspath(path), as_attachment=True, download_name=f'{capture}.prof',
+                     mimetype='application/octet-stream')
 
 @app.route('/fetch-job', methods=['POST'])
 @login_required
@@ -762,6 +1073,18 @@ def fetch_job():
         flash('No job found for the search term', 'warning')
         return redirect(url_for('index'))
 
+@app.route('/api/jobs/search')
+@login_required
+def search_jobs():
+    query = request.args.get('q', '')
+    if not query.strip():
+        return jsonify({'error': 'Please provide a search term in q'}), 400
+    try:
+        return jsonify({'results': adzuna_client.search(query)})
+    except Exception as e:
+        logger.error(f"Error searching jobs: {str(e)}")
+        return jsonify({'error': 'Error searching jobs'}), 502
+
 if __name__ == '__main__':
     try:
         # Download required NLTK data
@@ -771,6 +1094,12 @@ if __name__ == '__main__':
         # Initialize the database
         init_db()
         
+        # Index job descriptions stored before the job index existed
+        backfill_job_index()
+        
+        # Deliver emails still queued in the outbox
+        start_background_workers()
+        
         # Run the app
         port = int(os.environ.get('PORT', 5000))
         app.run(host='0.0.0.0', port=port)
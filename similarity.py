@@ -0,0 +1,73 @@
+import numpy as np
+
+
+def normalize_rows(vectors):
+    """Scale each row to unit length so dot products are cosine similarities"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def cosine_scores(query, matrix):
+    """Cosine similarity of one query vector against every row of matrix"""
+    return normalize_rows(matrix) @ normalize_rows(query)
+
+
+def pooled_chunk_scores(resume_chunks, job_chunks, resume_weights, job_weights, pooling='max'):
+    """Combine chunk embeddings of two documents into one similarity
+
+    ``max`` scores every job chunk by its best-matching resume chunk and
+    averages those, weighted by chunk length, so each part of the posting
+    is judged on the section of the resume that covers it best. ``mean``
+    compares the length-weighted mean embeddings of the two documents.
+    Returns ``(score, section_scores)``; ``section_scores`` holds the best
+    match of each resume chunk against any job chunk.
+    """
+    resume_chunks = normalize_rows(resume_chunks)
+    job_chunks = normalize_rows(job_chunks)
+    resume_weights = np.asarray(resume_weights, dtype=np.float32)
+    job_weights = np.asarray(job_weights, dtype=np.float32)
+    similarities = resume_chunks @ job_chunks.T
+    if pooling == 'max':
+        score = float(np.average(similarities.max(axis=0), weights=job_weights))
+    elif pooling == 'mean':
+        score = float(normalize_rows(resume_weights @ resume_chunks) @ normalize_rows(job_weights @ job_chunks))
+    else:
+        raise ValueError(f"Unknown pooling {pooling!r}, expected 'max' or 'mean'")
+    return score, similarities.max(axis=1)
+
+
+def tiled_top_k(queries, corpus, k, tile_rows=1024, tile_cols=8192):
+    """Yield the k best corpus matches for every query row, one row tile at a time
+
+    Both inputs must already be unit-normalized float32. Similarities are only
+    ever materialized as ``tile_rows x tile_cols`` float32 blocks, and a running
+    top-k per query row is merged with each block using ``argpartition``.
+    Yields ``(start, indices, scores)`` where ``indices``/``scores`` have shape
+    ``(rows_in_tile, k)`` sorted by descending score.
+    """
+    k = min(k, corpus.shape[0])
+    if k <= 0:
+        return
+    for start in range(0, queries.shape[0], tile_rows):
+        query_tile = queries[start:start + tile_rows]
+        rows = query_tile.shape[0]
+        best_scores = np.full((rows, k), -np.inf, dtype=np.float32)
+        best_indices = np.zeros((rows, k), dtype=np.int64)
+
+        for col in range(0, corpus.shape[0], tile_cols):
+            block = query_tile @ corpus[col:col + tile_cols].T
+            candidate_scores = np.concatenate([best_scores, block], axis=1)
+            candidate_indices = np.concatenate([
+                best_indices,
+                np.broadcast_to(np.arange(col, col + block.shape[1]), block.shape)
+            ], axis=1)
+            keep = np.argpartition(-candidate_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(candidate_scores, keep, axis=1)
+            best_indices = np.take_along_axis(candidate_indices, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        yield (start,
+               np.take_along_axis(best_indices, order, axis=1),
+               np.take_along_axis(best_scores, order, axis=1))
@@ -0,0 +1,203 @@
+import db
+
+MAX_CHART_POINTS = 60
+TOP_KEYWORDS = 10
+RECENT_SUBMISSIONS = 10
+PAGE_SIZE = 50  # rows per /submissions page
+
+
+KEYWORD_LOOKUP_BATCH = 500  # keywords per "IN (...)" id lookup
+
+
+def save_submission(conn, user_id, resume_text, job_desc, score, matching_keywords):
+    """Insert a submission and update the user's dashboard rollups
+
+    Must run inside db.transaction() so the row and its aggregates commit
+    together. Returns the new submission id.
+    """
+    return save_submissions(conn, user_id, [(resume_text, job_desc, score, matching_keywords)])[0]
+
+
+def save_submissions(conn, user_id, rows):
+    """Insert many ``(resume_text, job_desc, score, matching_keywords)`` rows at once
+
+    Each table is written with one ``executemany`` and the rollups are
+    merged per keyword and per day, so a chunk of rows costs a handful of
+    statements rather than a handful per row. Must run inside
+    db.transaction(); no other writer can interleave, so the new ids are
+    consecutive. Returns the ids in row order.
+    """
+    if not rows:
+        return []
+    conn.executemany('''
+        INSERT INTO submissions 
+        (user_id, resume_text, job_desc, score, matching_keywords, resume_preview, job_preview) 
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [(user_id, resume_text, job_desc, score, ','.join(matching_keywords),
+           resume_text[:db.PREVIEW_CHARS], job_desc[:db.PREVIEW_CHARS])
+          for resume_text, job_desc, score, matching_keywords in rows])
+    last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    submission_ids = list(range(last_id - len(rows) + 1, last_id + 1))
+
+    row_keywords = [sorted(set(k for k in row[3] if k)) for row in rows]
+    keyword_counts = {}
+    for keywords in row_keywords:
+        for keyword in keywords:
+            keyword_counts[keyword] = keyword_counts.get(keyword, 0) + 1
+
+    if keyword_counts:
+        conn.executemany('INSERT OR IGNORE INTO keywords (keyword) VALUES (?)',
+                         [(keyword,) for keyword in keyword_counts])
+        unique = list(keyword_counts)
+        keyword_ids = {}
+        for start in range(0, len(unique), KEYWORD_LOOKUP_BATCH):
+            batch = unique[start:start + KEYWORD_LOOKUP_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            keyword_ids.update(conn.execute(f'SELECT keyword, id FROM keywords WHERE keyword IN ({placeholders})',
+                                            batch).fetchall())
+        conn.executemany('''
+            INSERT OR IGNORE INTO submission_keywords (keyword_id, user_id, submission_id)
+            VALUES (?, ?, ?)
+        ''', [(keyword_ids[keyword], user_id, submission_id)
+              for submission_id, keywords in zip(submission_ids, row_keywords)
+              for keyword in keywords])
+
+    conn.executemany('''
+        INSERT INTO user_keyword_counts (user_id, keyword, count) VALUES (?, ?, ?)
+        ON CONFLICT(user_id, keyword) DO UPDATE SET count = count + excluded.count
+    ''', [(user_id, keyword, count) for keyword, count in keyword_counts.items()])
+    conn.execute('''
+        INSERT INTO user_daily_scores (user_id, day, submissions, score_sum, score_min, score_max)
+        SELECT ?, date(created_at), COUNT(*), SUM(score), MIN(score), MAX(score) FROM submissions
+        WHERE id BETWEEN ? AND ? GROUP BY date(created_at)
+        ON CONFLICT(user_id, day) DO UPDATE SET
+            submissions = submissions + excluded.submissions,
+            score_sum = score_sum + excluded.score_sum,
+            score_min = MIN(score_min, excluded.score_min),
+            score_max = MAX(score_max, excluded.score_max)
+    ''', (user_id, submission_ids[0], submission_ids[-1]))
+    return submission_ids
+
+
+def downsample(days, max_points=MAX_CHART_POINTS):
+    """Merge consecutive (day, submissions, score_sum) rows into at most max_points
+
+    Returns (labels, average scores); each bucket is labelled with its last day.
+    """
+    if not days:
+        return [], []
+    size = -(-len(days) // max_points)  # ceiling division
+    labels = []
+    scores = []
+    for start in range(0, len(days), size):
+        bucket = days[start:start + size]
+        count = sum(row[1] for row in bucket)
+        labels.append(bucket[-1][0])
+        scores.append(round(sum(row[2] for row in bucket) / count, 2) if count else 0)
+    return labels, scores
+
+
+def dashboard_summary(user_id, max_points=MAX_CHART_POINTS):
+    """Read the dashboard from the rollup tables; returns None without submissions"""
+    days = db.query_all('''
+        SELECT day, submissions, score_sum FROM user_daily_scores
+        WHERE user_id = ? ORDER BY day
+    ''', (user_id,))
+    if not days:
+        return None
+
+    top_keywords = db.query_all('''
+        SELECT keyword, count FROM user_keyword_counts
+        WHERE user_id = ? ORDER BY count DESC, keyword LIMIT ?
+    ''', (user_id, TOP_KEYWORDS))
+    recent = db.query_all('''
+        SELECT score, matching_keywords, created_at FROM submissions
+        WHERE user_id = ? ORDER BY created_at DESC LIMIT ?
+    ''', (user_id, RECENT_SUBMISSIONS))
+
+    dates, scores = downsample(days, max_points)
+    return {
+        'dates': dates,
+        'scores': scores,
+        'keywords': [row[0] for row in top_keywords],
+        'keyword_counts': [row[1] for row in top_keywords],
+        'recent_submissions': [
+            {'date': row[2], 'score': row[0], 'matching_keywords': row[1]}
+            for row in recent
+        ],
+    }
+
+
+def submissions_with_keywords(user_id, keywords, limit=100):
+    """Ids of the user's submissions matching every keyword, newest first"""
+    keywords = sorted(set(k.strip().lower() for k in keywords if k.strip()))
+    if not keywords:
+        return []
+    placeholders = ','.join('?' * len(keywords))
+    rows = db.query_all(f'''
+        SELECT sk.submission_id FROM submission_keywords sk
+        JOIN keywords k ON k.id = sk.keyword_id
+        WHERE k.keyword IN ({placeholders}) AND sk.user_id = ?
+        GROUP BY sk.submission_id
+        HAVING COUNT(*) = ?
+        ORDER BY sk.submission_id DESC
+        LIMIT ?
+    ''', (*keywords, user_id, len(keywords), limit))
+    return [row[0] for row in rows]
+
+
+def keyword_frequency(user_id, days=30, limit=20):
+    """(keyword, submissions) pairs for the user's last ``days`` days, most frequent first"""
+    # Count by integer id first; keyword text is only looked up for the winners
+    return db.query_all('''
+        SELECT k.keyword, top.n FROM (
+            SELECT sk.keyword_id, COUNT(*) AS n FROM submissions s
+            JOIN submission_keywords sk ON sk.submission_id = s.id
+            WHERE s.user_id = ? AND s.created_at >= datetime('now', ?)
+            GROUP BY sk.keyword_id
+            ORDER BY n DESC
+            LIMIT ?
+        ) top
+        JOIN keywords k ON k.id = top.keyword_id
+        ORDER BY top.n DESC, k.keyword
+    ''', (user_id, f'-{int(days)} days', limit))
+
+
+def submissions_page(user_id, before=None, after=None, limit=PAGE_SIZE):
+    """One page of the user's submissions, newest first, by keyset on id
+
+    ``before`` pages to older rows than that id, ``after`` to newer ones.
+    Rows are ``(id, resume_preview, job_preview, score, matching_keywords)``
+    and come from idx_submissions_listing alone, so the cost of a page
+    doesn't grow with the user's history or the size of the texts. Returns
+    a dict with the rows and the ``newer``/``older`` cursors for the
+    neighbouring pages (None at either end).
+    """
+    if after is not None:
+        rows = db.query_all('''
+            SELECT id, resume_preview, job_preview, score, matching_keywords FROM submissions
+            WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?
+        ''', (user_id, after, limit + 1))
+        if len(rows) > limit:
+            rows = rows[:limit][::-1]
+            return {'rows': rows, 'newer': rows[0][0], 'older': rows[-1][0]}
+        # Reached the newest rows: show a full first page instead of a short one
+        before = None
+
+    params = (user_id,) if before is None else (user_id, before)
+    rows = db.query_all(f'''
+        SELECT id, resume_preview, job_preview, score, matching_keywords FROM submissions
+        WHERE user_id = ? {'' if before is None else 'AND id < ?'} ORDER BY id DESC LIMIT ?
+    ''', (*params, limit + 1))
+    older = rows[limit - 1][0] if len(rows) > limit else None
+    rows = rows[:limit]
+    newer = rows[0][0] if rows and before is not None else None
+    return {'rows': rows, 'newer': newer, 'older': older}
+
+
+def submission_texts(user_id, submission_id):
+    """Full resume and job texts of one of the user's submissions, or None"""
+    row = db.query_one('''
+        SELECT resume_text, job_desc FROM submissions WHERE id = ? AND user_id = ?
+    ''', (submission_id, user_id))
+    return {'resume_text': row[0], 'job_desc': row[1]} if row else None
@@ -0,0 +1,315 @@
+import unittest
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import logging
+from unittest import mock
+import numpy as np
+import bulk_ingest
+import db
+import submission_store
+from embedding_cache import EmbeddingCache
+from vector_index import JobIndex
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESUME = 'Python developer with Flask and SQL experience'
+JOB = 'Looking for a Python developer who knows SQL'
+
+class WordModel:
+    """Embeds a text as counts of a few words, so related texts score higher"""
+    WORDS = ['python', 'java', 'sql', 'flask', 'developer']
+
+    def encode(self, texts, **kwargs):
+        return np.array([[text.lower().count(word) for word in self.WORDS] + [1.0] for text in texts],
+                        dtype=np.float32)
+
+class ApiTestCase(unittest.TestCase):
+    """Runs the app against a fresh database and job index per test"""
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.original_path = db.DB_PATH
+        db.DB_PATH = os.path.join(cls.tmpdir.name, 'matches.db')
+        original_index = os.environ.get('JOB_INDEX_PATH')
+        os.environ['JOB_INDEX_PATH'] = os.path.join(cls.tmpdir.name, 'job_index')
+        try:
+            import resume_matcher
+        finally:
+            if original_index is None:
+                del os.environ['JOB_INDEX_PATH']
+            else:
+                os.environ['JOB_INDEX_PATH'] = original_index
+        cls.rm = resume_matcher
+
+    @classmethod
+    def tearDownClass(cls):
+        db.close_connections()
+        db.DB_PATH = cls.original_path
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        self.testdir = tempfile.TemporaryDirectory()
+        db.close_connections()
+        db.DB_PATH = os.path.join(self.testdir.name, 'matches.db')
+        db.migrate()
+        patches = [
+            mock.patch.object(self.rm.model_loader, '_model', WordModel()),
+            mock.patch.object(self.rm, 'embedding_cache', EmbeddingCache(db.DB_PATH)),
+            mock.patch.object(self.rm, 'job_index', JobIndex(os.path.join(self.testdir.name, 'job_index'))),
+            mock.patch.object(self.rm, 'RENDER_REPORTS_ON_SUBMIT', False),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.rm.app.config['TESTING'] = True
+        self.client = self.rm.app.test_client()
+        self.user_id = self.login(self.client, 'alice')
+        response = self.client.post('/api/v1/tokens', json={'name': 'ci'})
+        self.token_id = response.get_json()['id']
+        self.headers = {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+    def tearDown(self):
+        db.close_connections()
+        self.testdir.cleanup()
+
+    def login(self, client, username):
+        """Register and log in through the forms; returns the user's id"""
+        client.post('/register', data={'username': username, 'email': f'{username}@example.com',
+                                       'password': 'secret1'})
+        client.post('/login', data={'username': username, 'password': 'secret1'})
+        return db.query_one('SELECT id FROM users WHERE username = ?', (username,))[0]
+
+    def count(self, table):
+        return db.query_one(f'SELECT COUNT(*) FROM {table}')[0]
+
+class TestApiMatch(ApiTestCase):
+    def match(self, payload, headers=None):
+        return self.rm.app.test_client().post('/api/v1/match', json=payload,
+                                              headers=self.headers if headers is None else headers)
+
+    def test_missing_or_invalid_token(self):
+        """Test requests without a valid bearer token get a 401"""
+        payload = {'resume_text': RESUME, 'job_desc': JOB}
+        for headers in ({}, {'Authorization': 'Bearer nope'},
+                        {'Authorization': self.headers['Authorization'].replace('Bearer', 'Token')}):
+            response = self.match(payload, headers)
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(response.get_json(), {'error': 'Invalid or missing API token'})
+        self.assertEqual(self.count('submissions'), 0)
+
+    def test_revoked_token(self):
+        """Test a token stops working once its owner revokes it"""
+        payload = {'resume_text': RESUME, 'job_desc': JOB}
+        self.assertEqual(self.match(payload).status_code, 200)
+        self.assertEqual(self.client.delete(f'/api/v1/tokens/{self.token_id}').status_code, 204)
+        self.assertEqual(self.match(payload).status_code, 401)
+
+    def test_non_object_json(self):
+        """Test JSON that isn't an object, or isn't JSON, gets a 400"""
+        for payload in ([1], 'x', 3):
+            response = self.match(payload)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json(), {'error': 'Expected a JSON object'})
+        response = self.rm.app.test_client().post('/api/v1/match', data='{not json',
+                                                  content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        response = self.match({'resume_text': RESUME, 'job_desc': 7})
+        self.assertEqual(response.get_json(), {'error': 'Please provide job_desc'})
+
+    def test_highlight_only_when_true(self):
+        """Test highlighted HTML is returned only for "highlight": true"""
+        for highlight in (None, False, 'true', 1):
+            payload = {'resume_text': RESUME, 'job_desc': JOB}
+            if highlight is not None:
+                payload['highlight'] = highlight
+            result = self.match(payload).get_json()
+            self.assertIn('score', result)
+            self.assertNotIn('highlighted_resume', result)
+            self.assertNotIn('highlighted_job_desc', result)
+        result = self.match({'resume_text': RESUME + ' <b>', 'job_desc': JOB, 'highlight': True}).get_json()
+        self.assertIn('python', result['matching_keywords'])
+        self.assertIn('&lt;b&gt;', result['highlighted_resume'])
+        self.assertNotEqual(result['highlighted_job_desc'], JOB)
+
+    def test_saved_to_history_without_email(self):
+        """Test a match is stored for the token's user and queues no email"""
+        result = self.match({'resume_text': RESUME, 'job_desc': JOB}).get_json()
+        rows = submission_store.submissions_page(self.user_id)['rows']
+        self.assertEqual([row[0] for row in rows], [result['submission_id']])
+        stored = db.query_one('SELECT user_id, score FROM submissions WHERE id = ?', (result['submission_id'],))
+        self.assertEqual((stored[0], round(stored[1], 2)), (self.user_id, result['score']))
+        self.assertGreater(result['score'], 0)
+        self.assertEqual(self.count('email_outbox'), 0)
+
+class TestTokenRoutes(ApiTestCase):
+    def test_login_required(self):
+        """Test the token routes redirect to the login page without a session"""
+        client = self.rm.app.test_client()
+        for response in (client.get('/api/v1/tokens'), client.post('/api/v1/tokens', json={'name': 'x'}),
+                         client.delete(f'/api/v1/tokens/{self.token_id}')):
+            self.assertEqual(response.status_code, 302)
+            self.assertIn('/login', response.headers['Location'])
+        # A bearer token doesn't stand in for the session either
+        self.assertEqual(client.get('/api/v1/tokens', headers=self.headers).status_code, 302)
+
+    def test_create_list_revoke(self):
+        """Test tokens are shown once on creation, listed without it and revoked by id"""
+        response = self.client.post('/api/v1/tokens', json={'name': 'deploy'})
+        self.assertEqual(response.status_code, 201)
+        created = response.get_json()
+        self.assertEqual(created['name'], 'deploy')
+        self.assertTrue(created['token'])
+
+        tokens = self.client.get('/api/v1/tokens').get_json()['tokens']
+        self.assertEqual([(t['id'], t['name']) for t in tokens], [(self.token_id, 'ci'), (created['id'], 'deploy')])
+        self.assertNotIn('token', tokens[0])
+
+        self.assertEqual(self.client.post('/api/v1/tokens', json=[1]).status_code, 400)
+        self.assertEqual(self.client.delete(f"/api/v1/tokens/{created['id']}").status_code, 204)
+        self.assertEqual(self.client.delete(f"/api/v1/tokens/{created['id']}").status_code, 404)
+        self.assertEqual([t['id'] for t in self.client.get('/api/v1/tokens').get_json()['tokens']],
+                         [self.token_id])
+
+    def test_other_users_tokens(self):
+        """Test users only see and revoke their own tokens"""
+        other = self.rm.app.test_client()
+        self.login(other, 'bob')
+        self.assertEqual(other.get('/api/v1/tokens').get_json(), {'tokens': []})
+        self.assertEqual(other.delete(f'/api/v1/tokens/{self.token_id}').status_code, 404)
+        self.assertEqual(len(self.client.get('/api/v1/tokens').get_json()['tokens']), 1)
+
+def jsonl(*records):
+    return ''.join(json.dumps(record) + '\n' for record in records).encode('utf-8')
+
+PAIRS = [
+    {'id': 'a', 'resume_text': RESUME, 'job_desc': JOB},
+    {'resume_text': 'Java developer', 'job_desc': 'Senior Java developer with SQL'},
+    {'resume_text': 'Flask and Python', 'job_desc': 'Python Flask engineer'},
+    {'resume_text': 'SQL analyst', 'job_desc': 'Java and SQL developer'},
+]
+
+class TestApiIngest(ApiTestCase):
+    def ingest(self, body, content_type='application/x-ndjson', headers=None):
+        response = self.rm.app.test_client().post('/api/v1/ingest', data=body, content_type=content_type,
+                                                  headers=self.headers if headers is None else headers)
+        return response
+
+    def results(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def rollups(self):
+        """Keyword counts and submissions per day, and the same recounted from submissions"""
+        stored = dict(db.query_all('SELECT keyword, count FROM user_keyword_counts WHERE user_id = ?',
+                                   (self.user_id,)))
+        expected = {}
+        for (keywords,) in db.query_all('SELECT matching_keywords FROM submissions WHERE user_id = ?',
+                                        (self.user_id,)):
+            for keyword in set(k for k in keywords.split(',') if k):
+                expected[keyword] = expected.get(keyword, 0) + 1
+        daily = db.query_one('SELECT COALESCE(SUM(submissions), 0) FROM user_daily_scores WHERE user_id = ?',
+                             (self.user_id,))[0]
+        return stored, expected, daily
+
+    def test_missing_token(self):
+        """Test ingest requires a bearer token and stores nothing without one"""
+        for headers in ({}, {'Authorization': 'Bearer nope'}):
+            self.assertEqual(self.ingest(jsonl(*PAIRS), headers=headers).status_code, 401)
+        self.assertEqual(self.count('submissions'), 0)
+
+    def test_other_content_types(self):
+        """Test form-encoded and other bodies get a 415, and a multipart request needs a file"""
+        for content_type in ('application/x-www-form-urlencoded', 'text/plain', 'application/json'):
+            response = self.ingest(jsonl(*PAIRS), content_type=content_type)
+            self.assertEqual(response.status_code, 415)
+            self.assertIn('application/x-ndjson', response.get_json()['error'])
+        response = self.ingest({'other': (io.BytesIO(jsonl(*PAIRS)), 'pairs.jsonl')},
+                               content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(), {'error': 'Please provide file'})
+        self.assertEqual(self.count('submissions'), 0)
+
+    def test_body_and_file_upload(self):
+        """Test a JSONL body and a multipart file give the same results, stored for the token's user"""
+        by_body = self.results(self.ingest(jsonl(*PAIRS)))
+        by_jsonl_type = self.results(self.ingest(jsonl(*PAIRS), content_type='application/jsonl'))
+        by_file = self.results(self.ingest({'file': (io.BytesIO(jsonl(*PAIRS)), 'pairs.jsonl')},
+                                           content_type='multipart/form-data'))
+        for results in (by_body, by_jsonl_type, by_file):
+            self.assertEqual([r['line'] for r in results], [1, 2, 3, 4])
+            self.assertEqual(results[0]['id'], 'a')
+            self.assertNotIn('sections', results[0])
+        self.assertEqual([r['score'] for r in by_file], [r['score'] for r in by_body])
+        self.assertEqual([r['matching_keywords'] for r in by_file], [r['matching_keywords'] for r in by_body])
+        ids = [r['submission_id'] for results in (by_body, by_jsonl_type, by_file) for r in results]
+        self.assertEqual(len(set(ids)), 12)
+        self.assertEqual(db.query_one('SELECT COUNT(*) FROM submissions WHERE user_id = ?', (self.user_id,))[0], 12)
+        self.assertEqual(self.count('email_outbox'), 0)
+
+    def test_line_errors(self):
+        """Test bad lines get an error result in place and the rest are still stored"""
+        body = b'\n'.join([
+            b'{not json',
+            json.dumps(PAIRS[0]).encode('utf-8'),
+            b'[1]',
+            json.dumps({'resume_text': RESUME}).encode('utf-8'),
+            json.dumps({'resume_text': ' ', 'job_desc': JOB}).encode('utf-8'),
+            b'',
+            json.dumps({'resume_text': 'x' * bulk_ingest.MAX_LINE_BYTES, 'job_desc': JOB}).encode('utf-8'),
+            json.dumps(PAIRS[1]).encode('utf-8'),
+        ])
+        results = self.results(self.ingest(body))
+        self.assertEqual([(r['line'], r.get('error')) for r in results], [
+            (1, 'Invalid JSON'),
+            (2, None),
+            (3, 'Expected a JSON object'),
+            (4, 'Please provide job_desc'),
+            (5, 'Please provide resume_text'),
+            (7, f'Line longer than {bulk_ingest.MAX_LINE_BYTES} bytes'),
+            (8, None),
+        ])
+        self.assertEqual(self.count('submissions'), 2)
+
+    def test_chunked_sections(self):
+        """Test chunked scoring mode returns section scores like /api/v1/match"""
+        with mock.patch.object(self.rm, 'SCORING_MODE', 'chunked'):
+            results = self.results(self.ingest(jsonl(*PAIRS)))
+            match = self.rm.app.test_client().post('/api/v1/match', json=PAIRS[0], headers=self.headers).get_json()
+        self.assertEqual(len(results), 4)
+        for result in results:
+            self.assertIn('sections', result)
+        self.assertEqual(results[0]['sections'], match['sections'])
+        self.assertEqual(results[0]['score'], match['score'])
+
+    def test_failed_chunk_leaves_no_partial_rollups(self):
+        """Test a chunk whose transaction fails stores neither its rows nor its rollups"""
+        save_submissions = submission_store.save_submissions
+        saved = []
+        def fail_second_chunk(conn, user_id, rows):
+            # Write everything, then fail, so only the rollback keeps it out
+            ids = save_submissions(conn, user_id, rows)
+            if saved:
+                raise sqlite3.OperationalError('disk I/O error')
+            saved.extend(ids)
+            return ids
+        with mock.patch.object(submission_store, 'save_submissions', side_effect=fail_second_chunk):
+            results = list(self.rm.ingest_jsonl(io.BytesIO(jsonl(*PAIRS)), self.user_id, chunk_size=2))
+
+        self.assertEqual([r.get('submission_id') for r in results], saved + [None, None])
+        self.assertEqual([r.get('error') for r in results[2:]], ['Error saving to database'] * 2)
+        self.assertEqual(db.query_all('SELECT id FROM submissions ORDER BY id'), [(i,) for i in saved])
+        stored, expected, daily = self.rollups()
+        self.assertTrue(stored)
+        self.assertEqual(stored, expected)
+        self.assertEqual(daily, 2)
+        self.assertEqual(db.query_one('SELECT COUNT(*) FROM submission_keywords WHERE submission_id NOT IN '
+                                      '(SELECT id FROM submissions)')[0], 0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,42 @@
+import unittest
+import os
+import tempfile
+import logging
+import db
+import api_tokens
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestApiTokens(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'matches.db')
+        db.migrate(self.path)
+
+    def tearDown(self):
+        db.close_connections()
+        self.tmpdir.cleanup()
+
+    def test_token_authenticates_its_user(self):
+        """Test an issued token maps back to its user and only its hash is stored"""
+        token_id, token = api_tokens.create_token(7, 'ci', path=self.path)
+        self.assertEqual(api_tokens.authenticate(token, path=self.path), 7)
+        self.assertIsNone(api_tokens.authenticate(token + 'x', path=self.path))
+        self.assertIsNone(api_tokens.authenticate('', path=self.path))
+        stored = db.query_one('SELECT token_hash FROM api_tokens WHERE id = ?', (token_id,), path=self.path)[0]
+        self.assertEqual(stored, api_tokens.hash_token(token))
+        self.assertNotIn(token, stored)
+
+    def test_revoke(self):
+        """Test a revoked token stops working and users can't revoke each other's tokens"""
+        token_id, token = api_tokens.create_token(7, 'ci', path=self.path)
+        self.assertFalse(api_tokens.revoke_token(8, token_id, path=self.path))
+        self.assertEqual(api_tokens.authenticate(token, path=self.path), 7)
+        self.assertTrue(api_tokens.revoke_token(7, token_id, path=self.path))
+        self.assertIsNone(api_tokens.authenticate(token, path=self.path))
+        self.assertEqual(api_tokens.list_tokens(7, path=self.path), [])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
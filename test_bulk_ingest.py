@@ -0,0 +1,40 @@
+import unittest
+import io
+import logging
+import bulk_ingest
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestBulkIngest(unittest.TestCase):
+    def test_read_records(self):
+        """Test valid lines become records and bad ones errors, with their line numbers"""
+        stream = io.BytesIO(b'{"resume_text": "python", "job_desc": "sql", "id": 7}\n'
+                            b'\n'
+                            b'not json\n'
+                            b'[1, 2]\n'
+                            b'{"resume_text": "python", "job_desc": " "}\n'
+                            b'{"resume_text": "r", "job_desc": "j"}')
+        records = list(bulk_ingest.read_records(stream))
+        self.assertEqual([r[0] for r in records], [1, 3, 4, 5, 6])
+        self.assertEqual(records[0][1]['id'], 7)
+        self.assertIsNone(records[0][2])
+        self.assertEqual([r[2] for r in records[1:4]], ['Invalid JSON', 'Expected a JSON object',
+                                                        'Please provide job_desc'])
+        self.assertEqual(records[4][1], {'resume_text': 'r', 'job_desc': 'j'})
+
+    def test_long_lines_are_skipped(self):
+        """Test an oversized line is reported and reading resumes at the next line"""
+        stream = io.StringIO('x' * 100 + '\n' + '{"resume_text": "r", "job_desc": "j"}\n')
+        records = list(bulk_ingest.read_records(stream, max_line_bytes=40))
+        self.assertEqual(records[0], (1, None, 'Line longer than 40 bytes'))
+        self.assertEqual(records[1][:2], (2, {'resume_text': 'r', 'job_desc': 'j'}))
+
+    def test_chunked(self):
+        """Test items are grouped in order with a short final chunk"""
+        self.assertEqual(list(bulk_ingest.chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(bulk_ingest.chunked([], 2)), [])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,72 @@
+import unittest
+import logging
+import numpy as np
+from chunking import split_chunks, chunk_label, score_chunked
+from similarity import pooled_chunk_scores
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+VOCABULARY = ['python', 'flask', 'sql', 'react', 'css', 'sales', 'marketing', 'budget']
+
+def bag_of_words(texts):
+    """Deterministic stand-in for the model: counts of a few known words"""
+    return np.array([[text.lower().split().count(w) + 0.01 for w in VOCABULARY] for text in texts],
+                    dtype=np.float32)
+
+class TestChunking(unittest.TestCase):
+    def test_paragraphs_are_packed(self):
+        """Test short paragraphs share a window and windows break between paragraphs"""
+        text = 'a b c\n\nd e f\n\ng h i j'
+        self.assertEqual(split_chunks(text, max_words=6, overlap=2), ['a b c d e f', 'g h i j'])
+
+    def test_long_paragraph_overlaps(self):
+        """Test a paragraph longer than a window is cut into overlapping windows"""
+        words = [str(i) for i in range(10)]
+        chunks = split_chunks(' '.join(words), max_words=4, overlap=1)
+        self.assertEqual(chunks, ['0 1 2 3', '3 4 5 6', '6 7 8 9'])
+        self.assertTrue(all(len(c.split()) <= 4 for c in chunks))
+
+    def test_chunk_limit(self):
+        """Test the number of chunks per document is bounded"""
+        text = '\n\n'.join(f'word{i}' for i in range(100))
+        self.assertEqual(len(split_chunks(text, max_words=1, overlap=0, max_chunks=5)), 5)
+
+    def test_label(self):
+        """Test labels are the opening words of a chunk"""
+        self.assertEqual(chunk_label('SKILLS python flask', words=2), 'SKILLS python...')
+        self.assertEqual(chunk_label('SKILLS python', words=2), 'SKILLS python')
+
+    def test_max_pooling_finds_relevant_section(self):
+        """Test a relevant section deep in a long resume still drives the max-pooled score"""
+        filler = '\n\n'.join(['sales marketing budget ' * 20] * 6)  # two full windows
+        resume = filler + '\n\npython flask sql python flask sql'
+        job = 'python flask sql'
+        calls = []
+
+        def encode(texts):
+            calls.append(len(texts))
+            return bag_of_words(texts)
+
+        max_score, sections, resume_vector, job_vector = score_chunked(encode, resume, job, pooling='max')
+        mean_score, _, _, _ = score_chunked(encode, resume, job, pooling='mean')
+        self.assertEqual(calls[0], len(sections) + 1 + 2)  # one batch: chunks plus both documents
+        self.assertGreater(max_score, 95)
+        self.assertLess(mean_score, max_score)
+        self.assertGreater(sections[-1]['score'], 95)
+        self.assertLess(sections[0]['score'], 10)
+        self.assertEqual(resume_vector.shape, job_vector.shape)
+
+    def test_pooled_scores_weighting(self):
+        """Test max pooling weights job chunks by length"""
+        resume = np.array([[1.0, 0.0]])
+        job = np.array([[1.0, 0.0], [0.0, 1.0]])
+        score, sections = pooled_chunk_scores(resume, job, [1], [3, 1], pooling='max')
+        self.assertAlmostEqual(score, 0.75, places=6)
+        np.testing.assert_allclose(sections, [1.0])
+        with self.assertRaises(ValueError):
+            pooled_chunk_scores(resume, job, [1], [1, 1], pooling='median')
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
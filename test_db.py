@@ -0,0 +1,79 @@
+import unittest
+import os
+import sqlite3
+import tempfile
+import logging
+import threading
+import db
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'matches.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_fresh_database(self):
+        """Test a new database gets the latest schema, indexes and WAL"""
+        version = db.migrate(self.path)
+        self.assertEqual(version, db.MIGRATIONS[-1][0])
+        conn = sqlite3.connect(self.path)
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        conn.close()
+        self.assertIn('idx_submissions_user_created', indexes)
+        self.assertEqual(mode, 'wal')
+
+    def test_existing_data_is_kept(self):
+        """Test migrating a pre-migration database keeps its rows"""
+        conn = sqlite3.connect(self.path)
+        db._create_base_schema(conn.cursor())
+        conn.execute("INSERT INTO users (username, password, email) VALUES ('alice', 'x', 'a@b.c')")
+        conn.commit()
+        conn.close()
+
+        db.migrate(self.path)
+        db.migrate(self.path)  # second run is a no-op
+
+        conn = db.connect(self.path)
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM users').fetchone()[0], 1)
+        conn.close()
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'matches.db')
+        db.migrate(self.path)
+
+    def tearDown(self):
+        db.close_connections()
+        self.tmpdir.cleanup()
+
+    def test_connection_reused_per_thread(self):
+        """Test each thread keeps one connection and threads don't share it"""
+        self.assertIs(db.get_connection(self.path), db.get_connection(self.path))
+        other = []
+        thread = threading.Thread(target=lambda: other.append(db.get_connection(self.path)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], db.get_connection(self.path))
+
+    def test_transaction_rollback(self):
+        """Test a failing block leaves no partial writes behind"""
+        with self.assertRaises(ValueError):
+            with db.transaction(self.path) as conn:
+                conn.execute("INSERT INTO users (username, password, email) VALUES ('bob', 'x', 'b@b.c')")
+                raise ValueError('boom')
+        self.assertEqual(db.query_one('SELECT COUNT(*) FROM users', path=self.path)[0], 0)
+
+        with db.transaction(self.path) as conn:
+            conn.execute("INSERT INTO users (username, password, email) VALUES ('bob', 'x', 'b@b.c')")
+        self.assertEqual(db.query_one('SELECT COUNT(*) FROM users', path=self.path)[0], 1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
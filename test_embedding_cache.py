@@ -0,0 +1,102 @@
+import unittest
+import os
+import tempfile
+import logging
+import sqlite3
+import numpy as np
+import db
+from embedding_cache import EmbeddingCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class CountingModel:
+    """Stand-in for SentenceTransformer that records every encode call"""
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        self.calls.append(list(texts))
+        return np.array([[len(t), t.count(' '), 1.0] for t in texts], dtype=np.float32)
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'matches.db')
+        self.model = CountingModel()
+
+    def migrate(self):
+        db.migrate(self.db_path)
+
+    def tearDown(self):
+        db.close_connections()
+        self.tmpdir.cleanup()
+
+    def test_repeat_texts_skip_model(self):
+        """Test repeated and whitespace-variant texts hit the memory tier"""
+        self.migrate()
+        cache = EmbeddingCache(self.db_path)
+        first = cache.encode(self.model, ['python developer', 'react  developer'])
+        second = cache.encode(self.model, ['python developer', ' react developer '])
+        self.assertEqual(len(self.model.calls), 1)
+        np.testing.assert_array_equal(first, second)
+        stats = cache.stats()
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['memory_hits'], 2)
+
+    def test_persistent_tier(self):
+        """Test a fresh process reads vectors back from SQLite"""
+        self.migrate()
+        EmbeddingCache(self.db_path).encode(self.model, ['python developer'])
+        cache = EmbeddingCache(self.db_path)
+        vectors = cache.encode(self.model, ['python developer'])
+        self.assertEqual(len(self.model.calls), 1)
+        self.assertEqual(vectors.shape, (1, 3))
+        self.assertEqual(cache.stats()['disk_hits'], 1)
+
+    def test_byte_budget(self):
+        """Test the LRU tier stays within its byte budget"""
+        cache = EmbeddingCache(self.db_path, max_bytes=24, persistent=False)
+        cache.encode(self.model, ['a', 'b', 'c'])
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], 24)
+        self.assertEqual(stats['entries'], 2)
+
+    def test_disk_budget(self):
+        """Test the SQLite tier evicts least recently used rows past max_disk_bytes"""
+        self.migrate()
+        cache = EmbeddingCache(self.db_path, max_disk_bytes=36)  # three 12-byte vectors
+        cache.encode(self.model, ['a', 'b', 'c'])
+        EmbeddingCache(self.db_path).encode(self.model, ['a'])  # disk hit refreshes 'a'
+        cache.encode(self.model, ['d'])
+        stored = {key for key, in db.query_all('SELECT key FROM embeddings', path=self.db_path)}
+        self.assertEqual(stored, {cache.key(t) for t in ('a', 'c', 'd')})
+        totals = db.query_one("SELECT bytes, entries FROM cache_totals WHERE name = 'embeddings'", path=self.db_path)
+        self.assertEqual(totals, (36, 3))
+        self.assertEqual(cache.stats()['disk_evictions'], 1)
+
+    def test_table_created_before_migrations(self):
+        """Test a table made by the old on-first-use code is migrated and read"""
+        cache = EmbeddingCache(self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE embeddings (
+                key TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute('INSERT INTO embeddings (key, dim, vector) VALUES (?, 3, ?)',
+                     (cache.key('a'), np.ones(3, dtype=np.float32).tobytes()))
+        conn.commit()
+        conn.close()
+        self.migrate()
+        np.testing.assert_array_equal(cache.encode(self.model, ['a'])[0], np.ones(3))
+        self.assertEqual(self.model.calls, [])
+        totals = db.query_one("SELECT bytes, entries FROM cache_totals WHERE name = 'embeddings'", path=self.db_path)
+        self.assertEqual(totals, (12, 1))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
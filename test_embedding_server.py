@@ -0,0 +1,162 @@
+import unittest
+import os
+import tempfile
+import threading
+import logging
+import time
+import numpy as np
+from embedding_server import EmbeddingServer, EmbeddingClient, EmbeddingServerError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class RecordingModel:
+    """Stand-in for SentenceTransformer that records the size of every encode call"""
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        if 'fail' in texts:
+            raise RuntimeError('model failed')
+        self.calls.append(len(texts))
+        return np.array([[len(t), t.count(' '), 1.0] for t in texts], dtype=np.float32)
+
+class BlockingModel(RecordingModel):
+    """Blocks every encode call until released"""
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.entered = threading.Event()
+
+    def encode(self, texts, **kwargs):
+        self.entered.set()
+        self.release.wait(10)
+        return super().encode(texts, **kwargs)
+
+class TestEmbeddingServer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmpdir.name, 'embeddings.sock')
+        self.model = RecordingModel()
+        self.server = EmbeddingServer(self.model, self.socket_path, max_batch_size=64, max_delay=0.05)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.client = EmbeddingClient(self.socket_path)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def test_encode_round_trip(self):
+        """Test vectors come back in request order with the model's values"""
+        vectors = self.client.encode(['python developer', 'sql'])
+        np.testing.assert_array_equal(vectors, self.model.encode(['python developer', 'sql']))
+
+    def test_concurrent_requests_are_batched(self):
+        """Test requests from many threads share model calls and get their own rows"""
+        results = {}
+
+        def worker(n):
+            client = EmbeddingClient(self.socket_path)
+            results[n] = client.encode(['x' * n, 'y y'])
+            client.close()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(1, 9)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for n, vectors in results.items():
+            self.assertEqual(vectors[0, 0], n)
+            self.assertEqual(vectors[1, 1], 1)
+        self.assertEqual(sum(self.model.calls), 16)
+        self.assertLess(len(self.model.calls), 8)
+        self.assertGreater(self.client.stats()['mean_batch_size'], 2)
+
+    def test_model_error_is_reported(self):
+        """Test a failing encode raises on the client and leaves the connection usable"""
+        with self.assertRaises(EmbeddingServerError):
+            self.client.encode(['fail'])
+        self.assertEqual(self.client.encode(['ok']).shape, (1, 3))
+
+    def test_unreachable_server(self):
+        """Test a missing socket raises EmbeddingServerError"""
+        client = EmbeddingClient(os.path.join(self.tmpdir.name, 'missing.sock'))
+        with self.assertRaises(EmbeddingServerError):
+            client.encode(['python'])
+
+    def test_fallback_when_unreachable(self):
+        """Test a client with a fallback loads it once and encodes in-process"""
+        loads = []
+        def fallback():
+            loads.append(1)
+            return self.model
+        client = EmbeddingClient(os.path.join(self.tmpdir.name, 'missing.sock'), fallback=fallback)
+        vectors = client.encode(['python developer'])
+        np.testing.assert_array_equal(vectors, self.model.encode(['python developer']))
+        client.encode(['sql'])
+        self.assertEqual(loads, [1])
+
+class TestEncodeTimeout(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmpdir.name, 'embeddings.sock')
+        self.model = BlockingModel()
+        self.server = EmbeddingServer(self.model, self.socket_path, max_batch_size=64, max_delay=0.0,
+                                      encode_timeout=0.2)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.model.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def test_timeout_is_reported(self):
+        """Test a stuck encode gets an error reply before the client's own timeout"""
+        client = EmbeddingClient(self.socket_path, timeout=5)
+        start = time.monotonic()
+        with self.assertRaisesRegex(EmbeddingServerError, 'timed out'):
+            client.encode(['python'])
+        self.assertLess(time.monotonic() - start, 2)
+        self.model.release.set()
+        self.assertEqual(client.encode(['ok']).shape, (1, 3))
+        client.close()
+
+    def test_timed_out_request_is_dropped(self):
+        """Test a request that times out while queued is never encoded"""
+        stuck = EmbeddingClient(self.socket_path, timeout=5)
+        errors = []
+        def encode_stuck():
+            try:
+                stuck.encode(['a'])
+            except EmbeddingServerError as e:
+                errors.append(e)
+        first = threading.Thread(target=encode_stuck)
+        first.start()
+        self.assertTrue(self.model.entered.wait(5))
+        client = EmbeddingClient(self.socket_path, timeout=5)
+        with self.assertRaises(EmbeddingServerError):
+            client.encode(['queued', 'texts'])
+        self.model.release.set()
+        first.join(5)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(client.encode(['ok']).shape, (1, 3))
+        self.assertEqual(self.model.calls, [1, 1])
+        stuck.close()
+        client.close()
+
+    def test_fallback_on_timeout(self):
+        """Test a client with a fallback encodes in-process when the server times out"""
+        local = RecordingModel()
+        client = EmbeddingClient(self.socket_path, timeout=5, fallback=lambda: local)
+        vectors = client.encode(['python developer'])
+        np.testing.assert_array_equal(vectors, local.encode(['python developer']))
+        client.close()
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,95 @@
+import unittest
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from unittest import mock
+import numpy as np
+import encoders
+from encoders import OnnxEncoder, load_encoder
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class FakeEncoding:
+    def __init__(self, ids, width):
+        self.ids = ids + [0] * (width - len(ids))
+        self.attention_mask = [1] * len(ids) + [0] * (width - len(ids))
+        self.type_ids = [0] * width
+
+class FakeTokenizer:
+    """One token per word, padded to the longest text in the batch"""
+    def encode_batch(self, texts):
+        ids = [[len(word) for word in text.split()] for text in texts]
+        width = max(len(i) for i in ids)
+        return [FakeEncoding(i, width) for i in ids]
+
+class FakeSession:
+    """Token embedding is (id, 1) for real tokens and a large value for padding"""
+    def run(self, outputs, feed):
+        ids = feed['input_ids'].astype(np.float32)
+        tokens = np.stack([ids, np.ones_like(ids)], axis=-1)
+        tokens[feed['attention_mask'] == 0] = 1000.0
+        return [tokens]
+
+def make_encoder():
+    encoder = OnnxEncoder.__new__(OnnxEncoder)
+    encoder.tokenizer = FakeTokenizer()
+    encoder.session = FakeSession()
+    encoder.input_names = ['input_ids', 'attention_mask']
+    return encoder
+
+def fake_export(model_name, output_dir):
+    """Record the export, then write the marker file after a pause"""
+    with open(os.path.join(output_dir, 'exports.log'), 'a') as f:
+        f.write(f'{os.getpid()}\n')
+    time.sleep(0.3)
+    with open(os.path.join(output_dir, encoders.CONFIG_FILE), 'w') as f:
+        f.write('{"model": "%s"}' % model_name)
+
+def load_in_child(model_dir):
+    with mock.patch('encoders.export_onnx', fake_export), \
+            mock.patch('encoders.OnnxEncoder', lambda model_dir, quantized: None):
+        load_encoder('all-MiniLM-L6-v2', 'onnx', model_dir)
+
+class TestEncoders(unittest.TestCase):
+    def test_unknown_backend(self):
+        """Test an unknown ENCODER_BACKEND fails loudly"""
+        with self.assertRaises(ValueError):
+            load_encoder('all-MiniLM-L6-v2', 'tensorrt')
+
+    def test_mean_pooling_ignores_padding(self):
+        """Test pooling averages real tokens only and rows are unit length"""
+        vectors = make_encoder().encode(['aaa a', 'aa'])
+        expected = np.array([[2.0, 1.0], [2.0, 1.0]]) / np.sqrt(5)
+        np.testing.assert_allclose(vectors, expected, rtol=1e-6)
+
+    def test_order_restored_across_batches(self):
+        """Test length-sorted batching returns rows in input order"""
+        texts = ['aaaa aaaa aaaa', 'a', 'aa aa', 'aaa']
+        vectors = make_encoder().encode(texts, batch_size=2)
+        for text, vector in zip(texts, vectors):
+            expected = np.array([len(text.split()[0]), 1.0])
+            np.testing.assert_allclose(vector, expected / np.linalg.norm(expected), rtol=1e-6)
+
+    def test_single_text(self):
+        """Test a bare string returns a single vector like SentenceTransformer"""
+        self.assertEqual(make_encoder().encode('aa').shape, (2,))
+
+    def test_export_once_across_processes(self):
+        """Test workers loading a missing export at the same time export it once"""
+        with tempfile.TemporaryDirectory() as model_dir:
+            context = multiprocessing.get_context('fork')
+            workers = [context.Process(target=load_in_child, args=(model_dir,)) for _ in range(3)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join(10)
+                self.assertEqual(worker.exitcode, 0)
+            with open(os.path.join(model_dir, 'exports.log')) as f:
+                self.assertEqual(len(f.read().split()), 1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
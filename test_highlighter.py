@@ -0,0 +1,67 @@
+import unittest
+import logging
+import highlighter
+from highlighter import highlight, compile_keywords, KeywordAutomaton, KeywordPattern
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestHighlighter(unittest.TestCase):
+    def test_word_boundaries_and_case(self):
+        """Test keywords match whole words regardless of case"""
+        result = highlight('Python and pythonic PYTHON', {'python'})
+        self.assertEqual(result, '<span class="highlight">Python</span> and pythonic '
+                                 '<span class="highlight">PYTHON</span>')
+
+    def test_single_escape(self):
+        """Test text is HTML-escaped exactly once, including inside highlights"""
+        result = highlight('R&D <script> sql', {'sql', 'script'})
+        self.assertEqual(result, 'R&amp;D &lt;<span class="highlight">script</span>&gt; '
+                                 '<span class="highlight">sql</span>')
+
+    def test_keywords_do_not_match_inside_entities(self):
+        """Test a keyword like 'amp' can't match the escaped form of '&'"""
+        self.assertEqual(highlight('a & b', {'amp'}), 'a &amp; b')
+
+    def test_leftmost_longest(self):
+        """Test overlapping keywords prefer the earliest, then the longest match"""
+        automaton = KeywordAutomaton({'machine', 'machine learning', 'learning systems'})
+        self.assertEqual(automaton.find('machine learning systems'), [(0, 16)])
+        self.assertEqual(automaton.find('learning systems'), [(0, 16)])
+
+    def test_punctuated_keywords(self):
+        """Test keywords ending in punctuation still match before a space"""
+        self.assertEqual(highlight('c++ and node.js', {'c++', 'node.js'}),
+                         '<span class="highlight">c++</span> and <span class="highlight">node.js</span>')
+
+    def test_empty_keywords(self):
+        """Test no keywords means escaped text with no empty spans"""
+        self.assertEqual(highlight('<b>hi</b>', set()), '&lt;b&gt;hi&lt;/b&gt;')
+
+    def test_regex_below_threshold(self):
+        """Test small keyword sets use the compiled regex and larger ones the automaton"""
+        limit = highlighter.REGEX_MAX_KEYWORDS
+        small = frozenset(f'skill{i}' for i in range(limit))
+        self.assertIsInstance(compile_keywords(small), KeywordPattern)
+        self.assertIsInstance(compile_keywords(small | {'extra'}), KeywordAutomaton)
+
+    def test_regex_matches_automaton(self):
+        """Test both matchers return the same spans, so the threshold doesn't change output"""
+        keywords = {'machine', 'machine learning', 'learning systems', 'c++', 'node.js', '.net',
+                    'sql', 'amp', 'Go'}
+        text = ('Machine learning systems in C++, node.js and .NET; mysql vs SQL. '
+                'R&D: go-to GO_lang go <sql> c++11 asp.net')
+        self.assertEqual(KeywordPattern(keywords).find(text), KeywordAutomaton(keywords).find(text))
+        self.assertEqual(KeywordPattern(set()).find(text), [])
+
+    def test_automaton_reused(self):
+        """Test the same keyword set reuses its compiled automaton"""
+        compile_keywords.cache_clear()
+        highlight('python', {'python', 'sql'})
+        highlight('sql', ['sql', 'python'])
+        info = compile_keywords.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,112 @@
+import unittest
+import json
+import threading
+import logging
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from job_search import AdzunaClient, TTLCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class FakeAdzuna(BaseHTTPRequestHandler):
+    """Local stand-in for the Adzuna search endpoint"""
+    requests_seen = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        FakeAdzuna.requests_seen.append(params)
+        count = int(params['results_per_page'][0])
+        what = params['what'][0]
+        payload = {'results': [{
+            'title': f'{what} {i}',
+            'description': f'Description of {what} posting {i}',
+            'company_name': 'Acme',
+            'location': {'display_name': 'Remote'}
+        } for i in range(count)]}
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestAdzunaClient(unittest.TestCase):
+    def setUp(self):
+        FakeAdzuna.requests_seen = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeAdzuna)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/v1/api/jobs/us/search/1'
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_normalized_queries_share_cache(self):
+        """Test repeated queries are served from cache until the TTL expires"""
+        client = AdzunaClient('id', 'key', self.url, cache=TTLCache(ttl=60, clock=self.clock))
+        first = client.search('Python Developer')
+        second = client.search('  python   developer ')
+        self.assertEqual(first, second)
+        self.assertEqual(len(FakeAdzuna.requests_seen), 1)
+        self.assertEqual(first[0]['company'], 'Acme')
+
+        self.clock.now = 61
+        client.search('python developer')
+        self.assertEqual(len(FakeAdzuna.requests_seen), 2)
+
+    def test_cache_is_size_bounded(self):
+        """Test the least recently used query is evicted first"""
+        cache = TTLCache(max_size=2, ttl=60, clock=self.clock)
+        client = AdzunaClient('id', 'key', self.url, cache=cache)
+        for query in ('a', 'b', 'a', 'c'):
+            client.search(query)
+        self.assertEqual(cache.stats()['entries'], 2)
+        client.search('a')
+        client.search('b')
+        self.assertEqual(len(FakeAdzuna.requests_seen), 4)
+
+    def test_prefetch_full_page(self):
+        """Test prefetch pulls a full page and hands it to the embed hook once"""
+        batches = []
+        client = AdzunaClient('id', 'key', self.url, prefetch=True, prefetch_results=20,
+                              on_results=batches.append)
+        jobs = client.search('devops')
+        client.search('devops')
+        self.assertTrue(client.wait_for_prefetch(10))
+        self.assertEqual(len(jobs), 20)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(FakeAdzuna.requests_seen[0]['results_per_page'], ['20'])
+
+    def test_prefetch_runs_in_background(self):
+        """Test search returns before the embed hook finishes, and a failing hook is only logged"""
+        release = threading.Event()
+        calls = []
+
+        def slow_hook(jobs):
+            calls.append(len(jobs))
+            release.wait(10)
+            raise RuntimeError('model unavailable')
+
+        client = AdzunaClient('id', 'key', self.url, prefetch=True, prefetch_results=5, on_results=slow_hook)
+        jobs = client.search('devops')
+        self.assertEqual(len(jobs), 5)
+        self.assertFalse(client.wait_for_prefetch(0.05))
+        release.set()
+        self.assertTrue(client.wait_for_prefetch(10))
+        self.assertEqual(calls, [5])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,46 @@
+import unittest
+import logging
+from keyword_extractor import KeywordExtractor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestKeywordExtractor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = KeywordExtractor()
+
+    def test_technical_terms(self):
+        """Test technical terms and normalized spellings are extracted"""
+        keywords = self.extractor.extract("Strong Python, Node.js and Dev-Ops experience with AWS")
+        self.assertIn('python', keywords)
+        self.assertIn('nodejs', keywords)
+        self.assertIn('devops', keywords)
+        self.assertIn('aws', keywords)
+        self.assertNotIn('experience', keywords)
+        self.assertNotIn('strong', keywords)
+
+    def test_compound_terms(self):
+        """Test dotted and hyphenated words are split into their parts"""
+        keywords = self.extractor.extract("cross-platform apps using socket.io-client")
+        self.assertIn('cross-platform', keywords)
+        self.assertNotIn('socket', keywords)  # 'io' is too short
+
+    def test_truncation(self):
+        """Test text past the length limit is ignored"""
+        extractor = KeywordExtractor(max_text_length=20)
+        keywords = extractor.extract("python developer    kubernetes")
+        self.assertIn('python', keywords)
+        self.assertNotIn('kubernetes', keywords)
+
+    def test_repeat_calls(self):
+        """Test the token cache doesn't change results between calls"""
+        with open('test_resume.txt', 'r') as f:
+            resume_text = f.read()
+        first = self.extractor.extract(resume_text)
+        self.assertEqual(first, self.extractor.extract(resume_text))
+        self.assertIsInstance(first, set)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,56 @@
+import unittest
+import logging
+from metrics import Registry
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        """Test observations land in the first bucket whose bound they don't exceed"""
+        registry = Registry()
+        latency = registry.histogram('stage_seconds', 'Stage time', ['stage'], buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value, 'encode')
+        counts, total, n = latency.snapshot()[('encode',)]
+        self.assertEqual(counts, [2, 3, 4])
+        self.assertAlmostEqual(total, 3.65)
+        self.assertEqual(n, 4)
+        self.assertIs(registry.histogram('stage_seconds', 'Stage time', ['stage']), latency)
+
+    def test_timer(self):
+        """Test the context manager records one observation, even when the block raises"""
+        registry = Registry()
+        latency = registry.histogram('request_seconds', 'Request time', ['route'])
+        with latency.time('submit'):
+            pass
+        with self.assertRaises(KeyError):
+            with latency.time('submit'):
+                raise KeyError('boom')
+        self.assertEqual(latency.snapshot()[('submit',)][2], 2)
+
+    def test_text_format(self):
+        """Test the exposition follows the Prometheus text format"""
+        registry = Registry()
+        registry.histogram('batch_size', 'Texts per batch', buckets=(1, 8)).observe(4)
+
+        @registry.collector
+        def caches():
+            yield 'cache_lookups_total', 'counter', 'Cache lookups', [({'cache': 'a"b'}, 3)]
+
+        @registry.collector
+        def broken():
+            raise RuntimeError('database is locked')
+
+        lines = registry.render().splitlines()
+        self.assertIn('# TYPE batch_size histogram', lines)
+        self.assertIn('batch_size_bucket{le="1"} 0', lines)
+        self.assertIn('batch_size_bucket{le="8"} 1', lines)
+        self.assertIn('batch_size_bucket{le="+Inf"} 1', lines)
+        self.assertIn('batch_size_sum 4.0', lines)
+        self.assertIn('batch_size_count 1', lines)
+        self.assertIn('cache_lookups_total{cache="a\\"b"} 3', lines)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
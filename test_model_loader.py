@@ -0,0 +1,124 @@
+import unittest
+import logging
+import gc
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+import types
+from unittest import mock
+import model_loader
+from embedding_server import EmbeddingClient
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def load_gunicorn_conf():
+    """Import gunicorn.conf.py as gunicorn does, by path"""
+    spec = importlib.util.spec_from_file_location('gunicorn_conf', os.path.join(ROOT, 'gunicorn.conf.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class StubServer:
+    def __init__(self, calls):
+        self.log = types.SimpleNamespace(info=lambda message: calls.append('log'))
+
+class TestGetModel(unittest.TestCase):
+    def setUp(self):
+        model_loader._model = None
+
+    def tearDown(self):
+        model_loader._model = None
+
+    def test_import_loads_nothing(self):
+        """Importing model_loader doesn't import the encoder backend"""
+        code = ("import sys, model_loader; "
+                "print(sorted(m for m in ('encoders', 'sentence_transformers', 'torch') if m in sys.modules))")
+        output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), '[]')
+
+    def test_loaded_on_first_use_only(self):
+        """The model is loaded once, by the first get_model call"""
+        model = object()
+        with mock.patch('encoders.load_encoder', return_value=model) as load_encoder:
+            self.assertFalse(model_loader.is_loaded())
+            self.assertIs(model_loader.get_model(), model)
+            self.assertIs(model_loader.get_model(), model)
+        load_encoder.assert_called_once_with(model_loader.MODEL_NAME, model_loader.ENCODER_BACKEND)
+        self.assertTrue(model_loader.is_loaded())
+
+    def test_concurrent_first_use_loads_once(self):
+        """Threads racing on the first call share one load"""
+        started = threading.Event()
+        def slow_load(name, backend):
+            started.wait(5)
+            return object()
+        results = []
+        with mock.patch('encoders.load_encoder', side_effect=slow_load) as load_encoder:
+            threads = [threading.Thread(target=lambda: results.append(model_loader.get_model())) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            started.set()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(load_encoder.call_count, 1)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(len({id(model) for model in results}), 1)
+
+    def test_embedding_server_client(self):
+        """With EMBEDDING_SERVER_SOCKET set no model is loaded in-process"""
+        with mock.patch.object(model_loader, 'EMBEDDING_SERVER_SOCKET', '/tmp/embeddings.sock'), \
+                mock.patch('encoders.load_encoder') as load_encoder:
+            model = model_loader.get_model()
+        self.assertIsInstance(model, EmbeddingClient)
+        self.assertEqual(model.socket_path, '/tmp/embeddings.sock')
+        self.assertIs(model.fallback, model_loader.load_model)
+        load_encoder.assert_not_called()
+
+class TestGunicornHooks(unittest.TestCase):
+    def setUp(self):
+        model_loader._model = None
+        self.conf = load_gunicorn_conf()
+
+    def tearDown(self):
+        model_loader._model = None
+
+    def test_when_ready_preloads_before_freeze(self):
+        """The master loads the model, then freezes the collector"""
+        calls = []
+        def fake_load(name, backend):
+            calls.append('load')
+            return object()
+        with mock.patch('encoders.load_encoder', side_effect=fake_load), \
+                mock.patch.object(gc, 'freeze', side_effect=lambda: calls.append('freeze')):
+            self.conf.when_ready(StubServer(calls))
+        self.assertEqual(calls, ['load', 'log', 'freeze'])
+        self.assertTrue(model_loader.is_loaded())
+
+    def test_when_ready_without_preload(self):
+        """Nothing is loaded or frozen with PRELOAD_MODEL off or an embedding server"""
+        calls = []
+        for patch in (mock.patch.object(self.conf, 'PRELOAD_MODEL', False),
+                      mock.patch.object(model_loader, 'EMBEDDING_SERVER_SOCKET', '/tmp/embeddings.sock')):
+            with patch, mock.patch('encoders.load_encoder') as load_encoder, \
+                    mock.patch.object(gc, 'freeze') as freeze:
+                self.conf.when_ready(StubServer(calls))
+            load_encoder.assert_not_called()
+            freeze.assert_not_called()
+        self.assertEqual(calls, [])
+        self.assertFalse(model_loader.is_loaded())
+
+    def test_post_worker_init_starts_background_workers(self):
+        """Each worker starts the app's background threads after loading it"""
+        app = types.SimpleNamespace(start_background_workers=mock.Mock())
+        with mock.patch.dict(sys.modules, {'resume_matcher': app}):
+            self.conf.post_worker_init(types.SimpleNamespace(pid=os.getpid()))
+        app.start_background_workers.assert_called_once_with()
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,138 @@
+import unittest
+import os
+import json
+import tempfile
+import threading
+import logging
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import db
+import notifications
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class StubHunter(BaseHTTPRequestHandler):
+    """Local stand-in for the Hunter verify and send endpoints"""
+    verify_calls = []
+    send_calls = []
+    send_failures = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        email = parse_qs(urlparse(self.path).query)['email'][0]
+        StubHunter.verify_calls.append(email)
+        status = 'invalid' if email.startswith('bad') else 'valid'
+        self._reply(200, {'data': {'status': status}})
+
+    def do_POST(self):
+        StubHunter.send_calls.append(parse_qs(urlparse(self.path).query)['to'][0])
+        if StubHunter.send_failures > 0:
+            StubHunter.send_failures -= 1
+            self._reply(503, {'error': 'unavailable'})
+        else:
+            self._reply(200, {'data': {'sent': True}})
+
+class TestNotificationOutbox(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'matches.db')
+        db.migrate(self.path)
+        StubHunter.verify_calls = []
+        StubHunter.send_calls = []
+        StubHunter.send_failures = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHunter)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{self.server.server_port}'
+        client = notifications.HunterClient('key', f'{base}/v2/email-verifier',
+                                            f'{base}/v2/email-sender', db_path=self.path)
+        self.worker = notifications.NotificationWorker(client, db_path=self.path, base_delay=0)
+
+    def tearDown(self):
+        self.worker.stop(timeout=5)
+        self.server.shutdown()
+        self.server.server_close()
+        db.close_connections()
+        self.tmpdir.cleanup()
+
+    def enqueue(self, email):
+        with db.transaction(self.path) as conn:
+            return notifications.enqueue_email(conn, email, 'Subject', 'Body')
+
+    def status(self, outbox_id):
+        return db.query_one('SELECT status, attempts FROM email_outbox WHERE id = ?',
+                            (outbox_id,), path=self.path)
+
+    def test_delivery_and_verification_cache(self):
+        """Test emails are sent and each address is verified once"""
+        first = self.enqueue('alice@example.com')
+        second = self.enqueue('alice@example.com')
+        self.assertEqual(self.worker.drain_once(), 2)
+        self.assertEqual(self.status(first)[0], 'sent')
+        self.assertEqual(self.status(second)[0], 'sent')
+        self.assertEqual(StubHunter.verify_calls, ['alice@example.com'])
+        self.assertEqual(self.worker.drain_once(), 0)
+
+    def test_invalid_address_skipped(self):
+        """Test addresses that fail verification are never sent"""
+        outbox_id = self.enqueue('bad@example.com')
+        self.worker.drain_once()
+        self.assertEqual(self.status(outbox_id)[0], 'skipped')
+        self.assertEqual(StubHunter.send_calls, [])
+
+    def test_transient_failures_retried(self):
+        """Test 5xx responses are retried with backoff until they succeed"""
+        StubHunter.send_failures = 2
+        outbox_id = self.enqueue('carol@example.com')
+        self.worker.drain_once()
+        self.assertEqual(self.status(outbox_id)[0], 'pending')
+        self.worker.drain_once()
+        self.worker.drain_once()
+        self.assertEqual(self.status(outbox_id), ('sent', 3))
+
+    def test_gives_up_after_max_attempts(self):
+        """Test an email is marked failed once attempts run out"""
+        StubHunter.send_failures = 100
+        self.worker.max_attempts = 2
+        outbox_id = self.enqueue('dave@example.com')
+        self.worker.drain_once()
+        self.worker.drain_once()
+        self.assertEqual(self.status(outbox_id), ('failed', 2))
+
+    def test_background_thread(self):
+        """Test notify() wakes the background worker to drain the outbox"""
+        outbox_id = self.enqueue('erin@example.com')
+        self.worker.notify()
+        for _ in range(100):
+            if self.status(outbox_id)[0] == 'sent':
+                break
+            threading.Event().wait(0.05)
+        self.assertEqual(self.status(outbox_id)[0], 'sent')
+
+    def test_backlog_drained_on_start(self):
+        """Test rows queued before startup, including retries, go out once the worker starts"""
+        queued = self.enqueue('frank@example.com')
+        retry = self.enqueue('grace@example.com')
+        db.execute("UPDATE email_outbox SET attempts = 1, last_error = 'timeout' WHERE id = ?",
+                   (retry,), path=self.path)
+        self.worker.ensure_started()
+        for _ in range(100):
+            if self.status(queued)[0] == 'sent' and self.status(retry)[0] == 'sent':
+                break
+            threading.Event().wait(0.05)
+        self.assertEqual(self.status(queued), ('sent', 1))
+        self.assertEqual(self.status(retry), ('sent', 2))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,133 @@
+import unittest
+import io
+import threading
+import time
+import logging
+import PyPDF2
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+import pdf_ingest
+from pdf_ingest import PdfExtractor, PdfTimeoutError, extract_text, iter_page_text
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def make_pdf(pages, lines=40):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    for page in range(pages):
+        y = 750
+        for line in range(lines):
+            pdf.drawString(40, y, f'page {page} line {line} python flask docker kubernetes')
+            y -= 16
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+def full_text(data):
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return ''.join(page.extract_text() + '\n' for page in reader.pages)
+
+def slow_single_page(reader, start, stop, max_chars):
+    """Worker task that hangs on one-page documents; must be importable by the forkserver"""
+    if len(reader.pages) == 1:
+        time.sleep(60)
+    return pdf_ingest._extract_pages(reader, start, stop, max_chars)
+
+class TestPdfIngest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.short = make_pdf(2)
+        cls.long = make_pdf(24)
+
+    def test_iter_page_text(self):
+        """Test that pages are yielded one at a time in order"""
+        pages = list(iter_page_text(self.long, 3, 5))
+        self.assertEqual(len(pages), 2)
+        self.assertIn('page 3 line 0', pages[0])
+        self.assertIn('page 4 line 0', pages[1])
+
+    def test_early_cutoff_matches_full_extraction(self):
+        """Test that stopping early gives the same prefix as parsing every page"""
+        for data in (self.short, self.long):
+            for max_chars in (100, 5000, 10 ** 6):
+                self.assertEqual(extract_text(data, max_chars), full_text(data)[:max_chars])
+
+    def test_in_process_extractor(self):
+        """Test that processes=0 extracts without a pool"""
+        extractor = PdfExtractor(processes=0, max_chars=3000)
+        self.assertEqual(extractor.extract(self.long), full_text(self.long)[:3000])
+        self.assertEqual(extractor._idle, [])
+
+    def test_pool_extractor(self):
+        """Test that the pooled extractor stitches windows back in order"""
+        extractor = PdfExtractor(processes=2, max_chars=20000, pages_per_task=3)
+        try:
+            expected = full_text(self.long)
+            self.assertEqual(extractor.extract(self.long), expected[:20000])
+            self.assertEqual(extractor.extract(self.short), full_text(self.short))
+        finally:
+            extractor.close()
+
+    def test_timeout_replaces_worker(self):
+        """Test that a document over its timeout raises and the next one still works"""
+        extractor = PdfExtractor(processes=1, timeout=1e-6, max_chars=10 ** 6)
+        try:
+            with self.assertRaises(PdfTimeoutError):
+                extractor.extract(self.long)
+            extractor.timeout = 30
+            self.assertEqual(extractor.extract(self.short), full_text(self.short))
+        finally:
+            extractor.close()
+
+    def test_slow_document_isolated(self):
+        """Test a PDF that times out only kills its own worker, not a document extracted alongside it"""
+        extractor = PdfExtractor(processes=2, timeout=1, max_chars=10 ** 6, extract_pages=slow_single_page)
+        try:
+            errors = []
+
+            def extract_slow():
+                try:
+                    extractor.extract(make_pdf(1))
+                except PdfTimeoutError as e:
+                    errors.append(e)
+
+            slow = threading.Thread(target=extract_slow)
+            slow.start()
+            expected = full_text(self.long)
+            # Keep extracting across the moment the slow document is killed
+            end = time.monotonic() + 1.5
+            while time.monotonic() < end:
+                self.assertEqual(extractor.extract(self.long), expected)
+            slow.join()
+            self.assertEqual(len(errors), 1)
+            self.assertEqual(extractor.extract(self.short), full_text(self.short))
+        finally:
+            extractor.close()
+
+    def test_bytes_sent_once_per_worker(self):
+        """Test each worker gets a document's bytes with its first window only"""
+        submitted = []
+        submit = pdf_ingest._Worker.submit
+
+        def recording_submit(worker, data, start, stop, max_chars):
+            submitted.append((worker, worker.loaded))
+            submit(worker, data, start, stop, max_chars)
+
+        extractor = PdfExtractor(processes=2, max_chars=10 ** 6, pages_per_task=2)
+        pdf_ingest._Worker.submit = recording_submit
+        try:
+            for _ in range(2):
+                submitted.clear()
+                self.assertEqual(extractor.extract(self.long), full_text(self.long))
+                with_bytes = [worker for worker, loaded in submitted if not loaded]
+                self.assertEqual(len(submitted), 12)
+                self.assertEqual(len(with_bytes), len(set(with_bytes)))
+                self.assertEqual(set(with_bytes), {worker for worker, _ in submitted})
+        finally:
+            pdf_ingest._Worker.submit = submit
+            extractor.close()
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
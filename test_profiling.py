@@ -0,0 +1,77 @@
+import unittest
+import os
+import pstats
+import tempfile
+import threading
+import logging
+from profiling import RequestProfiler
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+class TestRequestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.profiler = RequestProfiler(self.tmpdir.name, sample_rate=0.0, max_profiles=3)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_unsampled_calls_are_not_captured(self):
+        """Test nothing is written when the call isn't sampled or forced"""
+        self.assertEqual(self.profiler.run('submit', busy, 1000), busy(1000))
+        self.profiler.flush()
+        self.assertEqual(self.profiler.slowest(), [])
+
+    def test_forced_capture(self):
+        """Test a forced call is saved as a loadable .prof with its top functions"""
+        result = self.profiler.run('submit', busy, 20000, forced=True, info={'path': '/submit'})
+        self.assertEqual(result, busy(20000))
+        self.profiler.flush()
+
+        [summary] = self.profiler.slowest()
+        self.assertEqual(summary['path'], '/submit')
+        self.assertTrue(summary['forced'])
+        self.assertTrue(any('busy' in row['function'] for row in summary['top']))
+        path = self.profiler.profile_path(summary['id'])
+        self.assertGreater(pstats.Stats(path).total_calls, 0)
+
+    def test_ring_keeps_newest(self):
+        """Test only max_profiles captures are kept, slowest listed first"""
+        for n in (1000, 2000, 3000, 400000, 5000):
+            self.profiler.run('submit', busy, n, forced=True, info={'n': n})
+            self.profiler.flush()
+        summaries = self.profiler.slowest()
+        self.assertEqual(sorted(s['n'] for s in summaries), [3000, 5000, 400000])
+        self.assertEqual(summaries[0]['n'], 400000)
+        self.assertEqual(len(os.listdir(self.tmpdir.name)), 6)
+
+    def test_one_capture_at_a_time(self):
+        """Test a call arriving while another is profiled runs unprofiled"""
+        inside = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            inside.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=self.profiler.run, args=('submit', slow), kwargs={'forced': True})
+        thread.start()
+        inside.wait(5)
+        self.profiler.run('submit', busy, 1000, forced=True)
+        release.set()
+        thread.join()
+        self.profiler.flush()
+        self.assertEqual(len(self.profiler.slowest()), 1)
+
+    def test_profile_path_rejects_other_files(self):
+        """Test downloads are limited to capture ids"""
+        self.assertIsNone(self.profiler.profile_path('../matches'))
+        self.assertIsNone(self.profiler.profile_path('00000000000000000001-1'))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
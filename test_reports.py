@@ -0,0 +1,83 @@
+import unittest
+import io
+import os
+import tempfile
+import zipfile
+import logging
+import db
+from reports import ReportRenderer, render_submission, stream_zip
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestReports(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'matches.db')
+        db.migrate(self.db_path)
+        with db.transaction(self.db_path) as conn:
+            conn.execute("INSERT INTO users (username, password, email) VALUES ('a', 'x', 'a@example.com')")
+            self.ids = [conn.execute('''
+                INSERT INTO submissions (user_id, resume_text, job_desc, score, matching_keywords)
+                VALUES (1, ?, ?, ?, 'python,sql')
+            ''', (f'resume {i}', f'job {i}', 50.0 + i)).lastrowid for i in range(3)]
+
+    def tearDown(self):
+        db.close_connections()
+        self.tmpdir.cleanup()
+
+    def test_render_produces_pdf(self):
+        """Test a submission renders to a PDF document"""
+        pdf = render_submission('python developer', 'python job', 87.5, 'python')
+        self.assertTrue(pdf.startswith(b'%PDF'))
+
+    def test_rendered_once_then_cached(self):
+        """Test the first get renders and stores the PDF, later gets hit the cache"""
+        renderer = ReportRenderer(self.db_path)
+        first = renderer.get(self.ids[0])
+        second = ReportRenderer(self.db_path).get(self.ids[0])
+        self.assertEqual(first, second)
+        self.assertEqual(renderer.stats()['renders'], 1)
+        self.assertIsNotNone(renderer.cached(self.ids[0]))
+
+    def test_schedule_renders_in_background(self):
+        """Test schedule fills the cache without the caller waiting on get"""
+        renderer = ReportRenderer(self.db_path)
+        renderer.schedule(self.ids[1]).result(30)
+        self.assertIsNotNone(renderer.cached(self.ids[1]))
+
+    def test_evicts_past_budget(self):
+        """Test the least recently downloaded reports are dropped past max_bytes and render again"""
+        size = len(ReportRenderer(self.db_path).get(self.ids[0]))
+        renderer = ReportRenderer(self.db_path, max_bytes=size * 2 + size // 2)
+        renderer.get(self.ids[1])
+        renderer.get(self.ids[0])  # now more recent than ids[1]
+        renderer.get(self.ids[2])
+        self.assertIsNone(renderer.cached(self.ids[1]))
+        self.assertIsNotNone(renderer.cached(self.ids[0]))
+        stats = renderer.stats()
+        self.assertEqual(stats['evictions'], 1)
+        stored = db.query_one('SELECT SUM(bytes) FROM submission_reports', path=self.db_path)[0]
+        self.assertEqual(stats['bytes'], stored)
+        self.assertEqual(stats['entries'], 2)
+        self.assertLessEqual(stored, renderer.max_bytes)
+        self.assertTrue(renderer.get(self.ids[1]).startswith(b'%PDF'))
+
+    def test_missing_submission(self):
+        """Test asking for an unknown submission raises"""
+        with self.assertRaises(KeyError):
+            ReportRenderer(self.db_path).get(9999)
+
+    def test_stream_zip(self):
+        """Test the streamed archive is a valid zip holding every entry"""
+        renderer = ReportRenderer(self.db_path)
+        chunks = list(stream_zip((f'submission_{i}.pdf', renderer.get(i)) for i in self.ids))
+        self.assertGreater(len(chunks), len(self.ids))
+        with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.namelist(), [f'submission_{i}.pdf' for i in self.ids])
+            self.assertEqual(archive.read(f'submission_{self.ids[2]}.pdf'), renderer.cached(self.ids[2]))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,117 @@
+import unittest
+import os
+import tempfile
+import logging
+import numpy as np
+import db
+from similarity import normalize_rows, cosine_scores, tiled_top_k
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestSimilarity(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.queries = normalize_rows(rng.normal(size=(300, 16)))
+        self.corpus = normalize_rows(rng.normal(size=(257, 16)))
+
+    def test_cosine_scores(self):
+        """Test cosine scores match the full matrix product"""
+        scores = cosine_scores(self.queries[0] * 3, self.corpus)
+        np.testing.assert_allclose(scores, self.corpus @ self.queries[0], atol=1e-6)
+
+    def test_cosine_scores_match_naive(self):
+        """Test cosine scores against a per-pair computation, zero vectors scoring 0"""
+        rng = np.random.default_rng(1)
+        query = rng.normal(size=8)
+        matrix = rng.normal(size=(20, 8)) * rng.uniform(0.1, 10, size=(20, 1))
+        matrix[3] = 0
+
+        def naive(a, b):
+            norms = np.linalg.norm(a) * np.linalg.norm(b)
+            return float(np.dot(a, b) / norms) if norms else 0.0
+
+        expected = [naive(query, row) for row in matrix]
+        np.testing.assert_allclose(cosine_scores(query, matrix), expected, atol=1e-6)
+        np.testing.assert_allclose(cosine_scores(np.zeros(8), matrix), np.zeros(20))
+
+    def test_tiled_top_k_matches_full_sort(self):
+        """Test tiling returns the same top-k as sorting the full matrix"""
+        full = self.queries @ self.corpus.T
+        seen = 0
+        for start, indices, scores in tiled_top_k(self.queries, self.corpus, 5,
+                                                  tile_rows=64, tile_cols=50):
+            expected = np.argsort(-full[start:start + len(indices)], axis=1)[:, :5]
+            np.testing.assert_array_equal(indices, expected)
+            self.assertTrue(np.all(np.diff(scores, axis=1) <= 0))
+            seen += len(indices)
+        self.assertEqual(seen, len(self.queries))
+
+    def test_k_larger_than_corpus(self):
+        """Test k is capped at the corpus size"""
+        _, indices, _ = next(tiled_top_k(self.queries[:2], self.corpus[:3], 10))
+        self.assertEqual(indices.shape, (2, 3))
+
+class FixedModel:
+    """Returns a preset vector per text"""
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        return np.array([self.vectors[text] for text in texts], dtype=np.float32)
+
+class TestScoreJobs(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.original_path = db.DB_PATH
+        db.DB_PATH = os.path.join(cls.tmpdir.name, 'matches.db')
+        original_index = os.environ.get('JOB_INDEX_PATH')
+        os.environ['JOB_INDEX_PATH'] = os.path.join(cls.tmpdir.name, 'job_index')
+        try:
+            import resume_matcher
+        finally:
+            if original_index is None:
+                del os.environ['JOB_INDEX_PATH']
+            else:
+                os.environ['JOB_INDEX_PATH'] = original_index
+        cls.rm = resume_matcher
+
+    @classmethod
+    def tearDownClass(cls):
+        db.close_connections()
+        db.DB_PATH = cls.original_path
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        self.original_model = self.rm.model_loader._model
+        self.rm.model_loader._model = FixedModel({
+            'python developer': [1, 0, 0],
+            'java developer': [0, 1, 0],
+            'python flask developer': [0.9, 0.1, 0],
+            'ruby': [0.5, 0.5, 0],
+            'nothing': [0, 0, 0],
+        })
+
+    def tearDown(self):
+        self.rm.model_loader._model = self.original_model
+
+    def test_ranked_by_score(self):
+        """Test jobs come back best first, keeping their input index"""
+        jobs = ['java developer', 'python flask developer', 'nothing', 'ruby']
+        results = self.rm.score_jobs('python developer', jobs)
+        self.assertEqual([r['index'] for r in results], [1, 3, 0, 2])
+        self.assertEqual(results[-1]['score'], 0.0)
+        self.assertEqual(results[0]['matching_keywords'], ['developer', 'python'])
+        self.assertEqual(results[0]['missing_keywords'], ['flask'])
+
+    def test_top_k(self):
+        """Test top_k keeps only the best matches"""
+        jobs = ['java developer', 'python flask developer', 'nothing', 'ruby']
+        results = self.rm.score_jobs('python developer', jobs, top_k=2)
+        self.assertEqual([r['index'] for r in results], [1, 3])
+        self.assertEqual(len(self.rm.score_jobs('python developer', jobs, top_k=10)), 4)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
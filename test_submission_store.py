@@ -0,0 +1,132 @@
+import unittest
+import os
+import tempfile
+import logging
+import db
+import submission_store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestSubmissionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_path = db.DB_PATH
+        db.DB_PATH = os.path.join(self.tmpdir.name, 'matches.db')
+        db.migrate()
+
+    def tearDown(self):
+        db.close_connections()
+        db.DB_PATH = self.original_path
+        self.tmpdir.cleanup()
+
+    def save(self, user_id, score, keywords):
+        with db.transaction() as conn:
+            return submission_store.save_submission(conn, user_id, 'resume', 'job', score, keywords)
+
+    def test_rollups_maintained_on_insert(self):
+        """Test keyword counts and daily scores follow each insert"""
+        self.save(1, 80.0, {'python', 'flask'})
+        self.save(1, 60.0, {'python'})
+        self.save(2, 50.0, {'react'})
+
+        summary = submission_store.dashboard_summary(1)
+        self.assertEqual(summary['keywords'][0], 'python')
+        self.assertEqual(summary['keyword_counts'][:2], [2, 1])
+        self.assertEqual(summary['scores'], [70.0])
+        self.assertEqual(len(summary['recent_submissions']), 2)
+        self.assertIsNone(submission_store.dashboard_summary(3))
+
+    def test_migration_backfill_matches_incremental(self):
+        """Test the migration backfill produces the same rollups as inserts"""
+        self.save(1, 80.0, {'python', 'flask'})
+        self.save(1, 40.0, {'python'})
+        expected = submission_store.dashboard_summary(1)
+
+        conn = db.get_connection()
+        conn.execute('DELETE FROM user_keyword_counts')
+        conn.execute('DELETE FROM user_daily_scores')
+        db._add_dashboard_rollups(conn.cursor())
+        actual = submission_store.dashboard_summary(1)
+        self.assertEqual(actual['keywords'], expected['keywords'])
+        self.assertEqual(actual['keyword_counts'], expected['keyword_counts'])
+        self.assertEqual(actual['scores'], expected['scores'])
+
+    def test_keyword_queries(self):
+        """Test the inverted index answers AND queries and recent frequency"""
+        first = self.save(1, 80.0, {'kubernetes', 'terraform', 'aws'})
+        self.save(1, 60.0, {'kubernetes'})
+        third = self.save(1, 70.0, {'terraform', 'kubernetes'})
+        self.save(2, 90.0, {'kubernetes', 'terraform'})
+
+        self.assertEqual(submission_store.submissions_with_keywords(1, ['kubernetes', 'Terraform']),
+                         [third, first])
+        frequency = dict(submission_store.keyword_frequency(1, days=30))
+        self.assertEqual(frequency, {'kubernetes': 3, 'terraform': 2, 'aws': 1})
+
+    def test_keyset_pagination(self):
+        """Test pages walk the history both ways without gaps or repeats"""
+        ids = [self.save(1, 50.0, {'python'}) for _ in range(7)]
+        self.save(2, 50.0, {'python'})
+        newest_first = ids[::-1]
+
+        first = submission_store.submissions_page(1, limit=3)
+        self.assertEqual([row[0] for row in first['rows']], newest_first[:3])
+        self.assertIsNone(first['newer'])
+        second = submission_store.submissions_page(1, before=first['older'], limit=3)
+        third = submission_store.submissions_page(1, before=second['older'], limit=3)
+        self.assertEqual([row[0] for row in second['rows'] + third['rows']], newest_first[3:])
+        self.assertIsNone(third['older'])
+
+        back = submission_store.submissions_page(1, after=third['newer'], limit=3)
+        self.assertEqual(back['rows'], second['rows'])
+        # Paging back past the newest rows returns the full first page
+        top = submission_store.submissions_page(1, after=newest_first[1], limit=3)
+        self.assertEqual(top['rows'], first['rows'])
+
+    def test_previews_and_full_text(self):
+        """Test the listing carries previews and full texts load per submission"""
+        with db.transaction() as conn:
+            submission_id = submission_store.save_submission(conn, 1, 'r' * 500, 'j' * 500, 70.0, ['sql'])
+        row = submission_store.submissions_page(1)['rows'][0]
+        self.assertEqual(row, (submission_id, 'r' * db.PREVIEW_CHARS, 'j' * db.PREVIEW_CHARS, 70.0, 'sql'))
+        self.assertEqual(submission_store.submission_texts(1, submission_id)['resume_text'], 'r' * 500)
+        self.assertIsNone(submission_store.submission_texts(2, submission_id))
+
+        plan = db.query_all('''
+            EXPLAIN QUERY PLAN SELECT id, resume_preview, job_preview, score, matching_keywords
+            FROM submissions WHERE user_id = ? AND id < ? ORDER BY id DESC LIMIT ?
+        ''', (1, submission_id, 50))
+        self.assertIn('COVERING INDEX idx_submissions_listing', ' '.join(row[-1] for row in plan))
+
+    def test_bulk_insert_matches_single_inserts(self):
+        """Test save_submissions leaves the same rows and rollups as one save_submission per row"""
+        rows = [('resume', 'job', 80.0, {'python', 'flask'}), ('resume', 'job', 60.0, {'python'}),
+                ('resume', 'job', 40.0, set())]
+        for row in rows:
+            self.save(1, row[2], row[3])
+        with db.transaction() as conn:
+            ids = submission_store.save_submissions(conn, 2, rows)
+        self.assertEqual(ids, [4, 5, 6])
+        self.assertEqual(submission_store.save_submissions(db.get_connection(), 2, []), [])
+
+        def state(user_id):
+            return (db.query_all('SELECT keyword, count FROM user_keyword_counts WHERE user_id = ? ORDER BY keyword',
+                                 (user_id,)),
+                    db.query_all('SELECT submissions, score_sum, score_min, score_max FROM user_daily_scores '
+                                 'WHERE user_id = ?', (user_id,)),
+                    len(db.query_all('SELECT * FROM submission_keywords WHERE user_id = ?', (user_id,))))
+        self.assertEqual(state(1), state(2))
+        self.assertEqual(submission_store.submissions_with_keywords(2, ['python']), [5, 4])
+
+    def test_downsample(self):
+        """Test long histories are merged into at most max_points buckets"""
+        days = [(f'2025-01-{d:02d}', 1, float(d)) for d in range(1, 31)]
+        labels, scores = submission_store.downsample(days, max_points=10)
+        self.assertEqual(len(labels), 10)
+        self.assertEqual(labels[0], '2025-01-03')
+        self.assertEqual(scores[0], 2.0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,74 @@
+import unittest
+import os
+import tempfile
+import logging
+import numpy as np
+import db
+from upload_cache import UploadCache, digest
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestUploadCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'matches.db')
+        db.migrate(self.db_path)
+
+    def tearDown(self):
+        db.close_connections()
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        """Test a stored upload comes back with its text, keywords and embedding"""
+        cache = UploadCache(self.db_path, namespace='model:100')
+        key = digest(b'%PDF-1.4 resume')
+        self.assertIsNone(cache.get(key))
+        cache.put(key, 'python developer', {'python', 'developer'}, np.arange(4, dtype=np.float32))
+        text, keywords, embedding = cache.get(key)
+        self.assertEqual(text, 'python developer')
+        self.assertEqual(keywords, {'python', 'developer'})
+        np.testing.assert_array_equal(embedding, np.arange(4, dtype=np.float32))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_namespace_mismatch_is_a_miss(self):
+        """Test records built with another model or text limit are not reused"""
+        key = digest(b'resume')
+        UploadCache(self.db_path, namespace='old').put(key, 'text', {'text'}, np.zeros(2))
+        self.assertIsNone(UploadCache(self.db_path, namespace='new').get(key))
+
+    def test_lru_eviction(self):
+        """Test the least recently used uploads go first once over the size cap"""
+        vector = np.zeros(8, dtype=np.float32)
+        record = len('x' * 100) + len('x') + vector.nbytes
+        cache = UploadCache(self.db_path, max_bytes=record * 2)
+        cache.put('a', 'x' * 100, {'x'}, vector)
+        cache.put('b', 'x' * 100, {'x'}, vector)
+        self.assertIsNotNone(cache.get('a'))  # a is now more recent than b
+        cache.put('c', 'x' * 100, {'x'}, vector)
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        stats = cache.stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertLessEqual(stats['bytes'], record * 2)
+
+    def test_running_total(self):
+        """Test the stored total follows inserts, replacements and evictions"""
+        cache = UploadCache(self.db_path, max_bytes=1000)
+        vector = np.zeros(8, dtype=np.float32)
+        for i in range(20):
+            cache.put(f'k{i}', 'x' * (i * 10), {'x'}, vector)
+            cache.put(f'k{i // 2}', 'y' * i, {'y'}, vector)  # replaces an existing record
+            actual, count = db.query_one('SELECT COALESCE(SUM(bytes), 0), COUNT(*) FROM pdf_uploads',
+                                         path=self.db_path)
+            stats = cache.stats()
+            self.assertEqual(stats['bytes'], actual)
+            self.assertEqual(stats['entries'], count)
+            self.assertLessEqual(actual, 1000)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
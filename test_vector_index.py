@@ -0,0 +1,104 @@
+import unittest
+import os
+import tempfile
+import logging
+import numpy as np
+import vector_index
+from vector_index import JobIndex
+from similarity import normalize_rows
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestJobIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        # Clustered data so the IVF lists are meaningful
+        centers = normalize_rows(rng.normal(size=(40, 32)))
+        self.vectors = normalize_rows(centers[rng.integers(0, 40, 3000)] + 0.2 * rng.normal(size=(3000, 32)))
+        self.keys = [f'key{i}' for i in range(3000)]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_exact_search_before_training(self):
+        """Test small indexes answer with an exact scan"""
+        index = JobIndex(self.tmpdir.name)
+        index.add(list(range(100)), self.keys[:100], self.vectors[:100])
+        self.assertIsNone(index.centroids)
+        results = index.search(self.vectors[7], k=3)
+        self.assertEqual(results[0][0], 7)
+        self.assertAlmostEqual(results[0][1], 1.0, places=4)
+
+    def test_duplicate_keys_skipped(self):
+        """Test postings already indexed are not added twice"""
+        index = JobIndex(self.tmpdir.name)
+        self.assertEqual(index.add([1, 2], ['a', 'b'], self.vectors[:2]), 2)
+        self.assertEqual(index.add([3, 4], ['a', 'c'], self.vectors[2:4]), 1)
+        self.assertEqual(len(index), 3)
+
+    def test_incremental_training_and_recall(self):
+        """Test the index trains itself as it grows and keeps high recall"""
+        index = JobIndex(self.tmpdir.name)
+        for start in range(0, 3000, 500):
+            index.add(list(range(start, start + 500)), self.keys[start:start + 500],
+                      self.vectors[start:start + 500])
+            index.wait_for_training()
+        self.assertIsNotNone(index.centroids)
+        self.assertEqual(len(index), 3000)
+        queries = self.vectors[:50]
+        self.assertGreaterEqual(index.recall(queries, k=10, nprobe=len(index.centroids)), 0.999)
+        self.assertGreater(index.recall(queries, k=10, nprobe=8), 0.8)
+
+    def test_rows_added_during_training(self):
+        """Test rows appended while k-means runs are assigned when the generation is published"""
+        index = JobIndex(self.tmpdir.name)
+        index.add(list(range(1000)), self.keys[:1000], self.vectors[:1000])
+        train_centroids = vector_index.train_centroids
+
+        def train_during_append(vectors, nlist):
+            index.add(list(range(1000, 1500)), self.keys[1000:1500], self.vectors[1000:1500])
+            return train_centroids(vectors, nlist)
+
+        vector_index.train_centroids = train_during_append
+        try:
+            self.assertTrue(index.train())
+        finally:
+            vector_index.train_centroids = train_centroids
+        self.assertEqual(index.generation, 1)
+        self.assertEqual(sum(len(rows) for rows in index._lists), 1500)
+        self.assertGreaterEqual(index.recall(self.vectors[1400:1450], k=5, nprobe=len(index.centroids)), 0.999)
+
+    def test_generations_are_versioned(self):
+        """Test each training writes new files, meta names them, and old ones are retired"""
+        index = JobIndex(self.tmpdir.name)
+        index.add(list(range(2000)), self.keys[:2000], self.vectors[:2000])
+        index.wait_for_training()
+        index.train()
+        reader = JobIndex(self.tmpdir.name)
+        self.assertEqual(reader.generation, -1)
+        self.assertEqual(len(reader), 2000)
+        self.assertEqual(reader.generation, 2)
+        np.testing.assert_array_equal(reader.centroids, index.centroids)
+
+        index.train()
+        names = set(os.listdir(self.tmpdir.name))
+        self.assertIn('assign.3.i32', names)
+        self.assertIn('assign.2.i32', names)  # kept for readers still on generation 2
+        self.assertNotIn('assign.1.i32', names)
+        self.assertNotIn('assign.i32', names)
+        self.assertEqual(reader.search(self.vectors[5], k=1)[0][0], 5)
+        self.assertEqual(reader.generation, 3)
+
+    def test_reopen_from_disk(self):
+        """Test a second process sees the persisted rows"""
+        JobIndex(self.tmpdir.name).add(list(range(2000)), self.keys[:2000], self.vectors[:2000])
+        index = JobIndex(self.tmpdir.name)
+        self.assertEqual(len(index), 2000)
+        self.assertEqual(index.search(self.vectors[1234], k=1, exact=True)[0][0], 1234)
+        self.assertTrue(index.contains('key5'))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,108 @@
+import hashlib
+import logging
+import threading
+import time
+
+import numpy as np
+
+import db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # text plus embedding, summed over all uploads
+
+
+def digest(data):
+    """Content address of an uploaded file"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class UploadCache:
+    """Extracted text, keyword set and embedding of each uploaded PDF
+
+    Records live in the ``pdf_uploads`` table keyed by the SHA-256 of the
+    file bytes, so a candidate re-uploading the same resume skips PDF
+    parsing, keyword extraction and encoding. ``namespace`` identifies the
+    model and text limit the record was built with; records from another
+    namespace are treated as misses. Once the stored size passes
+    ``max_bytes`` the least recently used uploads are evicted; the size is
+    kept as a running total in ``cache_totals``, with the entry count, rather
+    than summed per put.
+    """
+
+    def __init__(self, db_path=None, namespace='', max_bytes=DEFAULT_MAX_BYTES):
+        self.db_path = db_path
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return (text, keywords, embedding) for a digest, or None"""
+        row = db.query_one('''
+            SELECT resume_text, keywords, embedding FROM pdf_uploads
+            WHERE digest = ? AND namespace = ?
+        ''', (key, self.namespace), path=self.db_path)
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        db.execute('UPDATE pdf_uploads SET hits = hits + 1, last_used_at = ? WHERE digest = ?',
+                   (time.time(), key), path=self.db_path)
+        text, keywords, blob = row
+        return text, set(k for k in keywords.split(',') if k), np.frombuffer(blob, dtype=np.float32)
+
+    def put(self, key, text, keywords, embedding):
+        """Store a freshly processed upload, evicting old ones past the size cap"""
+        embedding = np.asarray(embedding, dtype=np.float32)
+        joined = ','.join(sorted(keywords))
+        size = len(text.encode('utf-8')) + len(joined) + embedding.nbytes
+        with db.transaction(self.db_path, immediate=True) as conn:
+            replaced = conn.execute('SELECT bytes FROM pdf_uploads WHERE digest = ?', (key,)).fetchone()
+            conn.execute('''
+                INSERT OR REPLACE INTO pdf_uploads
+                (digest, namespace, resume_text, keywords, dim, embedding, bytes, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (key, self.namespace, text, joined, embedding.shape[0], embedding.tobytes(),
+                  size, time.time()))
+            total = db.add_cache_bytes(conn, 'pdf_uploads', size - (replaced[0] if replaced else 0),
+                                       entries=0 if replaced else 1)
+            evicted = self._evict(conn, total)
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+
+    def _evict(self, conn, total):
+        """Delete least recently used uploads until total fits; total comes from cache_totals"""
+        if total <= self.max_bytes:
+            return 0
+        victims = []
+        freed = 0
+        cursor = conn.execute('SELECT digest, bytes FROM pdf_uploads ORDER BY last_used_at')
+        for key, size in cursor:
+            if total - freed <= self.max_bytes:
+                break
+            victims.append((key,))
+            freed += size
+        cursor.close()
+        conn.executemany('DELETE FROM pdf_uploads WHERE digest = ?', victims)
+        db.add_cache_bytes(conn, 'pdf_uploads', -freed, entries=-len(victims))
+        return len(victims)
+
+    def stats(self):
+        size, entries = db.query_one("SELECT bytes, entries FROM cache_totals WHERE name = 'pdf_uploads'",
+                                     path=self.db_path)
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,373 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from similarity import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NPROBE = 8
+MIN_TRAIN_ROWS = 1024  # below this every search is an exact scan
+RETRAIN_GROWTH = 4  # retrain once the index has grown this many times over
+TRAIN_SAMPLE_SIZE = 50000
+KMEANS_ITERATIONS = 10
+SCAN_CHUNK_ROWS = 65536
+
+
+def _top_k(scores, k):
+    """Return (positions, scores) of the k largest scores, best first"""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return top, scores[top]
+
+
+def train_centroids(vectors, nlist, iterations=KMEANS_ITERATIONS, seed=0):
+    """Spherical k-means over unit vectors; returns (nlist, dim) unit centroids"""
+    rng = np.random.default_rng(seed)
+    if vectors.shape[0] > TRAIN_SAMPLE_SIZE:
+        vectors = vectors[np.sort(rng.choice(vectors.shape[0], TRAIN_SAMPLE_SIZE, replace=False))]
+    vectors = np.asarray(vectors, dtype=np.float32)
+    centroids = vectors[rng.choice(vectors.shape[0], nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = ~sums.any(axis=1)
+        # Re-seed empty clusters with random points
+        sums[empty] = vectors[rng.choice(vectors.shape[0], int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class JobIndex:
+    """Persistent IVF (inverted file) index over job description embeddings.
+
+    Rows are appended to flat files in ``path``: ``vectors.f32`` (memory-mapped
+    for search), ``ids.i64`` (submission id of each row), ``assign.i32`` (the
+    inverted list each row belongs to) and ``keys.txt`` (content hash, used to
+    skip duplicate postings). Searches score only the ``nprobe`` lists whose
+    centroids are closest to the query; raising ``nprobe`` trades latency for
+    recall, and ``exact=True`` falls back to a brute-force scan.
+
+    Appends take an exclusive ``flock`` so several gunicorn workers can share
+    one index; each process picks up rows written by the others on its next
+    call. Retraining runs on a background thread, outside that lock, once
+    the index has grown ``RETRAIN_GROWTH`` times over. Each training
+    generation writes its own ``centroids.<n>.npy`` and ``assign.<n>.i32``,
+    and ``meta.json``, which names the current pair, is replaced last. So
+    readers never mix the centroids of one generation with the
+    assignments of another.
+    """
+
+    def __init__(self, path='job_index', nprobe=DEFAULT_NPROBE):
+        self.path = path
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        self._trainer = None
+        os.makedirs(path, exist_ok=True)
+        self._reset()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _reset(self):
+        self.dim = None
+        self.generation = -1
+        self._assign_name = 'assign.i32'
+        self.centroids = None
+        self._rows = 0
+        self._vectors = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._assign = np.empty(0, dtype=np.int32)
+        self._keys = {}
+        self._keys_offset = 0
+        self._lists = []
+        self._list_arrays = {}
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return self._rows
+
+    def _read_meta(self):
+        try:
+            with open(self._file('meta.json'), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'dim': None, 'generation': 0, 'trained_rows': 0}
+
+    @staticmethod
+    def _generation_files(meta):
+        """(assign file, centroids file or None) of the generation meta describes"""
+        # Indexes trained before files were versioned use the unversioned names
+        centroids = meta.get('centroids', 'centroids.npy' if meta.get('generation', 0) else None)
+        return meta.get('assign', 'assign.i32'), centroids
+
+    def _write_meta(self, meta):
+        tmp = self._file('meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._file('meta.json'))
+
+    def _disk_rows(self, dim):
+        """Number of complete rows present in every file"""
+        try:
+            vector_rows = os.path.getsize(self._file('vectors.f32')) // (4 * dim)
+            id_rows = os.path.getsize(self._file('ids.i64')) // 8
+            assign_rows = os.path.getsize(self._file(self._assign_name)) // 4
+        except FileNotFoundError:
+            return 0
+        return min(vector_rows, id_rows, assign_rows)
+
+    def _refresh(self):
+        """Load rows appended by this or other processes since the last call"""
+        meta = self._read_meta()
+        if meta['dim'] is None:
+            return
+        if meta['generation'] != self.generation:
+            # Retrained elsewhere: centroids and assignments changed
+            self._reset()
+            self.dim = meta['dim']
+            self.generation = meta['generation']
+            self._assign_name, centroids = self._generation_files(meta)
+            if centroids is not None:
+                self.centroids = np.load(self._file(centroids))
+            self._lists = [[] for _ in range(len(self.centroids) if self.centroids is not None else 1)]
+
+        rows = self._disk_rows(self.dim)
+        if rows <= self._rows:
+            return
+        start = self._rows
+        self._vectors = np.memmap(self._file('vectors.f32'), dtype=np.float32, mode='r',
+                                  shape=(rows, self.dim))
+        new_ids = np.fromfile(self._file('ids.i64'), dtype=np.int64,
+                              count=rows - start, offset=start * 8)
+        new_assign = np.fromfile(self._file(self._assign_name), dtype=np.int32,
+                                 count=rows - start, offset=start * 4)
+        with open(self._file('keys.txt'), 'rb') as f:
+            f.seek(self._keys_offset)
+            for row in range(start, rows):
+                line = f.readline()
+                self._keys_offset += len(line)
+                self._keys[line.rstrip(b'\n').decode('ascii')] = row
+        self._ids = np.concatenate([self._ids, new_ids])
+        self._assign = np.concatenate([self._assign, new_assign])
+        for offset, list_id in enumerate(new_assign):
+            self._lists[list_id].append(start + offset)
+            self._list_arrays.pop(int(list_id), None)
+        self._rows = rows
+
+    def _truncate_partial(self):
+        """Drop bytes left behind by an append that was interrupted midway"""
+        sizes = {
+            'vectors.f32': self._rows * 4 * self.dim,
+            'ids.i64': self._rows * 8,
+            self._assign_name: self._rows * 4,
+            'keys.txt': self._keys_offset,
+        }
+        for name, size in sizes.items():
+            path = self._file(name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+
+    def _assign_list(self, vectors):
+        if self.centroids is None:
+            return np.zeros(vectors.shape[0], dtype=np.int32)
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def contains(self, key):
+        with self._lock:
+            self._refresh()
+            return key in self._keys
+
+    def add(self, submission_ids, keys, vectors):
+        """Append vectors for new postings, skipping keys already indexed"""
+        vectors = normalize_rows(np.atleast_2d(vectors))
+        with self._lock, open(self._file('lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                meta = self._read_meta()
+                if meta['dim'] is None:
+                    meta['dim'] = int(vectors.shape[1])
+                    self._write_meta(meta)
+                self._refresh()
+                self._truncate_partial()
+
+                rows = []
+                seen = set()
+                for i, key in enumerate(keys):
+                    if key not in self._keys and key not in seen:
+                        seen.add(key)
+                        rows.append(i)
+                if not rows:
+                    return 0
+
+                new_vectors = vectors[rows]
+                new_ids = np.asarray(submission_ids, dtype=np.int64)[rows]
+                with open(self._file('vectors.f32'), 'ab') as f:
+                    f.write(new_vectors.astype(np.float32).tobytes())
+                with open(self._file('ids.i64'), 'ab') as f:
+                    f.write(new_ids.tobytes())
+                with open(self._file('keys.txt'), 'a') as f:
+                    f.write(''.join(keys[i] + '\n' for i in rows))
+                with open(self._file(self._assign_name), 'ab') as f:
+                    f.write(self._assign_list(new_vectors).tobytes())
+                self._refresh()
+
+                trained_rows = meta.get('trained_rows', 0)
+                retrain = self._rows >= MIN_TRAIN_ROWS and self._rows >= RETRAIN_GROWTH * max(trained_rows, 1)
+                added = len(rows)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            if retrain:
+                self._train_in_background()
+            return added
+
+    def _train_in_background(self):
+        with self._lock:
+            if self._trainer is not None and self._trainer.is_alive():
+                return
+            self._trainer = threading.Thread(target=self._retrain, kwargs={'blocking': False},
+                                             name='job-index-train', daemon=True)
+            self._trainer.start()
+
+    def wait_for_training(self, timeout=None):
+        """Wait for a background retrain started by this process (tests and benchmarks)"""
+        trainer = self._trainer
+        if trainer is not None:
+            trainer.join(timeout)
+
+    def train(self):
+        """Retrain the coarse quantizer over every indexed vector, waiting for it"""
+        self.wait_for_training()
+        return self._retrain(blocking=True)
+
+    def _retrain(self, blocking):
+        """Train on a snapshot of the rows, then publish a new generation
+
+        k-means runs without the append lock; rows appended meanwhile are
+        assigned with the new centroids when it is published. With
+        ``blocking=False`` it returns False at once if another process is
+        already training.
+        """
+        try:
+            with open(self._file('train.lock'), 'a') as train_lock:
+                try:
+                    fcntl.flock(train_lock, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                except BlockingIOError:
+                    return False
+                try:
+                    with self._lock:
+                        self._refresh()
+                        rows, generation, vectors = self._rows, self.generation, self._vectors
+                    if not rows:
+                        return False
+                    nlist = max(1, int(np.sqrt(rows)))
+                    centroids = train_centroids(vectors[:rows], nlist)
+                    assignment = self._assign_rows(vectors, 0, rows, centroids)
+                    return self._publish(generation, rows, centroids, assignment)
+                finally:
+                    fcntl.flock(train_lock, fcntl.LOCK_UN)
+        except Exception as e:
+            logger.error(f"Error training job index: {str(e)}")
+            return False
+
+    @staticmethod
+    def _assign_rows(vectors, start, stop, centroids):
+        return np.concatenate([np.empty(0, dtype=np.int32)] + [
+            np.argmax(vectors[i:min(i + SCAN_CHUNK_ROWS, stop)] @ centroids.T, axis=1).astype(np.int32)
+            for i in range(start, stop, SCAN_CHUNK_ROWS)
+        ])
+
+    def _publish(self, generation, trained_rows, centroids, assignment):
+        """Write a new generation's files, then switch meta.json to them"""
+        with self._lock, open(self._file('lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                meta = self._read_meta()
+                if meta['generation'] != generation:
+                    return False  # published by someone else meanwhile
+                self._refresh()
+                self._truncate_partial()
+                # Rows appended while k-means ran
+                assignment = np.concatenate([
+                    assignment, self._assign_rows(self._vectors, trained_rows, self._rows, centroids)])
+
+                new_generation = generation + 1
+                assign_name = f'assign.{new_generation}.i32'
+                centroids_name = f'centroids.{new_generation}.npy'
+                np.save(self._file(f'centroids.{new_generation}.tmp.npy'), centroids)
+                assignment.tofile(self._file(assign_name + '.tmp'))
+                os.replace(self._file(f'centroids.{new_generation}.tmp.npy'), self._file(centroids_name))
+                os.replace(self._file(assign_name + '.tmp'), self._file(assign_name))
+
+                # The previous generation stays for readers still loading it
+                retired = meta.get('retired', [])
+                meta['retired'] = [name for name in self._generation_files(meta) if name]
+                meta.update(generation=new_generation, trained_rows=self._rows, nlist=len(centroids),
+                            assign=assign_name, centroids=centroids_name)
+                self._write_meta(meta)
+                for name in retired:
+                    try:
+                        os.remove(self._file(name))
+                    except FileNotFoundError:
+                        pass
+                logger.info(f"Trained job index: {self._rows} rows in {len(centroids)} lists")
+                self._refresh()
+                return True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _list_rows(self, list_id):
+        rows = self._list_arrays.get(list_id)
+        if rows is None:
+            rows = self._list_arrays[list_id] = np.asarray(self._lists[list_id], dtype=np.int64)
+        return rows
+
+    def search(self, query, k=20, nprobe=None, exact=False):
+        """Return up to k (submission_id, score) pairs, best match first"""
+        query = normalize_rows(query)
+        with self._lock:
+            self._refresh()
+            if not self._rows:
+                return []
+            if exact or self.centroids is None:
+                return self._scan(query, k)
+
+            nprobe = min(nprobe or self.nprobe, len(self.centroids))
+            probe, _ = _top_k(self.centroids @ query, nprobe)
+            rows = np.concatenate([self._list_rows(int(list_id)) for list_id in probe])
+            if not rows.size:
+                return []
+            rows.sort()
+            positions, scores = _top_k(self._vectors[rows] @ query, k)
+            return [(int(self._ids[rows[p]]), float(s)) for p, s in zip(positions, scores)]
+
+    def _scan(self, query, k):
+        """Exact brute-force search over every row, in bounded chunks"""
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, self._rows, SCAN_CHUNK_ROWS):
+            scores = self._vectors[start:start + SCAN_CHUNK_ROWS] @ query
+            positions, top = _top_k(scores, k)
+            best_rows = np.concatenate([best_rows, positions + start])
+            best_scores = np.concatenate([best_scores, top])
+            keep, best_scores = _top_k(best_scores, k)
+            best_rows = best_rows[keep]
+        return [(int(self._ids[r]), float(s)) for r, s in zip(best_rows, best_scores)]
+
+    def recall(self, queries, k=20, nprobe=None):
+        """Mean recall@k of the IVF search against the exact scan"""
+        total = 0.0
+        for query in np.atleast_2d(queries):
+            expected = {i for i, _ in self.search(query, k, exact=True)}
+            found = {i for i, _ in self.search(query, k, nprobe=nprobe)}
+            total += len(expected & found) / max(len(expected), 1)
+        return total / len(np.atleast_2d(queries))